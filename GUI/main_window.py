@@ -190,6 +190,7 @@ class MainWindow(QtWidgets.QMainWindow, TranslatableMixin, ErrorReportingMixin):
         self.action_save = self.file_menu.addAction('', self.save_file, 'Ctrl+S')
         self.action_save_as = self.file_menu.addAction('', self.save_file_as, 'Ctrl+Shift+S')
         self.file_menu.addSeparator()
+        self.action_export_views = self.file_menu.addAction('', self.export_load_sheets)
         self.action_error_report = self.file_menu.addAction('', self.show_error_report)
         self.action_error_report.setIcon(self.style().standardIcon(QtWidgets.QStyle.SP_MessageBoxWarning))
         self.file_menu.addSeparator()
@@ -202,6 +203,7 @@ class MainWindow(QtWidgets.QMainWindow, TranslatableMixin, ErrorReportingMixin):
         self.action_view_reset = self.view_menu.addAction('', self._view_reset, 'Ctrl+0')
         self.view_menu.addSeparator()
         self.action_fullscreen = self.view_menu.addAction('', self._toggle_fullscreen, 'F11')
+        self.action_diagnostics = self.view_menu.addAction('', self._toggle_diagnostics, 'F3')
 
         self.settings_menu = menubar.addMenu('')
         self.action_settings = self.settings_menu.addAction('', self.open_settings, 'Ctrl+,')
@@ -248,6 +250,25 @@ class MainWindow(QtWidgets.QMainWindow, TranslatableMixin, ErrorReportingMixin):
         if file_path:
             print(f"Сохранить как: {file_path}")
 
+    @safe_method(
+        component="MainWindow",
+        category=ErrorCategory.GRAPHICS,
+        severity=ErrorSeverity.MEDIUM
+    )
+    def export_load_sheets(self):
+        if not (hasattr(self.viewer, 'app3d') and self.viewer.app3d):
+            return
+        out_dir = QtWidgets.QFileDialog.getExistingDirectory(self, tr("Экспорт видов в PNG"), "")
+        if not out_dir:
+            return
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            paths = self.viewer.app3d.render_load_sheets(self.viewer.get_truck_manager(), out_dir)
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        QtWidgets.QMessageBox.information(self, tr("Экспорт видов в PNG"),
+                                          f"{tr('Сохранено изображений')}: {len(paths)}\n{out_dir}")
+
     @safe_method(
         component="MainWindow",
         category=ErrorCategory.UI,
@@ -317,6 +338,7 @@ class MainWindow(QtWidgets.QMainWindow, TranslatableMixin, ErrorReportingMixin):
         <h3>{tr('Основные команды:')}</h3>
         <table>
         <tr><td><b>F11, F12</b></td><td>{tr('Полный экран')}</td></tr>
+        <tr><td><b>F3</b></td><td>{tr('Диагностика')}</td></tr>
         <tr><td><b>Esc</b></td><td>{tr('Закрыть панель / Выход из полного экрана')}</td></tr>
         <tr><td><b>Ctrl+N</b></td><td>{tr('Новый файл')}</td></tr>
         <tr><td><b>Ctrl+O</b></td><td>{tr('Открыть файл')}</td></tr>
@@ -387,12 +409,7 @@ class MainWindow(QtWidgets.QMainWindow, TranslatableMixin, ErrorReportingMixin):
     )
     def _view_top(self):
         if hasattr(self.viewer, 'app3d') and self.viewer.app3d:
-            cam = self.viewer.app3d.arc
-            cam.target.set(0, 0, 0)
-            cam.radius = 3000
-            cam.alpha = 3.14159265 / 2
-            cam.beta = 3.14159265 / 2
-            cam.update()
+            self.viewer.app3d.arc.set_view('top')
 
     @safe_method(
         component="MainWindow",
@@ -402,12 +419,7 @@ class MainWindow(QtWidgets.QMainWindow, TranslatableMixin, ErrorReportingMixin):
     )
     def _view_left(self):
         if hasattr(self.viewer, 'app3d') and self.viewer.app3d:
-            cam = self.viewer.app3d.arc
-            cam.target.set(0, 0, 0)
-            cam.radius = 3000
-            cam.alpha = 3.14159265 / 2
-            cam.beta = 3.14159265
-            cam.update()
+            self.viewer.app3d.arc.set_view('left')
 
     @safe_method(
         component="MainWindow",
@@ -417,12 +429,7 @@ class MainWindow(QtWidgets.QMainWindow, TranslatableMixin, ErrorReportingMixin):
     )
     def _view_right(self):
         if hasattr(self.viewer, 'app3d') and self.viewer.app3d:
-            cam = self.viewer.app3d.arc
-            cam.target.set(0, 0, 0)
-            cam.radius = 3000
-            cam.alpha = 3.14159265 / 2
-            cam.beta = 0
-            cam.update()
+            self.viewer.app3d.arc.set_view('right')
 
     @safe_method(
         component="MainWindow",
@@ -439,6 +446,16 @@ class MainWindow(QtWidgets.QMainWindow, TranslatableMixin, ErrorReportingMixin):
             cam.beta = 3.14159265 / 4
             cam.update()
 
+    @safe_method(
+        component="MainWindow",
+        category=ErrorCategory.GRAPHICS,
+        severity=ErrorSeverity.LOW,
+        suppress_errors=True
+    )
+    def _toggle_diagnostics(self):
+        if hasattr(self.viewer, 'app3d') and self.viewer.app3d and self.viewer.app3d.graphics_manager:
+            self.viewer.app3d.graphics_manager.toggle_diagnostics()
+
     def _toggle_fullscreen(self):
         """Переключение полноэкранного режима"""
         if self.isFullScreen():
@@ -474,6 +491,7 @@ class MainWindow(QtWidgets.QMainWindow, TranslatableMixin, ErrorReportingMixin):
         self.action_open.setText(f"📂 {tr('Открыть')}...")
         self.action_save.setText(f"💾 {tr('Сохранить')}")
         self.action_save_as.setText(f"💾 {tr('Сохранить как')}...")
+        self.action_export_views.setText(f"🖼 {tr('Экспорт видов в PNG')}...")
         self.action_error_report.setText(f"⚠️ {tr('Отчет об ошибках')}")
         self.action_exit.setText(f"❌ {tr('Выход')}")
         
@@ -483,6 +501,7 @@ class MainWindow(QtWidgets.QMainWindow, TranslatableMixin, ErrorReportingMixin):
         self.action_view_right.setText(f"➡️ {tr('Справа')}")
         self.action_view_reset.setText(f"🔄 {tr('Сбросить')}")
         self.action_fullscreen.setText(f"🖥 {tr('Полный экран')}")
+        self.action_diagnostics.setText(f"📊 {tr('Диагностика')}")
         
         self.settings_menu.setTitle(f"⚙️ {tr('Настройки')}")
         self.action_settings.setText(f"🔧 {tr('Настройки')}...")
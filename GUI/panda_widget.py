@@ -2,8 +2,9 @@ import json
 import logging
 import os
 import sys
+import time
 
-from PyQt5 import QtWidgets, QtCore
+from PyQt5 import QtWidgets, QtCore, QtGui
 from GUI.box_info_widget import BoxInfoWidget
 from GUI.company_logo_widget import CompanyLogoWidget
 from core.i18n import tr, TranslatableMixin
@@ -275,6 +276,13 @@ class PandaWidget(QtWidgets.QWidget, ErrorReportingMixin):
         self.setAcceptDrops(True)
         self.setMinimumSize(800, 500)
         self.app3d = None
+        # Счётчики режима отрисовки по требованию
+        self.frames_rendered = 0
+        self.frames_saved = 0
+        self._last_frame_time = 0.0
+        self._last_cursor = None
+        self._cursor_inside = False
+        self._stats_window = (time.monotonic(), 0, 0)
         self.timer = QtCore.QTimer(self)
         self.timer.timeout.connect(self._step)
         self.timer.start(16)
@@ -425,10 +433,58 @@ class PandaWidget(QtWidgets.QWidget, ErrorReportingMixin):
     def _step(self):
         try:
             if self.app3d:
-                self.app3d.taskMgr.step()
+                if self._needs_frame():
+                    self._last_frame_time = time.monotonic()
+                    self.frames_rendered += 1
+                    self.app3d.taskMgr.step()
+                else:
+                    self.frames_saved += 1
+                self._report_render_stats()
         except Exception as e:
             logging.error(f"[Qt] taskMgr.step error: {e}")
 
+    def _needs_frame(self) -> bool:
+        settings = getattr(getattr(self.app3d, 'graphics_manager', None), 'settings', None)
+        if settings is None or not getattr(settings, 'render_on_demand', True):
+            return True
+
+        # События native-окна Panda3D разбираются только внутри step(): курсор и кнопки над виджетом
+        # будят отрисовку сразу, не дожидаясь холостого кадра
+        cursor = QtGui.QCursor.pos()
+        inside = self.rect().contains(self.mapFromGlobal(cursor))
+        if cursor != self._last_cursor and (inside or self._cursor_inside):
+            self.app3d.request_redraw()
+        elif inside and QtWidgets.QApplication.mouseButtons() != QtCore.Qt.NoButton:
+            self.app3d.request_redraw()
+        self._last_cursor = cursor
+        self._cursor_inside = inside
+
+        if self.app3d.consume_redraw():
+            return True
+        idle_fps = max(1, int(getattr(settings, 'idle_fps', 4) or 4))
+        return time.monotonic() - self._last_frame_time >= 1.0 / idle_fps
+
+    def _report_render_stats(self, interval: float = 60.0):
+        started, rendered, saved = self._stats_window
+        now = time.monotonic()
+        if now - started < interval:
+            return
+        window_rendered = self.frames_rendered - rendered
+        window_saved = self.frames_saved - saved
+        total = window_rendered + window_saved
+        if window_saved:
+            logging.info(f"[Qt] Render on demand: {window_rendered} frames rendered, {window_saved} saved "
+                         f"({100.0 * window_saved / max(1, total):.0f}%) in the last {now - started:.0f}s")
+        self._stats_window = (now, self.frames_rendered, self.frames_saved)
+
+    def render_stats(self) -> dict:
+        total = self.frames_rendered + self.frames_saved
+        return {
+            'rendered': self.frames_rendered,
+            'saved': self.frames_saved,
+            'saved_ratio': self.frames_saved / total if total else 0.0,
+        }
+
     def resizeEvent(self, event):
         if self.app3d and hasattr(self.app3d, 'resize_window'):
             dpr = 1.0
@@ -31,6 +31,7 @@ class GraphicsWidget(QtWidgets.QWidget, TranslatableMixin):
         self.create_lighting_group(content_layout)
         self.create_materials_group(content_layout)
         self.create_colors_group(content_layout)
+        self.create_lod_group(content_layout)
 
         content_layout.addStretch()
         scroll.setWidget(content)
@@ -111,6 +112,31 @@ class GraphicsWidget(QtWidgets.QWidget, TranslatableMixin):
 
         layout.addWidget(content_widget)
 
+    def create_lod_group(self, layout):
+        self.lod_title_btn = QtWidgets.QPushButton()
+        self.lod_title_btn.setCheckable(False)
+        self.lod_title_btn.setStyleSheet(self.get_section_title_style())
+        layout.addWidget(self.lod_title_btn)
+
+        content_widget = QtWidgets.QWidget()
+        form = QtWidgets.QFormLayout(content_widget)
+        form.setContentsMargins(8, 4, 8, 8)
+        form.setSpacing(8)
+        form.setFieldGrowthPolicy(QtWidgets.QFormLayout.ExpandingFieldsGrow)
+
+        self.widgets['lod_enabled'] = QtWidgets.QCheckBox()
+        self.widgets['lod_enabled'].setStyleSheet(self.get_checkbox_style())
+        self.lod_enabled_label = QtWidgets.QLabel()
+        form.addRow(self.lod_enabled_label, self.widgets['lod_enabled'])
+
+        self.lod_distance_labels = {}
+        for key in ('lod_dimensions_distance', 'lod_markings_distance', 'lod_labels_distance', 'lod_wireframe_distance'):
+            self.widgets[key] = self.create_spin_box(100, 20000, 100, 0)
+            self.lod_distance_labels[key] = QtWidgets.QLabel()
+            form.addRow(self.lod_distance_labels[key], self.widgets[key])
+
+        layout.addWidget(content_widget)
+
     def create_buttons(self, layout):
         button_layout = QtWidgets.QHBoxLayout()
         button_layout.setContentsMargins(0, 8, 0, 0)
@@ -154,6 +180,11 @@ class GraphicsWidget(QtWidgets.QWidget, TranslatableMixin):
             self.widgets['fill_light_intensity'].setValue(settings.fill_light_intensity)
         if 'enable_specular' in self.widgets:
             self.widgets['enable_specular'].setChecked(settings.enable_specular)
+        if 'lod_enabled' in self.widgets:
+            self.widgets['lod_enabled'].setChecked(settings.lod_enabled)
+        for key in ('lod_dimensions_distance', 'lod_markings_distance', 'lod_labels_distance', 'lod_wireframe_distance'):
+            if key in self.widgets:
+                self.widgets[key].setValue(float(getattr(settings, key)))
 
         # Обновляем цвета кнопок
         self.update_background_color_button(settings.background_color)
@@ -261,6 +292,20 @@ class GraphicsWidget(QtWidgets.QWidget, TranslatableMixin):
                 msg.setText(tr("Настройки графики сброшены до заводских!"))
                 msg.exec_()
 
+    def get_spinbox_style(self):
+        return """
+            QSpinBox, QDoubleSpinBox {
+                padding: 4px;
+                border: 1px solid #bdc3c7;
+                border-radius: 3px;
+                background-color: white;
+                font-size: 11px;
+            }
+            QSpinBox:focus, QDoubleSpinBox:focus {
+                border: 2px solid #3498db;
+            }
+        """
+
     def get_section_title_style(self):
         return """
             QPushButton {
@@ -375,6 +420,13 @@ class GraphicsWidget(QtWidgets.QWidget, TranslatableMixin):
         self.colors_title_btn.setText(f"🌈 {tr('Цвета')}")
         self.background_color_label.setText(tr("Цвет фона:"))
         self.truck_color_label.setText(tr("Цвет тягача:"))
+
+        self.lod_title_btn.setText(f"🔭 {tr('Детализация')}")
+        self.lod_enabled_label.setText(f"{tr('Упрощать дальние коробки')}:")
+        self.lod_distance_labels['lod_dimensions_distance'].setText(tr("Скрывать размеры дальше (см):"))
+        self.lod_distance_labels['lod_markings_distance'].setText(tr("Скрывать маркировки дальше (см):"))
+        self.lod_distance_labels['lod_labels_distance'].setText(tr("Скрывать подписи дальше (см):"))
+        self.lod_distance_labels['lod_wireframe_distance'].setText(tr("Скрывать каркас дальше (см):"))
         
         self.reset_btn.setText(tr("Сбросить"))
         self.apply_btn.setText(tr("Применить"))
@@ -7,6 +7,7 @@ except Exception:
 import math
 import os
 import sys
+import time
 import traceback
 from typing import Optional, Tuple
 
@@ -14,16 +15,31 @@ from core.error_management import ErrorReportingMixin, safe_method
 from core.exceptions import ErrorCategory, ErrorSeverity
 
 from direct.showbase.ShowBase import ShowBase
-from panda3d.core import Material, Point3, Point2, Vec3, TextNode
+from direct.interval.IntervalManager import ivalMgr
+from panda3d.core import Material, NodePath, Point3, Point2, Vec3, TextNode
 from panda3d.core import (
     WindowProperties,
     AntialiasAttrib,
 )
 
 from config.config import BACKGROUND_COLOR, WHEEL_CABIN_HEIGHT
+from core.animation import CubicEase
 from core.camera import ArcCamera
+from core.load_calculation.quarter_loads import QuarterLoads
+from core.logging import get_logger
+from core.scene_index import BoxSpatialHash
+from core.staging_grid import StagingGrid
 from core.truck import TruckScene
+from graphics.box_geometry import BoxGeometryCache
+from graphics.box_lod import (BoxLod, LOD_DIMENSIONS, LOD_LABELS, LOD_MARKINGS, LOD_SETTING_KEYS, LOD_WIREFRAME,
+                              tag_lod)
+from graphics.diagnostics import SceneDiagnostics
 from graphics.graphics_manager import GraphicsManager
+from graphics.label_atlas import LabelAtlas
+from graphics.marking_atlas import MarkingAtlas
+from graphics.model_cache import ModelCache
+from graphics.offscreen_renderer import DEFAULT_VIEWS, OffscreenRenderer
+from graphics.settled_layer import SettledLayer
 from utils.settings_manager import SettingsManager
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -90,8 +106,10 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
 
             logger.info("Loading models...")
             self.load_models()
-            self.models_loaded = True
-            logger.info("Models loaded")
+            logger.info("Models requested")
+
+            # Маркировки растеризуются в фоне, пока пользователь не добавил коробки
+            self.safe_execute(lambda: self._get_marking_atlas().warm_async(64), fallback=lambda: None)
 
             logger.info("Applying company logo...")
             self.load_company_logo()
@@ -120,13 +138,9 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             sys.exit(1)
 
     def ensure_models_loaded(self):
+        # Модели грузятся асинхронно (load_models): колесо и кабина сами появятся в сцене, ждать их не нужно
         if not self.models_loaded:
-            logger.info("Ensuring models are loaded...")
-            max_wait = 50
-            wait_count = 0
-            while not self.models_loaded and wait_count < max_wait:
-                self.taskMgr.step()
-                wait_count += 1
+            logger.info(f"Models still loading in background ({getattr(self, '_models_pending', 0)} pending)")
 
     def wait_for_scene_ready(self):
         if not self.scene_initialized:
@@ -148,6 +162,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         self._drag_last_mouse = Point2(0, 0)
         self._drag_last_valid_pos = None
         self.ground_level = 135.0
+        self._redraw_frames = 2
 
     @safe_method(
         component="TruckLoadingApp",
@@ -156,13 +171,165 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         fallback=None
     )
     def _load_bold_font(self):
+        if hasattr(self, '_bold_font'):
+            return self._bold_font
         from utils.setting_deploy import get_resource_path
         import os
+        self._bold_font = None
         font_path = get_resource_path('assets/fonts/NotoSans-Bold.ttf')
         if os.path.exists(font_path):
             font_path_unix = font_path.replace('\\', '/').replace('E:/', '/e/')
-            return self.loader.loadFont(font_path_unix)
-        return None
+            self._bold_font = self.loader.loadFont(font_path_unix)
+        return self._bold_font
+
+    @safe_method(
+        component="TruckLoadingApp",
+        category=ErrorCategory.GRAPHICS,
+        severity=ErrorSeverity.LOW,
+        fallback=None
+    )
+    def _get_label_atlas(self):
+        if not hasattr(self, 'label_atlas'):
+            self.label_atlas = None
+            font = self._load_bold_font()
+            if font:
+                atlas = LabelAtlas(font, self.taskMgr, in_use=self._live_label_keys)
+                if atlas.valid:
+                    self.label_atlas = atlas
+                else:
+                    logging.warning("[Labels] Font cannot be rasterized, falling back to text nodes")
+        return self.label_atlas
+
+    def _get_marking_atlas(self) -> MarkingAtlas:
+        if not hasattr(self, 'marking_atlas'):
+            from utils.setting_deploy import get_resource_path
+            from core.box.box import Box
+            self.marking_atlas = MarkingAtlas(get_resource_path, list(Box.CARGO_MARKINGS))
+        return self.marking_atlas
+
+    def _get_settled_layer(self) -> SettledLayer:
+        if not hasattr(self, 'settled_layer'):
+            self.settled_layer = SettledLayer(self.render)
+        return self.settled_layer
+
+    def _schedule_settle(self, delay: float = 1.0):
+        if not getattr(self, '_settle_scheduled', False):
+            self._settle_scheduled = True
+            self.taskMgr.doMethodLater(delay, self._settle_task, 'settle-boxes')
+
+    def _settle_task(self, task):
+        """Слить неподвижные коробки в кузове, кроме выбранной"""
+        if getattr(self, 'drag_active', False) or self.is_populating():
+            return task.again
+        self._settle_scheduled = False
+        layer = self._get_settled_layer()
+        half_w, half_d = self.truck_width / 2.0 + 1.0, self.truck_depth / 2.0 + 1.0
+        selected = getattr(self, 'selected_box', None)
+        index = self._get_box_index()
+        for node in getattr(self, 'scene_boxes', []):
+            if not node or node.isEmpty() or node == selected or node.getKey() in layer:
+                continue
+            aabb = index.get(node.getKey())
+            if aabb is None or aabb[0] < -half_w or aabb[3] > half_w or aabb[1] < -half_d or aabb[4] > half_d:
+                continue
+            layer.settle(node.getKey(), node, (aabb[0] + aabb[3]) / 2.0, (aabb[1] + aabb[4]) / 2.0)
+        if layer.flush():
+            self.request_redraw()
+        return task.done
+
+    @property
+    def scene_boxes(self) -> list:
+        """Коробки текущего грузовика; присваивание нового списка сбрасывает пространственный индекс"""
+        if '_scene_boxes' not in self.__dict__:
+            self._scene_boxes = []
+        return self._scene_boxes
+
+    @scene_boxes.setter
+    def scene_boxes(self, nodes):
+        self._scene_boxes = nodes
+        self._scene_boxes_version = getattr(self, '_scene_boxes_version', 0) + 1
+
+    def _get_box_index(self) -> BoxSpatialHash:
+        if not hasattr(self, 'box_index'):
+            self.box_index = BoxSpatialHash()
+        boxes = self.scene_boxes
+        version = getattr(self, '_scene_boxes_version', 0)
+        # Список заменён целиком (даже с тем же числом коробок) или дополнен без index_box: перестроить
+        if getattr(self, '_box_index_version', 0) != version or len(self.box_index) != len(boxes):
+            self._box_index_version = version
+            self.box_index.clear()
+            for node in boxes:
+                self.index_box(node)
+        return self.box_index
+
+    def _box_aabb(self, node):
+        data = node.getPythonTag('box_data')
+        if not data:
+            return None
+        w = float(data.get('width', 100))
+        h = float(data.get('height', 100))
+        d = float(data.get('depth', 100))
+        mat = node.getMat(self.render)
+        p = mat.getRow3(3)
+        # Повёрнутая коробка (setHpr) занимает по осям мира сумму проекций своих полуосей
+        rows = [mat.getRow3(i) for i in range(3)]
+        half = [sum(abs(row[axis]) * size for row, size in zip(rows, (w / 2.0, d / 2.0, h / 2.0))) for axis in range(3)]
+        return (p.x - half[0], p.y - half[1], p.z - half[2], p.x + half[0], p.y + half[1], p.z + half[2])
+
+    def request_redraw(self, frames: int = 2):
+        """Пометить сцену изменённой: PandaWidget отрисует ещё frames кадров на полной частоте"""
+        self._redraw_frames = max(getattr(self, '_redraw_frames', 0), frames)
+
+    def consume_redraw(self) -> bool:
+        """Нужен ли следующий кадр; вызывается перед каждым taskMgr.step() в режиме по требованию"""
+        frames = getattr(self, '_redraw_frames', 0)
+        if frames > 0:
+            self._redraw_frames = frames - 1
+            return True
+        # Интервалы (анимации) и перетаскивание меняют сцену каждый кадр
+        return bool(getattr(self, 'drag_active', False) or ivalMgr.getNumIntervals() > 0)
+
+    def index_box(self, node):
+        """Обновить положение коробки в пространственном индексе (после создания или перемещения)"""
+        if not hasattr(self, 'box_index'):
+            self.box_index = BoxSpatialHash()
+        if node is None or node.isEmpty():
+            return
+        self._invalidate_pick()
+        aabb = self._box_aabb(node)
+        moved = self.box_index.get(node.getKey()) != aabb
+        if aabb is None:
+            self.box_index.remove(node.getKey())
+        else:
+            self.box_index.insert(node.getKey(), aabb, node)
+        self._track_box_load(node)
+        # Сдвинутая коробка выходит из слитого слоя до следующего оседания
+        if moved and hasattr(self, 'settled_layer'):
+            self.settled_layer.release(node.getKey())
+        self._schedule_settle()
+
+    def unindex_box(self, node):
+        """Убрать коробку из индекса; вызывать до removeNode"""
+        self._invalidate_pick()
+        if hasattr(self, 'box_index') and node is not None and not node.isEmpty():
+            self.box_index.remove(node.getKey())
+            if hasattr(self, 'settled_layer') and self.settled_layer.release(node.getKey()):
+                self._schedule_settle()
+            if hasattr(self, 'side_loads') and self.side_loads.remove(node.getKey()):
+                self.schedule_side_loads()
+
+    def _live_label_keys(self):
+        # Кроме сцены подписи держат спрятанные грузовики и ещё не вставшие коробки populate/stream:
+        # их слоты нельзя перерисовать чужим текстом до unstash или приземления
+        groups = [getattr(self, 'scene_boxes', [])]
+        groups.extend(entry[1] for entry in (getattr(self, '_scene_stash', None) or {}).values())
+        state = getattr(self, '_populate_state', None)
+        if state is not None:
+            groups.append(state['nodes'])
+        for nodes in groups:
+            for node in nodes:
+                if node and not node.isEmpty():
+                    yield from node.getPythonTag('label_keys') or ()
 
     @safe_method(
         component="TruckLoadingApp",
@@ -176,43 +343,26 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         texture.setMagfilter(Texture.FTLinear)
         texture.setAnisotropicDegree(2)
 
-    def create_box_wireframe(self, box_node, width, height, depth):
-        from panda3d.core import LineSegs
-
-        w, h, d = width / 2, height / 2, depth / 2
-
-        lines = LineSegs()
-        lines.setThickness(1.0)
-        lines.setColor(0, 0, 0, 1)
+    def _get_box_geometry(self) -> BoxGeometryCache:
+        if not hasattr(self, 'box_geometry'):
+            self.box_geometry = BoxGeometryCache()
+        return self.box_geometry
 
-        vertices = [
-            (-w, -d, -h), (w, -d, -h), (w, d, -h), (-w, d, -h),
-            (-w, -d, h), (w, -d, h), (w, d, h), (-w, d, h)
-        ]
-
-        edges = [
-            (0, 1), (1, 2), (2, 3), (3, 0),
-            (4, 5), (5, 6), (6, 7), (7, 4),
-            (0, 4), (1, 5), (2, 6), (3, 7)
-        ]
-
-        for start_idx, end_idx in edges:
-            start_pos = vertices[start_idx]
-            end_pos = vertices[end_idx]
-            lines.moveTo(*start_pos)
-            lines.drawTo(*end_pos)
+    def create_box_wireframe(self, box_node, width, height, depth):
+        from panda3d.core import GeomNode
 
-        wireframe_node = lines.create()
+        wireframe_node = GeomNode('box_wireframe')
+        wireframe_node.addGeom(self._get_box_geometry().wireframe_geom())
         wireframe_np = box_node.attachNewNode(wireframe_node)
+        wireframe_np.setScale(width, depth, height)
         wireframe_np.setRenderModeThickness(2.0)
         wireframe_np.setColor(0, 0, 0, 1)
         wireframe_np.setLightOff(1)
         wireframe_np.setDepthOffset(2)
+        tag_lod(wireframe_np, LOD_WIREFRAME)
 
     def create_box_markings(self, box_node, box_data, width, height, depth):
         from panda3d.core import CardMaker, TransparencyAttrib
-        import os
-        from utils.setting_deploy import get_resource_path
 
         markings = box_data.get('cargo_markings', [])
         if not markings:
@@ -222,19 +372,6 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         padding = size * float(self.marking_padding_factor)
         cols = 2
 
-        def load_marking_texture(mark_name: str, px: int):
-            tex = None
-            for ext in (".png", ".jpg", ".jpeg"):
-                rp = get_resource_path(f"assets/markings/{mark_name}{ext}")
-                if os.path.exists(rp):
-                    tex = self._load_texture_file(rp)
-                    if tex:
-                        return tex
-            sp = get_resource_path(f"assets/markings/{mark_name}.svg")
-            if os.path.exists(sp):
-                tex = self.convert_svg_to_texture(sp, px, px)
-            return tex
-
         faces = [
             ("front", lambda c, r: (-width / 2 + padding + size / 2 + c * (size + padding), -depth / 2 - 0.5,
                                     height / 2 - padding - size / 2 - r * (size + padding)), (0, 0, 0)),
@@ -252,29 +389,35 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
 
         per_face = min(len(markings), 4)
         raster_px = int(max(32, size * float(self.marking_raster_scale)))
+        atlas = self._get_marking_atlas()
+        regions = {}
+        for marking in markings[:per_face]:
+            try:
+                regions[marking] = atlas.get(marking, raster_px)
+            except Exception as e:
+                logging.warning(f"[Marking] Failed to resolve '{marking}': {e}")
 
         for face_name, pos_fn, hpr in faces:
             for i, marking in enumerate(markings[:per_face]):
                 try:
-                    texture = load_marking_texture(marking, raster_px)
-                    if not texture:
+                    region = regions.get(marking)
+                    if not region:
                         continue
+                    texture, u0, v0, u1, v1 = region
                     cm = CardMaker(f'marking_{face_name}_{marking}_{i}')
                     cm.setFrame(-size / 2, size / 2, -size / 2, size / 2)
+                    cm.setUvRange(Point2(u0, v0), Point2(u1, v1))
                     node = box_node.attachNewNode(cm.generate())
                     node.setTexture(texture)
                     node.setTransparency(TransparencyAttrib.MAlpha)
                     node.setLightOff(1)
                     node.setDepthOffset(2)
+                    tag_lod(node, LOD_MARKINGS)
                     col = i % cols
                     row = i // cols
                     x, y, z = pos_fn(col, row)
                     node.setPos(x, y, z)
                     node.setHpr(*hpr)
-                    self.safe_execute(
-                        lambda: self._apply_texture_filters(texture),
-                        fallback=lambda: None
-                    )
                 except Exception as e:
                     logging.warning(f"[Marking] Failed '{marking}' on {face_name}: {e}")
 
@@ -428,6 +571,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             props.setOrigin(0, 0)
             props.setSize(int(width), int(height))
             self.win.requestProperties(props)
+            self.request_redraw()
             try:
                 if hasattr(self, 'company_logo_np') and self.company_logo_np:
                     self._reposition_company_logo()
@@ -436,10 +580,6 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
 
     def create_3d_box_from_data(self, box_data, world_pos=None):
         """Создание 3D коробки точно как в content.html"""
-        from panda3d.core import (Material, Vec4, GeomNode, Geom, GeomVertexFormat,
-                                  GeomVertexData, GeomVertexWriter, GeomTriangles)
-        import random
-
         if world_pos is None:
             world_pos = (0, 0, 0)
 
@@ -447,11 +587,115 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         height = box_data['height']
         depth = box_data['depth']
         label = box_data.get('label', f'PO#{len(getattr(self, "scene_boxes", []))}')
-        weight = box_data.get('weight', 1.0)
 
         # Создаем узел коробки как в content.html (randomBox[mCyrcle])
         box_id = len(getattr(self, "scene_boxes", []))
-        box_node = self.render.attachNewNode(f"randomBox{box_id}")
+        box_node = self._build_box_node(box_data, box_id, self._get_boxes_root())
+
+        world_x, world_y, world_z = world_pos
+        final_pos = self.find_non_overlapping_position(world_x, world_y, world_z, width, height, depth)
+        box_node.setPos(final_pos[0], final_pos[1], final_pos[2] + height / 2)
+
+        if not hasattr(self, 'scene_boxes'):
+            self.scene_boxes = []
+        self._get_box_index()
+        self.scene_boxes.append(box_node)
+        self.index_box(box_node)
+
+        logging.info(f"Successfully dropped box: {label}")
+        return box_node
+
+    def stash_boxes(self, key, token=None) -> bool:
+        """Спрятать коробки сцены под ключом key (обычно id грузовика) вместо удаления.
+
+        token - объект, по которому unstash_boxes проверит актуальность (список TruckModel.boxes).
+        Объём кэша ограничен scene_stash_limit коробками, старые грузовики вытесняются по LRU.
+        """
+        from collections import OrderedDict
+        if not hasattr(self, '_scene_stash'):
+            self._scene_stash = OrderedDict()
+        self.drop_stash(key)
+        if self.is_populating():
+            # Недостроенную сцену не кэшируем
+            self.cancel_populate()
+            self._detach_scene_boxes(remove=True)
+            return False
+
+        nodes = [n for n in getattr(self, 'scene_boxes', []) if n and not n.isEmpty()]
+        holder = self._get_boxes_root().attachNewNode(f'stash_{key}')
+        for node in nodes:
+            node.reparentTo(holder)
+        # Спрятанный узел не рисуется и не участвует в обходе коллизий
+        holder.stash()
+        self._detach_scene_boxes(remove=False)
+        self._scene_stash[key] = (holder, nodes, token)
+
+        limit = int(getattr(self, 'scene_stash_limit', 2000))
+        total = sum(len(entry[1]) for entry in self._scene_stash.values())
+        while self._scene_stash and total > limit:
+            old_key, (old_holder, old_nodes, _) = self._scene_stash.popitem(last=False)
+            old_holder.removeNode()
+            total -= len(old_nodes)
+            logging.info(f"[Stash] Evicted {len(old_nodes)} boxes of {old_key}")
+        return key in self._scene_stash
+
+    def unstash_boxes(self, key, token=None) -> bool:
+        """Вернуть спрятанные коробки в сцену; False, если кэша нет или он устарел"""
+        entry = getattr(self, '_scene_stash', {}).pop(key, None)
+        if entry is None:
+            return False
+        holder, nodes, stashed_token = entry
+        if stashed_token is not token:
+            holder.removeNode()
+            return False
+        self._detach_scene_boxes(remove=True)
+        holder.unstash()
+        holder.getChildren().reparentTo(self._get_boxes_root())
+        holder.removeNode()
+        self.scene_boxes = list(nodes)
+        self._get_box_index()
+        return True
+
+    def drop_stash(self, key=None):
+        stash = getattr(self, '_scene_stash', None)
+        if not stash:
+            return
+        keys = list(stash) if key is None else [key]
+        for k in keys:
+            entry = stash.pop(k, None)
+            if entry is not None:
+                entry[0].removeNode()
+
+    def _detach_scene_boxes(self, remove: bool):
+        if hasattr(self, 'settled_layer'):
+            self.settled_layer.clear()
+        for node in getattr(self, 'scene_boxes', []) or []:
+            if remove and node and not node.isEmpty():
+                node.removeNode()
+        self.scene_boxes = []
+        if hasattr(self, 'box_index'):
+            self.box_index.clear()
+        if hasattr(self, 'side_loads'):
+            self.side_loads.clear()
+        self.selected_box = None
+        if getattr(self, 'hovered_box', None) is not None:
+            self.hovered_box = None
+            self.safe_execute(self.hide_box_info, fallback=lambda: None)
+        self._invalidate_pick()
+
+    def _build_box_node(self, box_data, box_id, parent):
+        """Узел коробки со всей геометрией, подписями и маркировками, без размещения и регистрации в сцене"""
+        from panda3d.core import GeomNode, CollisionNode
+        import json
+        import random
+
+        width = box_data['width']
+        height = box_data['height']
+        depth = box_data['depth']
+        label = box_data.get('label', f'PO#{box_id}')
+        weight = box_data.get('weight', 1.0)
+
+        box_node = parent.attachNewNode(f"randomBox{box_id}")
 
         # Теги как в content.html
         box_node.setPythonTag('box_id', box_id)
@@ -460,28 +704,13 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         box_node.setPythonTag('is_rotated', False)
         box_node.setPythonTag('weight', weight)
 
-        # Создаем геометрию коробки
-        vdata = GeomVertexData('box', GeomVertexFormat.get_v3n3(), Geom.UHStatic)
-        vdata.setNumRows(24)
-        vwriter = GeomVertexWriter(vdata, 'vertex')
-        nwriter = GeomVertexWriter(vdata, 'normal')
-
-        self.create_box_geometry(vwriter, nwriter, width, height, depth)
-
-        geom = Geom(vdata)
-        tri = GeomTriangles(Geom.UHStatic)
-
-        for i in range(0, 24, 4):
-            tri.addVertices(i, i + 1, i + 2)
-            tri.addVertices(i, i + 2, i + 3)
-
-        geom.addPrimitive(tri)
+        # Геометрия общая для всех коробок: единичный куб, масштабированный до размеров
+        geometry = self._get_box_geometry()
         geom_node = GeomNode('box_geom')
-        geom_node.addGeom(geom)
+        geom_node.addGeom(geometry.cube_geom())
 
         box_geom_np = box_node.attachNewNode(geom_node)
-
-        import json
+        box_geom_np.setScale(width, depth, height)
 
         box_color_key = json.dumps([width, depth, height])
 
@@ -497,13 +726,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         box_color = self.box_colors[box_color_key]
         r, g, b = box_color
 
-        material = Material()
-        material.setDiffuse(Vec4(0, 0, 0, 1.0))
-        material.setSpecular(Vec4(0, 0, 0, 1.0))
-        material.setEmission(Vec4(r, g, b, 1.0))
-        material.setShininess(1.0)
-
-        box_geom_np.setMaterial(material)
+        box_geom_np.setMaterial(geometry.material(r, g, b))
         box_geom_np.setLightOff(1)
         box_geom_np.setColor(r, g, b, 1.0)
         box_geom_np.clearRenderMode()
@@ -512,35 +735,179 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         self.create_box_wireframe(box_node, width, height, depth)
         self.create_box_text_labels_static(box_node, box_data, width, height, depth)
 
-        from panda3d.core import CollisionNode, CollisionBox
         collision_node = CollisionNode('box_collision')
-        collision_node.addSolid(CollisionBox(Point3(0, 0, 0), width / 2, depth / 2, height / 2))
+        # Единичное тело под масштабированным box_geom_np
+        collision_node.addSolid(geometry.collision_solid())
         collision_node.setFromCollideMask(0)
         collision_node.setIntoCollideMask(1)
-        collision_np = box_geom_np.attachNewNode(collision_node)
-
-        world_x, world_y, world_z = world_pos
-        final_pos = self.find_non_overlapping_position(world_x, world_y, world_z, width, height, depth)
-        box_node.setPos(final_pos[0], final_pos[1], final_pos[2] + height / 2)
+        box_geom_np.attachNewNode(collision_node)
 
         box_node.setPythonTag('box_data', box_data)
 
-        if not hasattr(self, 'scene_boxes'):
-            self.scene_boxes = []
-        self.scene_boxes.append(box_node)
-
         try:
             self.create_box_markings(box_node=box_node, box_data=box_data, width=width, height=height, depth=depth)
         except Exception as e:
             logging.warning(f"Could not create markings for {label}: {e}")
-
-        logging.info(f"Successfully dropped box: {label}")
-        self.safe_execute(
-            self.update_side_loads,
-            fallback=lambda: None
-        )
         return box_node
 
+    def populate_boxes(self, records, per_frame: Optional[int] = None, frame_budget: float = 0.008,
+                       on_progress=None, on_done=None):
+        """Пакетное добавление коробок с готовыми позициями (записи как в TruckModel.boxes:
+        {'box_data', 'pos', 'hpr'}). Поиск места в зоне размещения не выполняется.
+
+        Без per_frame всё строится сразу и возвращается список узлов. С per_frame построение
+        растягивается на несколько кадров (не больше per_frame коробок и frame_budget секунд за кадр),
+        on_progress(done, total) вызывается после каждого кадра, on_done(nodes) - в конце.
+        """
+        self.cancel_populate()
+        records = list(records or [])
+        batch = NodePath('boxes_batch')
+        state = {'batch': batch, 'records': records, 'next': 0, 'nodes': [],
+                 'base_id': len(getattr(self, 'scene_boxes', [])), 'on_progress': on_progress, 'on_done': on_done}
+
+        if per_frame is None:
+            self._populate_step(state, len(records), None)
+            return self._finish_populate(state)
+
+        self._populate_state = state
+        self.taskMgr.add(self._populate_task, 'populate-boxes', extraArgs=[state, max(1, int(per_frame)), frame_budget],
+                         appendTask=True)
+        return None
+
+    def stream_boxes(self, records, per_frame: int = 4, frame_budget: float = 0.004, drop_height: float = 120.0,
+                     drop_time: float = 0.3, on_progress=None, on_done=None):
+        """Показ укладки в порядке загрузки: за кадр строится не больше per_frame коробок и не дольше
+        frame_budget секунд, каждая опускается на место с CubicEase за drop_time секунд.
+
+        Коробка попадает в scene_boxes и индекс, когда встала на место; on_done(nodes) - после последней.
+        Отменяется cancel_populate (в том числе при переключении грузовика).
+        """
+        self.cancel_populate()
+        records = list(records or [])
+        state = {'batch': self._get_boxes_root().attachNewNode('boxes_stream'), 'records': records, 'next': 0,
+                 'nodes': [], 'base_id': len(getattr(self, 'scene_boxes', [])), 'on_progress': on_progress,
+                 'on_done': on_done, 'falling': [], 'landed': [], 'drop': (float(drop_height), max(0.0, drop_time))}
+        self._populate_state = state
+        self.taskMgr.add(self._stream_task, 'populate-boxes', extraArgs=[state, max(1, int(per_frame)), frame_budget],
+                         appendTask=True)
+
+    def is_populating(self) -> bool:
+        return getattr(self, '_populate_state', None) is not None
+
+    def cancel_populate(self):
+        state = getattr(self, '_populate_state', None)
+        if state is None:
+            return
+        self.taskMgr.remove('populate-boxes')
+        self._populate_state = None
+        if state.get('landed'):
+            # Уже вставшие коробки потока успели попасть в сцену - убираем их оттуда
+            landed = {node.getKey() for node in state['landed']}
+            for node in state['landed']:
+                self.unindex_box(node)
+            self.scene_boxes = [n for n in getattr(self, 'scene_boxes', []) if n.getKey() not in landed]
+        state['batch'].removeNode()
+        logging.info(f"[Populate] Cancelled after {len(state['nodes'])}/{len(state['records'])} boxes")
+
+    def _populate_task(self, state, per_frame, frame_budget, task):
+        if state is not getattr(self, '_populate_state', None):
+            return task.done
+        self._populate_step(state, per_frame, frame_budget)
+        # В режиме отрисовки по требованию без запроса кадра задача шагала бы на idle_fps
+        self.request_redraw()
+        if state['next'] < len(state['records']):
+            return task.cont
+        self._populate_state = None
+        self._finish_populate(state)
+        return task.done
+
+    def _stream_task(self, state, per_frame, frame_budget, task):
+        if state is not getattr(self, '_populate_state', None):
+            return task.done
+        self._populate_step(state, per_frame, frame_budget)
+        self._advance_falling(state)
+        self.request_redraw()
+        if state['next'] < len(state['records']) or state['falling']:
+            return task.cont
+        self._populate_state = None
+        state['batch'].getChildren().reparentTo(self._get_boxes_root())
+        state['batch'].removeNode()
+        logging.info(f"[Populate] Streamed {len(state['nodes'])} of {len(state['records'])} boxes")
+        if state['on_done']:
+            self.safe_execute(lambda: state['on_done'](state['nodes']), fallback=lambda: None)
+        return task.done
+
+    def _advance_falling(self, state):
+        drop_height, drop_time = state['drop']
+        now = time.perf_counter()
+        falling = []
+        for node, started, z in state['falling']:
+            t = (now - started) / drop_time if drop_time > 0 else 1.0
+            if node.isEmpty():
+                continue
+            if t < 1.0:
+                node.setZ(z + drop_height * (1.0 - CubicEase.ease_in_out(t)))
+                falling.append((node, started, z))
+                continue
+            node.setZ(z)
+            if not hasattr(self, 'scene_boxes'):
+                self.scene_boxes = []
+            self.scene_boxes.append(node)
+            self.index_box(node)
+            state['landed'].append(node)
+        state['falling'] = falling
+
+    def _iter_box_nodes(self, state):
+        """Генератор: строит коробки по записям в порядке загрузки, по одной за шаг (None - запись пропущена)"""
+        records = state['records']
+        while state['next'] < len(records):
+            record = records[state['next']]
+            state['next'] += 1
+            try:
+                node = self._build_box_node(record.get('box_data', {}), state['base_id'] + len(state['nodes']),
+                                            state['batch'])
+                pos = record.get('pos', {}) or {}
+                hpr = record.get('hpr', {}) or {}
+                node.setPos(float(pos.get('x', 0)), float(pos.get('y', 0)), float(pos.get('z', 0)))
+                node.setHpr(float(hpr.get('h', 0)), float(hpr.get('p', 0)), float(hpr.get('r', 0)))
+                state['nodes'].append(node)
+            except Exception as e:
+                logging.warning(f"[Populate] Skipped box {state['next'] - 1}: {e}")
+                node = None
+            yield node
+
+    def _populate_step(self, state, limit, frame_budget):
+        if 'source' not in state:
+            state['source'] = self._iter_box_nodes(state)
+        started = time.perf_counter()
+        built = 0
+        for node in state['source']:
+            built += 1
+            if node is not None and 'falling' in state:
+                z = node.getZ()
+                node.setZ(z + state['drop'][0])
+                state['falling'].append((node, time.perf_counter(), z))
+            if built >= limit or (frame_budget is not None and time.perf_counter() - started >= frame_budget):
+                break
+        if state['on_progress']:
+            self.safe_execute(lambda: state['on_progress'](state['next'], len(state['records'])), fallback=lambda: None)
+
+    def _finish_populate(self, state):
+        # Все узлы переносятся под boxes_root одним вызовом, затем индексируются; нагрузки - один пересчёт за кадр
+        root = self._get_boxes_root()
+        state['batch'].getChildren().reparentTo(root)
+        state['batch'].removeNode()
+        if not hasattr(self, 'scene_boxes'):
+            self.scene_boxes = []
+        self._get_box_index()
+        for node in state['nodes']:
+            self.scene_boxes.append(node)
+            self.index_box(node)
+        logging.info(f"[Populate] Added {len(state['nodes'])} of {len(state['records'])} boxes")
+        if state['on_done']:
+            self.safe_execute(lambda: state['on_done'](state['nodes']), fallback=lambda: None)
+        return state['nodes']
+
     def find_non_overlapping_position(self, start_x, start_y, start_z, box_width, box_height, box_depth):
         """Умный алгоритм размещения коробок перед грузовиком в сетке"""
 
@@ -561,28 +928,25 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             return (safe_x, safe_y, safe_z)
 
         max_stack_levels = 3
-        test_positions = []
+        grid = StagingGrid(placement_zone_x_left, placement_zone_y_start,
+                           placement_zone_x_right, placement_zone_y_end, cell=min_gap)
+        index = self._get_box_index()
 
         for level in range(max_stack_levels):
             level_z = ground_level + level * (150 + min_gap)
 
-            x_positions = list(range(int(placement_zone_x_left), int(placement_zone_x_right) + 1, grid_step))
-            y_positions = list(range(int(placement_zone_y_start), int(placement_zone_y_end) + 1, grid_step))
-
-            grid_positions = []
-            for x in x_positions:
-                for y in y_positions:
-                    distance = math.sqrt((x - start_x) ** 2 + (y - start_y) ** 2)
-                    grid_positions.append((distance, x, y, level_z))
-
-            grid_positions.sort(key=lambda pos: pos[0])
-
-            for distance, x, y, z in grid_positions:
-                test_positions.append((x, y, z))
+            # Препятствия этого уровня: коробки зоны, пересекающие [level_z, level_z + h] с учётом зазора
+            zone = (placement_zone_x_left - box_width / 2, placement_zone_y_start - box_depth / 2, level_z,
+                    placement_zone_x_right + box_width / 2, placement_zone_y_end + box_depth / 2, level_z + box_height)
+            obstacles = []
+            for _, aabb, node in index.query(zone, margin=min_gap):
+                if node.isEmpty():
+                    continue
+                obstacles.append((aabb[0] - min_gap, aabb[1] - min_gap, aabb[3] + min_gap, aabb[4] + min_gap))
 
-        for i, (test_x, test_y, test_z) in enumerate(test_positions):
-            if self.is_position_free(test_x, test_y, test_z, box_width, box_height, box_depth, min_gap):
-                return (test_x, test_y, test_z)
+            spot = grid.find_nearest(obstacles, box_width, box_depth, start_x, start_y)
+            if spot is not None:
+                return (spot[0], spot[1], level_z)
 
         logging.warning("No space in primary placement zone, searching in extended area")
         extended_positions = []
@@ -619,66 +983,77 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         new_min_z = test_z
         new_max_z = test_z + box_height
 
-        for existing_box in self.scene_boxes:
-            if existing_box.isEmpty():
-                continue
-
-            existing_pos = existing_box.getPos()
-            existing_data = existing_box.getPythonTag('box_data')
-            if not existing_data:
-                continue
-
-            existing_width = existing_data.get('width', 100)
-            existing_height = existing_data.get('height', 100)
-            existing_depth = existing_data.get('depth', 100)
-
-            exist_min_x = existing_pos.x - existing_width / 2
-            exist_max_x = existing_pos.x + existing_width / 2
-            exist_min_y = existing_pos.y - existing_depth / 2
-            exist_max_y = existing_pos.y + existing_depth / 2
-            exist_min_z = existing_pos.z - existing_height / 2
-            exist_max_z = existing_pos.z + existing_height / 2
-
-            if (new_max_x + min_gap > exist_min_x and new_min_x - min_gap < exist_max_x and
-                    new_max_y + min_gap > exist_min_y and new_min_y - min_gap < exist_max_y and
-                    new_max_z + min_gap > exist_min_z and new_min_z - min_gap < exist_max_z):
+        # Только коробки из соседних ячеек индекса, пересекающиеся с объёмом + зазор
+        new_aabb = (new_min_x, new_min_y, new_min_z, new_max_x, new_max_y, new_max_z)
+        for _, _, existing_box in self._get_box_index().query(new_aabb, margin=min_gap):
+            if not existing_box.isEmpty():
                 return False
 
         return True
 
-    def create_box_geometry(self, vwriter, nwriter, width, height, depth):
-        w, h, d = width / 2, height / 2, depth / 2
-
-        vertices = [
-            # Front face
-            (-w, -d, -h), (w, -d, -h), (w, -d, h), (-w, -d, h),
-            # Back face
-            (w, d, -h), (-w, d, -h), (-w, d, h), (w, d, h),
-            # Left face
-            (-w, d, -h), (-w, -d, -h), (-w, -d, h), (-w, d, h),
-            # Right face
-            (w, -d, -h), (w, d, -h), (w, d, h), (w, -d, h),
-            # Top face
-            (-w, -d, h), (w, -d, h), (w, d, h), (-w, d, h),
-            # Bottom face
-            (-w, d, -h), (w, d, -h), (w, -d, -h), (-w, -d, -h)
-        ]
+    def create_box_text_labels_static(self, box_node, box_data, width, height, depth):
+        """Надписи на всех гранях: одна карточка на грань с подписью из атласа"""
+        from panda3d.core import CardMaker, TransparencyAttrib
+
+        atlas = self._get_label_atlas()
+        if atlas is None:
+            self._create_box_text_nodes(box_node, box_data, width, height, depth)
+            return
 
-        normals = [
-            (0, -1, 0), (0, -1, 0), (0, -1, 0), (0, -1, 0),
-            (0, 1, 0), (0, 1, 0), (0, 1, 0), (0, 1, 0),
-            (-1, 0, 0), (-1, 0, 0), (-1, 0, 0), (-1, 0, 0),
-            (1, 0, 0), (1, 0, 0), (1, 0, 0), (1, 0, 0),
-            (0, 0, 1), (0, 0, 1), (0, 0, 1), (0, 0, 1),
-            (0, 0, -1), (0, 0, -1), (0, 0, -1), (0, 0, -1)
+        label = box_data['label']
+        main_text_scale = width * 0.080
+        units_per_px = main_text_scale / atlas.main_px
+        card_w = atlas.slot_w * units_per_px
+        card_h = atlas.slot_h * units_per_px
+
+        fb_lines = (label, f"H:{int(height)}  D:{int(depth)}")
+        lr_lines = (label, f"W:{int(width)}")
+        faces = [
+            ("front", fb_lines, (0, -depth / 2 - 2, 0), (0, 0, 0)),
+            ("back", fb_lines, (0, depth / 2 + 2, 0), (180, 0, 0)),
+            ("left", lr_lines, (-width / 2 - 2, 0, 0), (90, 0, 0)),
+            ("right", lr_lines, (width / 2 + 2, 0, 0), (-90, 0, 0)),
+            ("top", (label,), (0, 0, height / 2 + 2), (0, -90, 0)),
+            ("bottom", (label,), (0, 0, -height / 2 - 2), (0, 90, 0))
         ]
 
-        for i, (vertex, normal) in enumerate(zip(vertices, normals)):
-            vwriter.addData3f(*vertex)
-            nwriter.addData3f(*normal)
+        slots = [atlas.acquire(lines, lines) for _, lines, _, _ in faces]
+        if any(slot is None for slot in slots):
+            # Атлас заполнен живыми подписями: эта коробка получает обычные TextNode, а уже выданные ей слоты
+            # отдаются под вытеснение
+            atlas.release(lines for (_, lines, _, _), slot in zip(faces, slots) if slot is not None)
+            self._create_box_text_nodes(box_node, box_data, width, height, depth)
+            return
 
-    def create_box_text_labels_static(self, box_node, box_data, width, height, depth):
-        """Создание надписей на коробке на всех гранях с размерами"""
+        # Двухстрочный слот режется на две карточки без перекрытия: подпись и размеры скрываются по LOD раздельно
+        split = 0.58
+        keys = []
+        for (face_name, lines, pos, rotation), slot in zip(faces, slots):
+            page, u0, v0, u1, v1 = slot
+            keys.append(lines)
+            if len(lines) > 1:
+                v_split = v1 - split * (v1 - v0)
+                z_split = card_h / 2 - split * card_h
+                parts = [(f'label_{face_name}', z_split, card_h / 2, v_split, v1, LOD_LABELS),
+                         (f'dims_{face_name}', -card_h / 2, z_split, v0, v_split, LOD_DIMENSIONS)]
+            else:
+                parts = [(f'label_{face_name}', -card_h / 2, card_h / 2, v0, v1, LOD_LABELS)]
+            for name, z0, z1, pv0, pv1, lod_class in parts:
+                cm = CardMaker(name)
+                cm.setFrame(-card_w / 2, card_w / 2, z0, z1)
+                cm.setUvRange(Point2(u0, pv0), Point2(u1, pv1))
+                card_np = box_node.attachNewNode(cm.generate())
+                card_np.setTexture(atlas.textures[page])
+                card_np.setTransparency(TransparencyAttrib.MAlpha)
+                card_np.setPos(*pos)
+                card_np.setHpr(*rotation)
+                card_np.setLightOff(1)
+                card_np.setDepthOffset(5)
+                tag_lod(card_np, lod_class)
+        box_node.setPythonTag('label_keys', tuple(keys))
+
+    def _create_box_text_nodes(self, box_node, box_data, width, height, depth):
+        """Запасной вариант без атласа: отдельные TextNode на каждую надпись"""
         from panda3d.core import TextNode
 
         label = box_data['label']
@@ -710,6 +1085,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             face_text_np.setColor(0, 0, 0, 1)
             face_text_np.setLightOff(1)
             face_text_np.setDepthOffset(5)
+            tag_lod(face_text_np, LOD_LABELS)
 
         # Размеры на соответствующих гранях
         dimension_text_scale = main_text_scale * 0.7
@@ -734,6 +1110,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             width_text_np.setColor(0, 0, 0, 1)
             width_text_np.setLightOff(1)
             width_text_np.setDepthOffset(5)
+            tag_lod(width_text_np, LOD_DIMENSIONS)
 
         # Высота на передней и задней гранях
         height_positions = [
@@ -755,6 +1132,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             height_text_np.setColor(0, 0, 0, 1)
             height_text_np.setLightOff(1)
             height_text_np.setDepthOffset(5)
+            tag_lod(height_text_np, LOD_DIMENSIONS)
 
         # Глубина на передней и задней гранях
         depth_positions = [
@@ -776,6 +1154,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             depth_text_np.setColor(0, 0, 0, 1)
             depth_text_np.setLightOff(1)
             depth_text_np.setDepthOffset(5)
+            tag_lod(depth_text_np, LOD_DIMENSIONS)
 
     def remove_material_specular(self, model):
         if not model or model.isEmpty():
@@ -786,19 +1165,10 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             self.graphics_manager._update_model_specular(model, enabled)
 
     def load_models(self):
+        """Асинхронная загрузка колеса и кабины; сцена и UI не ждут готовности мешей"""
         from utils.setting_deploy import get_resource_path
-        from panda3d.core import getModelPath
         logger.info("Starting models loading...")
 
-        # Добавляем путь к assets/models в model path Panda3D
-        models_dir = get_resource_path("assets/models")
-        if os.path.exists(models_dir):
-            # Конвертируем Windows путь в Unix стиль для Panda3D
-            models_dir_unix = models_dir.replace('\\', '/').replace('E:/', '/e/')
-            getModelPath().appendPath(models_dir_unix)
-            logger.info(f"Added to model path: {models_dir_unix}")
-            logger.info(f"Current model path: {getModelPath()}")
-
         # Проверяем доступные форматы моделей в правильном порядке приоритета
         model_formats = [
             ("weel.obj", "lorry.obj"),  # OBJ формат (надежный)
@@ -808,136 +1178,151 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         wheel_path = None
         lorry_path = None
 
-        # Ищем доступные файлы моделей с использованием get_resource_path
         for wheel_file, lorry_file in model_formats:
             wheel_full_path = get_resource_path(f"assets/models/{wheel_file}")
             lorry_full_path = get_resource_path(f"assets/models/{lorry_file}")
 
             if os.path.exists(wheel_full_path) and os.path.exists(lorry_full_path):
-                wheel_path = wheel_file  # Используем относительный путь для Panda3D
-                lorry_path = lorry_file  # Используем относительный путь для Panda3D
+                wheel_path = wheel_full_path
+                lorry_path = lorry_full_path
                 logger.info(f"Found model files: {wheel_full_path}, {lorry_full_path}")
-                logger.info(f"Will load using relative paths: {wheel_path}, {lorry_path}")
                 break
 
         if not wheel_path:
             logger.warning("No model files found, using fallback paths")
-            wheel_path = "weel.glb"
-            lorry_path = "lorry.glb"
+            wheel_path = get_resource_path("assets/models/weel.glb")
+            lorry_path = get_resource_path("assets/models/lorry.glb")
 
         self.wheel_model = None
-        try:
-            logger.info(f"Loading wheel model from {wheel_path}...")
-
-            if wheel_path.endswith('.obj'):
-                mtl_path = wheel_path.replace('.obj', '.mtl')
-                if os.path.exists(mtl_path):
-                    logger.info(f"Found wheel material file: {mtl_path}")
-                else:
-                    logger.warning(f"Wheel material file not found: {mtl_path}")
-
-            self.wheel_model = self.loader.loadModel(wheel_path)
-
-            if self.wheel_model and not self.wheel_model.isEmpty():
-                logger.info("Wheel model loaded successfully!")
-            else:
-                logger.error("Wheel model is empty or invalid")
-                self.wheel_model = None
-        except Exception as e:
-            logger.error(f"Error loading wheel model: {e}")
+        self.lorry_model = None
+        self._models_pending = 2
+        self._request_model(wheel_path, self._configure_wheel_model)
+        self._request_model(lorry_path, self._configure_lorry_model)
 
-        if self.wheel_model and not self.wheel_model.isEmpty():
-            logger.info("Configuring wheel model...")
+    def _get_model_cache(self) -> ModelCache:
+        if not hasattr(self, 'model_cache'):
+            self.model_cache = ModelCache()
+        return self.model_cache
 
-            self.box_weel_move = self.render.attachNewNode("boxWeelMove")
-            truck_long = max(1000, self.truck_width)
-            weel_position = 50
-            self.box_weel_move.setPos(weel_position - truck_long / 2, WHEEL_CABIN_HEIGHT, 0)
+    def _request_model(self, source_path, configure):
+        from panda3d.core import Filename
 
-            self.wheel_model.reparentTo(self.box_weel_move)
-            self.wheel_model.setScale(100, 100, 100)
-            self.wheel_model.setTwoSided(True)
-            self.wheel_model.setHpr(0, 90, 0)
-            self.wheel_model.setPos(0, 125, 0)
+        cache = self._get_model_cache()
+        cached = cache.lookup(source_path) if os.path.exists(source_path) else None
+        load_path = cached or source_path
+        logger.info(f"Loading model {os.path.basename(source_path)} from {'BAM cache' if cached else 'source'}...")
+        started = time.perf_counter()
 
-            materials = self.wheel_model.findAllMaterials()
-            if materials:
-                logger.info(f"Wheel has {len(materials)} materials, keeping original")
-            else:
-                logger.warning("No materials found for wheel, creating default")
-                wheel_mat = Material()
-                wheel_mat.setShininess(12.8)
-                wheel_mat.setSpecular((0.3, 0.3, 0.3, 1))
-                wheel_mat.setDiffuse((0.2, 0.2, 0.2, 1))
-                wheel_mat.setEmission((0.36, 0.36, 0.36, 1))
-                self.wheel_model.setMaterial(wheel_mat, 1)
-            self.remove_material_specular(self.wheel_model)
-            logger.info("Wheel configured successfully")
+        def on_loaded(model):
+            try:
+                if model is None or model.isEmpty():
+                    logger.error(f"Model {load_path} is empty or invalid")
+                    if cached:
+                        # Битый кэш: повторяем из исходника
+                        os.remove(cached)
+                        self._models_pending += 1
+                        self._request_model(source_path, configure)
+                    return
+                logger.info(f"Model {os.path.basename(source_path)} loaded in {time.perf_counter() - started:.2f}s")
+                if not cached:
+                    cache.store(source_path, model)
+                configure(model)
+                if self.graphics_manager:
+                    self.graphics_manager.apply_all_settings()
+            except Exception as e:
+                logger.error(f"Error configuring model {source_path}: {e}")
+            finally:
+                self._models_pending -= 1
+                if self._models_pending <= 0:
+                    self.models_loaded = True
+                    logger.info("Models loading completed")
+                self.request_redraw()
 
-        self.lorry_model = None
         try:
-            logger.info(f"Loading cabin model from {lorry_path}...")
-
-            if lorry_path.endswith('.obj'):
-                mtl_path = lorry_path.replace('.obj', '.mtl')
-                if os.path.exists(mtl_path):
-                    logger.info(f"Found cabin material file: {mtl_path}")
-                else:
-                    logger.warning(f"Cabin material file not found: {mtl_path}")
-
-            self.lorry_model = self.loader.loadModel(lorry_path)
-
-            if self.lorry_model and not self.lorry_model.isEmpty():
-                logger.info("Cabin model loaded successfully!")
-            else:
-                logger.error("Cabin model is empty or invalid")
-                self.lorry_model = None
+            self.loader.loadModel(Filename.fromOsSpecific(load_path), callback=on_loaded)
         except Exception as e:
-            logger.error(f"Error loading cabin model: {e}")
+            logger.error(f"Error loading model {load_path}: {e}")
+            on_loaded(None)
 
-        if self.lorry_model and not self.lorry_model.isEmpty():
-            logger.info("Configuring cabin model...")
+    def _configure_wheel_model(self, model):
+        logger.info("Configuring wheel model...")
+        self.wheel_model = model
 
-            self.box_lorry_move = self.render.attachNewNode("boxLorryMove")
-            truck_long = max(1000, self.truck_width)
-            lorry_position = -400
-            self.box_lorry_move.setPos(lorry_position + truck_long / 2, WHEEL_CABIN_HEIGHT, 0)
+        self.box_weel_move = self.render.attachNewNode("boxWeelMove")
+        truck_long = max(1000, self.truck_width)
+        weel_position = 50
+        self.box_weel_move.setPos(weel_position - truck_long / 2, WHEEL_CABIN_HEIGHT, 0)
 
-            self.lorry_model.reparentTo(self.box_lorry_move)
-            self.lorry_model.setScale(100, 100, 100)
-            self.lorry_model.setTwoSided(True)
-            self.lorry_model.setHpr(0, 90, 0)
-            self.lorry_model.setPos(0, 125, 0)
+        self.wheel_model.reparentTo(self.box_weel_move)
+        self.wheel_model.setScale(100, 100, 100)
+        self.wheel_model.setTwoSided(True)
+        self.wheel_model.setHpr(0, 90, 0)
+        self.wheel_model.setPos(0, 125, 0)
 
-            materials = self.lorry_model.findAllMaterials()
-            if materials:
-                logger.info(f"Cabin has {len(materials)} materials, keeping original")
-            else:
-                logger.warning("No materials found for cabin, creating default")
-                cabin_mat = Material()
-                cabin_mat.setShininess(12.8)
-                cabin_mat.setSpecular((0.3, 0.3, 0.3, 1))
-                cabin_mat.setDiffuse((0.3, 0.35, 0.4, 1))
-                cabin_mat.setEmission((0.54, 0.63, 0.72, 1))
-                self.lorry_model.setMaterial(cabin_mat, 1)
-            self.remove_material_specular(self.lorry_model)
-            logger.info("Cabin configured successfully")
-
-        logger.info("Models loading completed")
+        materials = self.wheel_model.findAllMaterials()
+        if materials:
+            logger.info(f"Wheel has {len(materials)} materials, keeping original")
+        else:
+            logger.warning("No materials found for wheel, creating default")
+            wheel_mat = Material()
+            wheel_mat.setShininess(12.8)
+            wheel_mat.setSpecular((0.3, 0.3, 0.3, 1))
+            wheel_mat.setDiffuse((0.2, 0.2, 0.2, 1))
+            wheel_mat.setEmission((0.36, 0.36, 0.36, 1))
+            self.wheel_model.setMaterial(wheel_mat, 1)
+        self.remove_material_specular(self.wheel_model)
+        logger.info("Wheel configured successfully")
+
+    def _configure_lorry_model(self, model):
+        logger.info("Configuring cabin model...")
+        self.lorry_model = model
+
+        self.box_lorry_move = self.render.attachNewNode("boxLorryMove")
+        truck_long = max(1000, self.truck_width)
+        lorry_position = -400
+        self.box_lorry_move.setPos(lorry_position + truck_long / 2, WHEEL_CABIN_HEIGHT, 0)
 
-        if self.graphics_manager:
-            logger.info("Applying saved graphics settings to loaded models...")
-            self.graphics_manager.apply_all_settings()
+        self.lorry_model.reparentTo(self.box_lorry_move)
+        self.lorry_model.setScale(100, 100, 100)
+        self.lorry_model.setTwoSided(True)
+        self.lorry_model.setHpr(0, 90, 0)
+        self.lorry_model.setPos(0, 125, 0)
+
+        materials = self.lorry_model.findAllMaterials()
+        if materials:
+            logger.info(f"Cabin has {len(materials)} materials, keeping original")
+        else:
+            logger.warning("No materials found for cabin, creating default")
+            cabin_mat = Material()
+            cabin_mat.setShininess(12.8)
+            cabin_mat.setSpecular((0.3, 0.3, 0.3, 1))
+            cabin_mat.setDiffuse((0.3, 0.35, 0.4, 1))
+            cabin_mat.setEmission((0.54, 0.63, 0.72, 1))
+            self.lorry_model.setMaterial(cabin_mat, 1)
+        self.remove_material_specular(self.lorry_model)
+        logger.info("Cabin configured successfully")
 
     def setup_scene(self):
         self.render.setAntialias(AntialiasAttrib.MMultisample)
         self.setBackgroundColor(*BACKGROUND_COLOR)
         self.disableMouse()
+        self.diagnostics = SceneDiagnostics(self, get_logger().performance_metrics)
 
     def setup_camera(self):
         self.camLens.setFov(45.8)
         self.arc = ArcCamera(self)
-        self.taskMgr.add(self.arc.tick, "camera_update")
+        self.taskMgr.add(self.diagnostics.timed("camera_update", self.arc.tick), "camera_update")
+        self.box_lod = BoxLod(self.camNode)
+        self.taskMgr.add(self._lod_task, "box_lod_update", sort=51)
+
+    def _lod_task(self, task):
+        """Скрытие деталей коробок по расстоянию камеры; сцена не обходится, меняется только маска камеры"""
+        settings = getattr(getattr(self, 'graphics_manager', None), 'settings', None)
+        if settings is not None:
+            distances = [getattr(settings, key) for key in LOD_SETTING_KEYS]
+            if self.box_lod.update(self.arc.radius, distances, bool(getattr(settings, 'lod_enabled', True))):
+                self.request_redraw()
+        return task.cont
 
     def setup_graphics(self):
         self.graphics_manager = GraphicsManager(self)
@@ -1033,7 +1418,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         self.hovered_box = None
         self.deleted_boxes = []
         logging.info("[Controls] Adding mouse_hover_task to taskMgr")
-        self.taskMgr.add(self.mouse_hover_task, "mouse_hover_task")
+        self.taskMgr.add(self.diagnostics.timed("mouse_hover_task", self.mouse_hover_task), "mouse_hover_task")
         logging.info("[Controls] Controls setup completed with hover tracking and key handlers")
 
     def focus_on_truck(self):
@@ -1048,6 +1433,12 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         self.arc.beta = math.pi / 4
         self.arc.update()
 
+    def render_load_sheets(self, truck_manager, out_dir: str, views=None, on_progress=None):
+        """Сохранить виды всех грузовиков в PNG (внеэкранный буфер, см. OffscreenRenderer)"""
+        if getattr(self, 'offscreen_renderer', None) is None:
+            self.offscreen_renderer = OffscreenRenderer(self)
+        return self.offscreen_renderer.render_trucks(truck_manager, out_dir, views or DEFAULT_VIEWS, on_progress)
+
     def shift_down(self):
         self.is_shift_down = True
 
@@ -1078,30 +1469,49 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             return
         self.arc.on_wheel_out()
 
-    def on_right_down(self):
-        self.drag_active = False
-        if not self.mouseWatcherNode.hasMouse():
-            return
-        mouse_x = self.mouseWatcherNode.getMouseX()
-        mouse_y = self.mouseWatcherNode.getMouseY()
-        from panda3d.core import CollisionTraverser, CollisionNode, CollisionRay, CollisionHandlerQueue
-        picker = CollisionTraverser()
-        pq = CollisionHandlerQueue()
-        pickerNode = CollisionNode('moveRay')
-        pickerNP = self.camera.attachNewNode(pickerNode)
-        pickerNode.setFromCollideMask(1)
-        pickerNode.setIntoCollideMask(0)
-        ray = CollisionRay()
-        pickerNode.addSolid(ray)
-        picker.addCollider(pickerNP, pq)
+    def _get_boxes_root(self):
+        """Общий родитель всех коробок: пикинг обходит только его, а не весь render"""
+        if getattr(self, 'boxes_root', None) is None or self.boxes_root.isEmpty():
+            self.boxes_root = self.render.attachNewNode('boxes_root')
+        return self.boxes_root
+
+    def _get_picker(self):
+        if getattr(self, '_picker', None) is None:
+            from panda3d.core import CollisionTraverser, CollisionNode, CollisionRay, CollisionHandlerQueue
+            picker = CollisionTraverser('box_picker')
+            queue = CollisionHandlerQueue()
+            picker_node = CollisionNode('mouseRay')
+            picker_node.setFromCollideMask(1)
+            picker_node.setIntoCollideMask(0)
+            ray = CollisionRay()
+            picker_node.addSolid(ray)
+            picker_np = self.camera.attachNewNode(picker_node)
+            picker.addCollider(picker_np, queue)
+            self._picker = (picker, queue, ray, picker_np)
+            self._pick_cache = None
+        return self._picker
+
+    def _pick_box(self, mouse_x: float, mouse_y: float):
+        """Коробка под курсором; повторный обход пропускается, если мышь, камера и сцена не менялись"""
+        picker, queue, ray, _ = self._get_picker()
+        key = (mouse_x, mouse_y, getattr(self, '_pick_epoch', 0),
+               tuple(self.camera.getMat(self.render).getRows()), tuple(self.camLens.getProjectionMat().getRows()))
+        cache = self._pick_cache
+        if cache is not None and cache[0] == key and (cache[1] is None or not cache[1].isEmpty()):
+            return cache[1]
+
+        handled, target = self._pick_box_index(mouse_x, mouse_y)
+        if handled:
+            self._pick_cache = (key, target)
+            return target
+
         ray.setFromLens(self.camNode, mouse_x, mouse_y)
-        picker.traverse(self.render)
+        picker.traverse(self._get_boxes_root())
         target = None
-        if pq.getNumEntries() > 0:
-            pq.sortEntries()
-            for i in range(pq.getNumEntries()):
-                picked_obj = pq.getEntry(i).getIntoNodePath()
-                cur = picked_obj
+        if queue.getNumEntries() > 0:
+            queue.sortEntries()
+            for i in range(queue.getNumEntries()):
+                cur = queue.getEntry(i).getIntoNodePath()
                 while cur:
                     if cur.getName().startswith('randomBox'):
                         target = cur
@@ -1109,7 +1519,40 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
                     cur = cur.getParent()
                 if target:
                     break
-        pickerNP.removeNode()
+        queue.clearEntries()
+        self._pick_cache = (key, target)
+        return target
+
+    def _pick_box_index(self, mouse_x: float, mouse_y: float):
+        """Пик лучом по AABB пространственного индекса; (False, None), если индекс не покрывает все коробки"""
+        index = self._get_box_index()
+        if len(index) != len(getattr(self, 'scene_boxes', [])):
+            return False, None
+        near, far = Point3(), Point3()
+        if not self.camLens.extrude(Point2(mouse_x, mouse_y), near, far):
+            return True, None
+        origin = self.render.getRelativePoint(self.camera, near)
+        direction = self.render.getRelativePoint(self.camera, far) - origin
+        hit = index.ray_cast((origin.x, origin.y, origin.z), (direction.x, direction.y, direction.z), 1.0)
+        if hit is None:
+            return True, None
+        node = hit[2]
+        if node is None or node.isEmpty():
+            return False, None
+        return True, node
+
+    def _invalidate_pick(self):
+        # Любое изменение коробок сцены - и новый пик, и новый кадр
+        self._pick_epoch = getattr(self, '_pick_epoch', 0) + 1
+        self.request_redraw()
+
+    def on_right_down(self):
+        self.drag_active = False
+        if not self.mouseWatcherNode.hasMouse():
+            return
+        mouse_x = self.mouseWatcherNode.getMouseX()
+        mouse_y = self.mouseWatcherNode.getMouseY()
+        target = self._pick_box(mouse_x, mouse_y)
         if target is None:
             return
         self.set_selected_box(target)
@@ -1124,13 +1567,14 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         self._drag_offset = self._drag_plane_point - pick_point
         logging.info(
             f"[Drag] Start target={target.getName()} plane_point={self._drag_plane_point} normal={self._drag_plane_normal} offset={self._drag_offset}")
-        self.taskMgr.add(self._drag_task, "box_drag_task")
+        self.taskMgr.add(self.diagnostics.timed("box_drag_task", self._drag_task), "box_drag_task")
 
     def on_right_up(self):
         if getattr(self, 'drag_active', False):
             self.drag_active = False
             self._drag_target = None
             self.taskMgr.remove("box_drag_task")
+            self.schedule_side_loads()
         else:
             self.arc.on_right_up()
 
@@ -1146,10 +1590,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             if hit is not None:
                 new_pos = hit + self._drag_offset
                 self._drag_target.setPos(self.render, new_pos)
-                self.safe_execute(
-                    self.update_side_loads,
-                    fallback=lambda: None
-                )
+                self.index_box(self._drag_target)
             self._drag_last_mouse = Point2(mx, my)
             return task.cont
         except Exception as e:
@@ -1198,25 +1639,9 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             new_max_y = new_center_world.y + half_d
             new_min_z = new_center_world.z - half_h
             new_max_z = new_center_world.z + half_h
-            for other in getattr(self, 'scene_boxes', []):
-                if other is box_np or other.isEmpty():
-                    continue
-                data = other.getPythonTag('box_data')
-                if not data:
-                    continue
-                ow = float(data.get('width', 100))
-                oh = float(data.get('height', 100))
-                od = float(data.get('depth', 100))
-                op = other.getPos(self.render)
-                o_min_x = op.x - ow / 2.0
-                o_max_x = op.x + ow / 2.0
-                o_min_y = op.y - od / 2.0
-                o_max_y = op.y + od / 2.0
-                o_min_z = op.z - oh / 2.0
-                o_max_z = op.z + oh / 2.0
-                if (new_max_x > o_min_x and new_min_x < o_max_x and
-                        new_max_y > o_min_y and new_min_y < o_max_y and
-                        new_max_z > o_min_z and new_min_z < o_max_z):
+            new_aabb = (new_min_x, new_min_y, new_min_z, new_max_x, new_max_y, new_max_z)
+            for _, _, other in self._get_box_index().query(new_aabb):
+                if other != box_np and not other.isEmpty():
                     return False
             if hasattr(self, 'truck_width') and hasattr(self, 'truck_depth') and hasattr(self, 'truck_height'):
                 t_half_w = self.truck_width / 2.0
@@ -1252,6 +1677,9 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
                     box_data['is_rotated'] = not box_data.get('is_rotated', False)
 
                     old_pos = self.selected_box.getPos()
+                    self.unindex_box(self.selected_box)
+                    if self.selected_box in getattr(self, 'scene_boxes', []):
+                        self.scene_boxes.remove(self.selected_box)
                     self.selected_box.removeNode()
 
                     new_box = self.create_3d_box_from_data(box_data, (old_pos.x, old_pos.y, old_pos.z))
@@ -1273,6 +1701,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             if delta_p != 0:
                 p = self._snap_angle(p + delta_p)
             box.setHpr(h, p, r)
+            self.index_box(box)
         except Exception as e:
             logging.error(f"[Rotate] Error rotating box: {e}")
 
@@ -1290,6 +1719,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
                 if hasattr(self, 'scene_boxes') and self.selected_box in self.scene_boxes:
                     self.scene_boxes.remove(self.selected_box)
 
+                self.unindex_box(self.selected_box)
                 self.selected_box.removeNode()
                 self.selected_box = None
             except Exception as e:
@@ -1297,7 +1727,14 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
 
     def set_selected_box(self, box_node):
         """Установить выбранную коробку"""
+        previous = getattr(self, 'selected_box', None)
         self.selected_box = box_node
+        # Выбранная коробка рисуется отдельно, чтобы пикинг и перетаскивание работали с ней самой
+        released = (box_node is not None and not box_node.isEmpty() and hasattr(self, 'settled_layer')
+                    and self.settled_layer.release(box_node.getKey()))
+        if released or (previous is not None and previous is not box_node):
+            self._schedule_settle()
+        self.request_redraw()
 
     def on_mouse_left_click(self):
         """Обработка клика левой кнопкой мыши для выделения коробок"""
@@ -1306,38 +1743,11 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             mouse_x = self.mouseWatcherNode.getMouseX()
             mouse_y = self.mouseWatcherNode.getMouseY()
 
-            # Создаем луч от камеры через позицию мыши
-            from panda3d.core import CollisionTraverser, CollisionNode, CollisionRay, CollisionHandlerQueue
-
-            picker = CollisionTraverser()
-            pq = CollisionHandlerQueue()
-
-            pickerNode = CollisionNode('mouseRay')
-            pickerNP = self.camera.attachNewNode(pickerNode)
-            pickerNode.setFromCollideMask(1)
-            pickerNode.setIntoCollideMask(0)  # Исправляем проблему с коллизией CollisionRay в CollisionRay
-            pickerRay = CollisionRay()
-            pickerNode.addSolid(pickerRay)
-            picker.addCollider(pickerNP, pq)
-
-            # Направляем луч от камеры через мышь
-            pickerRay.setFromLens(self.camNode, mouse_x, mouse_y)
-
-            # Ищем пересечения с коробками
-            picker.traverse(self.render)
-
-            if pq.getNumEntries() > 0:
-                # Сортируем по расстоянию
-                pq.sortEntries()
-                entry = pq.getEntry(0)
-                picked_obj = entry.getIntoNodePath()
-
-                # Ищем коробку среди родителей
-                while picked_obj:
-                    if picked_obj.getName().startswith('randomBox'):
-                        self.set_selected_box(picked_obj)
-                        return
-                    picked_obj = picked_obj.getParent()
+            # Луч от камеры через позицию мыши, только по коробкам
+            picked_obj = self._pick_box(mouse_x, mouse_y)
+            if picked_obj is not None:
+                self.set_selected_box(picked_obj)
+                return
 
             # Если ничего не выбрали, убираем выделение
             self.set_selected_box(None)
@@ -1350,32 +1760,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             return
         mouse_x = self.mouseWatcherNode.getMouseX()
         mouse_y = self.mouseWatcherNode.getMouseY()
-        from panda3d.core import CollisionTraverser, CollisionNode, CollisionRay, CollisionHandlerQueue
-        picker = CollisionTraverser()
-        pq = CollisionHandlerQueue()
-        pickerNode = CollisionNode('moveRayL')
-        pickerNP = self.camera.attachNewNode(pickerNode)
-        pickerNode.setFromCollideMask(1)
-        pickerNode.setIntoCollideMask(0)
-        ray = CollisionRay()
-        pickerNode.addSolid(ray)
-        picker.addCollider(pickerNP, pq)
-        ray.setFromLens(self.camNode, mouse_x, mouse_y)
-        picker.traverse(self.render)
-        target = None
-        if pq.getNumEntries() > 0:
-            pq.sortEntries()
-            for i in range(pq.getNumEntries()):
-                picked_obj = pq.getEntry(i).getIntoNodePath()
-                cur = picked_obj
-                while cur:
-                    if cur.getName().startswith('randomBox'):
-                        target = cur
-                        break
-                    cur = cur.getParent()
-                if target:
-                    break
-        pickerNP.removeNode()
+        target = self._pick_box(mouse_x, mouse_y)
         if target is None:
             self.arc.on_left_down()
             return
@@ -1385,13 +1770,14 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         self._drag_start_mouse = Point2(mouse_x, mouse_y)
         self._drag_distance = (target.getPos(self.render) - self.camera.getPos(self.render)).length()
         self._drag_last_mouse = Point2(mouse_x, mouse_y)
-        self.taskMgr.add(self._drag_task, "box_drag_task")
+        self.taskMgr.add(self.diagnostics.timed("box_drag_task", self._drag_task), "box_drag_task")
 
     def on_left_up(self):
         if getattr(self, 'drag_active', False):
             self.drag_active = False
             self._drag_target = None
             self.taskMgr.remove("box_drag_task")
+            self.schedule_side_loads()
         self.arc.on_left_up()
 
     def init_first_truck(self):
@@ -1403,88 +1789,47 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
         self.trucks.append(first_truck)
 
     def mouse_hover_task(self, task):
+        """Наведение: новый пик только после движения мыши, камеры или изменения коробок"""
         try:
-            if not hasattr(self, 'last_mouse_check_time'):
-                self.last_mouse_check_time = 0
-
-            current_time = task.time
-            if current_time - self.last_mouse_check_time < 0.1:
-                return task.cont
-
-            self.last_mouse_check_time = current_time
-
             if not self.mouseWatcherNode.hasMouse():
+                self._hover_key = None
                 if self.hovered_box:
                     logging.debug("[MouseHover] Mouse not available, hiding box info")
-                    self.hovered_box = None
-                    self.hide_box_info()
+                    self._set_hovered_box(None)
                 return task.cont
 
             mouse_x = self.mouseWatcherNode.getMouseX()
             mouse_y = self.mouseWatcherNode.getMouseY()
+            key = (mouse_x, mouse_y, self.arc.version, getattr(self, '_pick_epoch', 0),
+                   self.camLens.getAspectRatio())
+            if key == getattr(self, '_hover_key', None):
+                return task.cont
+            self._hover_key = key
 
-            from panda3d.core import CollisionTraverser, CollisionNode, CollisionRay, CollisionHandlerQueue
-
-            picker = CollisionTraverser()
-            pq = CollisionHandlerQueue()
-
-            pickerNode = CollisionNode('mouseHoverRay')
-            pickerNP = self.camera.attachNewNode(pickerNode)
-            pickerNode.setFromCollideMask(1)
-            pickerNode.setIntoCollideMask(0)
-            pickerRay = CollisionRay()
-            pickerNode.addSolid(pickerRay)
-            picker.addCollider(pickerNP, pq)
-
-            pickerRay.setFromLens(self.camNode, mouse_x, mouse_y)
-            picker.traverse(self.render)
-
-            new_hovered_box = None
-
-            if pq.getNumEntries() > 0:
-                if not hasattr(self, 'collision_debug_logged'):
-                    logging.info(
-                        f"[MouseHover] First collision detection: Found {pq.getNumEntries()} collision entries")
-                    self.collision_debug_logged = True
-
-                pq.sortEntries()
-
-                for i in range(pq.getNumEntries()):
-                    entry = pq.getEntry(i)
-                    picked_obj = entry.getIntoNodePath()
-
-                    current_obj = picked_obj
-                    while current_obj:
-                        if current_obj.getName().startswith('randomBox'):
-                            new_hovered_box = current_obj
-                            break
-                        current_obj = current_obj.getParent()
-
-                    if new_hovered_box:
-                        break
-
+            new_hovered_box = self._pick_box(mouse_x, mouse_y)
             if new_hovered_box != self.hovered_box:
-                logging.info(
-                    f"[MouseHover] Hover changed from {self.hovered_box.getName() if self.hovered_box else 'None'} to {new_hovered_box.getName() if new_hovered_box else 'None'}")
-                self.hovered_box = new_hovered_box
-                if self.hovered_box:
-                    box_data = self.hovered_box.getPythonTag('box_data')
-                    if box_data:
-                        logging.info(f"[MouseHover] Showing info for box: {box_data.get('label', 'Unknown')}")
-                        self.show_box_info(box_data)
-                    else:
-                        logging.warning(f"[MouseHover] Box {self.hovered_box.getName()} has no box_data")
-                else:
-                    logging.debug("[MouseHover] Hiding box info")
-                    self.hide_box_info()
-
-            pickerNP.removeNode()
+                self._set_hovered_box(new_hovered_box)
             return task.cont
 
         except Exception as e:
             logging.error(f"[MouseHover] Error in mouse_hover_task: {e}")
             return task.cont
 
+    def _set_hovered_box(self, box):
+        # Виджет информации перестраивается только при смене коробки под курсором
+        logging.debug(
+            f"[MouseHover] Hover changed from {self.hovered_box.getName() if self.hovered_box else 'None'} to {box.getName() if box else 'None'}")
+        self.hovered_box = box
+        if box is None:
+            self.hide_box_info()
+            return
+        box_data = box.getPythonTag('box_data')
+        if box_data:
+            self.show_box_info(box_data)
+        else:
+            logging.warning(f"[MouseHover] Box {box.getName()} has no box_data")
+            self.hide_box_info()
+
     def show_box_info(self, box_data):
         logging.debug(f"[ShowBoxInfo] Attempting to show info for box: {box_data.get('label', 'Unknown')}")
         if hasattr(self, 'panda_widget') and self.panda_widget:
@@ -1533,6 +1878,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
                     logging.debug(f"[Backspace] Removed box from scene_boxes list")
 
                 self.hide_box_info()
+                self.unindex_box(target)
                 target.removeNode()
                 if target is self.hovered_box:
                     self.hovered_box = None
@@ -1559,6 +1905,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
                         logging.debug(f"[HideBox] Removed box from scene_boxes list")
 
                     self.hide_box_info()
+                    self.unindex_box(target)
                     target.removeNode()
                     if target is self.hovered_box:
                         self.hovered_box = None
@@ -1583,6 +1930,7 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             if hasattr(self, 'scene_boxes') and self.selected_box in self.scene_boxes:
                 self.scene_boxes.remove(self.selected_box)
             self.hide_box_info()
+            self.unindex_box(self.selected_box)
             self.selected_box.removeNode()
             self.selected_box = None
             if box_data:
@@ -1638,40 +1986,77 @@ class TruckLoadingApp(ShowBase, ErrorReportingMixin):
             fallback=lambda: None
         )
 
+    def _get_side_loads(self) -> Optional[QuarterLoads]:
+        if self.truck_depth <= 0:
+            return None
+        loads = getattr(self, 'side_loads', None)
+        if loads is None or loads.truck_depth != float(self.truck_depth):
+            # Границы четвертей зависят от длины кузова: пересобираем с нуля
+            loads = self.side_loads = QuarterLoads(self.truck_depth)
+            for node in getattr(self, 'scene_boxes', []):
+                self._track_box_load(node, schedule=False)
+        return loads
+
+    def _track_box_load(self, node, schedule: bool = True):
+        loads = self._get_side_loads()
+        if loads is None or node is None or node.isEmpty():
+            return
+        data = node.getPythonTag('box_data')
+        if not data:
+            return
+        if loads.set(node.getKey(), node.getPos(self.render).y, float(data.get('weight', 0.0))) and schedule:
+            self.schedule_side_loads()
+
+    def schedule_side_loads(self):
+        """Пересчитать нагрузки на оси не чаще раза за кадр"""
+        if not getattr(self, '_side_loads_scheduled', False):
+            self._side_loads_scheduled = True
+            self.taskMgr.add(self._side_loads_task, 'side-loads-update', sort=48)
+
+    def _side_loads_task(self, task):
+        self._side_loads_scheduled = False
+        self._push_side_loads()
+        return task.done
+
+    def _find_load_calculator(self):
+        if not (hasattr(self, 'panda_widget') and self.panda_widget):
+            return None
+        parent_window = self.panda_widget.parent()
+        while parent_window and not hasattr(parent_window, 'sidebar'):
+            parent_window = parent_window.parent()
+        if parent_window and hasattr(parent_window, 'sidebar'):
+            lcw = getattr(parent_window.sidebar, 'load_calculation', None)
+            if lcw and hasattr(lcw, 'calculator'):
+                return lcw.calculator
+        return None
+
+    def _push_side_loads(self):
+        try:
+            loads = self._get_side_loads()
+            calculator = self._find_load_calculator()
+            if loads is None or calculator is None:
+                return
+            masses = dict(zip(('Mg1', 'Mg2', 'Mg3', 'Mg4'), loads.masses))
+            # Во время перетаскивания только обновляем расчёт, settings.json пишется после отпускания
+            dragging = getattr(self, 'drag_active', False)
+            calculator.update_settings(masses, persist=not dragging)
+            if not dragging:
+                calculator.flush_settings()
+        except Exception as e:
+            logging.error(f"[Loads] update_side_loads error: {e}")
+
     def update_side_loads(self):
+        """Полный пересчёт масс по четвертям из scene_boxes и немедленная отправка в калькулятор"""
         try:
             if not hasattr(self, 'scene_boxes'):
                 return
-            total_weights = [0.0, 0.0, 0.0, 0.0]
-            if self.truck_depth <= 0:
+            loads = self._get_side_loads()
+            if loads is None:
                 return
-            quarter = self.truck_depth / 4.0
+            loads.clear()
             for node in self.scene_boxes:
-                if not node or node.isEmpty():
-                    continue
-                data = node.getPythonTag('box_data')
-                if not data:
-                    continue
-                w = float(data.get('weight', 0.0))
-                pos = node.getPos(self.render)
-                local_y = pos.y
-                idx = int((local_y + self.truck_depth / 2.0) // quarter)
-                if idx < 0:
-                    idx = 0
-                if idx > 3:
-                    idx = 3
-                total_weights[idx] += w / 1000.0
-            if hasattr(self, 'panda_widget') and self.panda_widget:
-                parent_window = self.panda_widget.parent()
-                while parent_window and not hasattr(parent_window, 'sidebar'):
-                    parent_window = parent_window.parent()
-                if parent_window and hasattr(parent_window, 'sidebar'):
-                    lcw = getattr(parent_window.sidebar, 'load_calculation', None)
-                    if lcw and hasattr(lcw, 'calculator'):
-                        lcw.calculator.update_setting('Mg1', total_weights[0])
-                        lcw.calculator.update_setting('Mg2', total_weights[1])
-                        lcw.calculator.update_setting('Mg3', total_weights[2])
-                        lcw.calculator.update_setting('Mg4', total_weights[3])
+                self._track_box_load(node, schedule=False)
+            self._push_side_loads()
         except Exception as e:
             logging.error(f"[Loads] update_side_loads error: {e}")
 
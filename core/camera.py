@@ -3,6 +3,13 @@ from panda3d.core import Point3, Vec3
 
 from utils.camera_settings import CameraSettings
 
+# Фиксированные виды меню «Вид» и листов погрузки: (radius, alpha, beta) вокруг начала координат
+VIEW_PRESETS = {
+    'top': (3000, math.pi / 2, math.pi / 2),
+    'left': (3000, math.pi / 2, math.pi),
+    'right': (3000, math.pi / 2, 0.0),
+}
+
 
 class ArcCamera:
     def __init__(self, base):
@@ -27,17 +34,38 @@ class ArcCamera:
         self.vel_beta = 0.0
         self.vel_pan = Vec3(0, 0, 0)
 
+        # Растёт при каждом перемещении камеры: по нему наведение понимает, что вид изменился
+        self.version = 0
+
+        self.update()
+
+    @staticmethod
+    def orbit_position(target, radius, alpha, beta):
+        """Положение камеры на сфере вокруг target; beta ограничивается так же, как в update()"""
+        beta = max(0.1, min(math.pi - 0.1, beta))
+        return Point3(target.x + radius * math.sin(beta) * math.cos(alpha),
+                      target.y + radius * math.cos(beta),
+                      target.z + radius * math.sin(beta) * math.sin(alpha))
+
+    def set_view(self, name):
+        self.radius, self.alpha, self.beta = VIEW_PRESETS[name]
+        self.target.set(0, 0, 0)
         self.update()
 
     def update(self):
         self.beta = max(0.1, min(math.pi - 0.1, self.beta))
 
-        x = self.target.x + self.radius * math.sin(self.beta) * math.cos(self.alpha)
-        z = self.target.z + self.radius * math.sin(self.beta) * math.sin(self.alpha)
-        y = self.target.y + self.radius * math.cos(self.beta)
-
-        self.base.camera.setPos(x, y, z)
+        self.base.camera.setPos(self.orbit_position(self.target, self.radius, self.alpha, self.beta))
         self.base.camera.lookAt(self.target)
+        self.version += 1
+
+        request_redraw = getattr(self.base, 'request_redraw', None)
+        if request_redraw:
+            request_redraw()
+
+    def is_moving(self):
+        return (self.rotating or self.panning or self.vel_alpha != 0 or self.vel_beta != 0 or
+                self.vel_pan.length_squared() > 0)
 
     def zoom_to_target(self, factor):
         self.radius *= factor
@@ -109,7 +137,7 @@ class ArcCamera:
                 pan_delta = right * pan_dx + up_vector * pan_dy
                 self.vel_pan += pan_delta
 
-        if self.settings.enable_inertia:
+        if self.settings.enable_inertia and self.is_moving():
             self.alpha += self.vel_alpha
             self.beta += self.vel_beta
 
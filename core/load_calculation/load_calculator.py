@@ -27,6 +27,7 @@ class LoadCalculator(QObject):
             'show_on_main_screen': False
         }
         self.settings = self.default_settings.copy()
+        self._unsaved = False
         self.load_settings()
 
     def load_settings(self):
@@ -35,6 +36,7 @@ class LoadCalculator(QObject):
 
     def save_settings(self):
         SettingsManager().update_section('load_calculation', self.settings)
+        self._unsaved = False
         self.settings_changed.emit()
 
     def update_setting(self, key, value):
@@ -42,6 +44,25 @@ class LoadCalculator(QObject):
             self.settings[key] = value
             self.save_settings()
 
+    def update_settings(self, values, persist=True):
+        """Обновить несколько параметров одним сигналом; persist=False откладывает запись до flush_settings()"""
+        changed = False
+        for key, value in values.items():
+            if key in self.settings and self.settings[key] != value:
+                self.settings[key] = value
+                changed = True
+        if not changed:
+            return
+        if persist:
+            self.save_settings()
+        else:
+            self._unsaved = True
+            self.settings_changed.emit()
+
+    def flush_settings(self):
+        if self._unsaved:
+            self.save_settings()
+
     def get_setting(self, key):
         return self.settings.get(key, self.default_settings.get(key, 0))
 
@@ -0,0 +1,53 @@
+from typing import Dict, Hashable, List, Tuple
+
+
+class QuarterLoads:
+    """Масса груза (т) по четвертям длины кузова.
+
+    Коробка учитывается в одной четверти по положению центра; при перемещении
+    её масса вычитается из старой четверти и добавляется в новую.
+    """
+
+    def __init__(self, truck_depth: float):
+        self.truck_depth = float(truck_depth)
+        self.masses: List[float] = [0.0, 0.0, 0.0, 0.0]
+        self._counts: List[int] = [0, 0, 0, 0]
+        self._boxes: Dict[Hashable, Tuple[int, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def quarter_of(self, y: float) -> int:
+        quarter = self.truck_depth / 4.0
+        idx = int((y + self.truck_depth / 2.0) // quarter)
+        return min(3, max(0, idx))
+
+    def set(self, key: Hashable, y: float, weight_kg: float) -> bool:
+        """Учесть коробку в новом положении; True, если массы четвертей изменились."""
+        entry = (self.quarter_of(y), weight_kg / 1000.0)
+        old = self._boxes.get(key)
+        if old == entry:
+            return False
+        if old is not None:
+            self._take(*old)
+        self._boxes[key] = entry
+        self.masses[entry[0]] += entry[1]
+        self._counts[entry[0]] += 1
+        return True
+
+    def remove(self, key: Hashable) -> bool:
+        old = self._boxes.pop(key, None)
+        if old is None:
+            return False
+        self._take(*old)
+        return True
+
+    def clear(self) -> None:
+        self.masses = [0.0, 0.0, 0.0, 0.0]
+        self._counts = [0, 0, 0, 0]
+        self._boxes.clear()
+
+    def _take(self, idx: int, tons: float) -> None:
+        self._counts[idx] -= 1
+        # An empty quarter is reset exactly so float error does not accumulate over long drags
+        self.masses[idx] = self.masses[idx] - tons if self._counts[idx] else 0.0
@@ -33,10 +33,14 @@ class PerformanceMetrics:
             return 0.0
         duration = time.perf_counter() - self.start_times[operation_name]
         del self.start_times[operation_name]
-        
-        if operation_name not in self.metrics:
-            self.metrics[operation_name] = []
-        self.metrics[operation_name].append(duration)
+        return self.record(operation_name, duration)
+
+    def record(self, operation_name: str, duration: float, max_samples: Optional[int] = None) -> float:
+        """Записать уже измеренную длительность; max_samples ограничивает историю частых замеров"""
+        samples = self.metrics.setdefault(operation_name, [])
+        samples.append(duration)
+        if max_samples and len(samples) > max_samples:
+            del samples[:len(samples) - max_samples]
         return duration
         
     def get_average(self, operation_name: str) -> float:
@@ -48,6 +52,11 @@ class PerformanceMetrics:
         if operation_name not in self.metrics:
             return 0.0
         return sum(self.metrics[operation_name])
+
+    def get_max(self, operation_name: str) -> float:
+        if operation_name not in self.metrics or not self.metrics[operation_name]:
+            return 0.0
+        return max(self.metrics[operation_name])
         
     def clear(self):
         self.metrics.clear()
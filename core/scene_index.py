@@ -0,0 +1,152 @@
+import math
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+AABB = Tuple[float, float, float, float, float, float]  # min_x, min_y, min_z, max_x, max_y, max_z
+
+
+class BoxSpatialHash:
+    """Равномерная сетка по XY для AABB коробок сцены.
+
+    Коробка регистрируется во всех ячейках, которые покрывает её проекция;
+    запрос обходит только ячейки вокруг проверяемого объёма.
+    """
+
+    def __init__(self, cell_size: float = 100.0):
+        self.cell_size = float(cell_size)
+        self._cells: Dict[Tuple[int, int], List[Hashable]] = {}
+        self._entries: Dict[Hashable, Tuple[AABB, Any, List[Tuple[int, int]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def _cell_range(self, min_x: float, min_y: float, max_x: float, max_y: float) -> List[Tuple[int, int]]:
+        size = self.cell_size
+        x0, x1 = int(math.floor(min_x / size)), int(math.floor(max_x / size))
+        y0, y1 = int(math.floor(min_y / size)), int(math.floor(max_y / size))
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+    def insert(self, key: Hashable, aabb: AABB, item: Any = None) -> None:
+        if key in self._entries:
+            self.remove(key)
+        cells = self._cell_range(aabb[0], aabb[1], aabb[3], aabb[4])
+        for cell in cells:
+            self._cells.setdefault(cell, []).append(key)
+        self._entries[key] = (aabb, item, cells)
+
+    def remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for cell in entry[2]:
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                continue
+            try:
+                bucket.remove(key)
+            except ValueError:
+                pass
+            if not bucket:
+                del self._cells[cell]
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._entries.clear()
+
+    def get(self, key: Hashable) -> Optional[AABB]:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def query(self, aabb: AABB, margin: float = 0.0) -> Iterator[Tuple[Hashable, AABB, Any]]:
+        """Кандидаты, чьи AABB пересекаются с aabb, расширенным на margin."""
+        min_x, min_y, min_z = aabb[0] - margin, aabb[1] - margin, aabb[2] - margin
+        max_x, max_y, max_z = aabb[3] + margin, aabb[4] + margin, aabb[5] + margin
+        seen = set()
+        for cell in self._cell_range(min_x, min_y, max_x, max_y):
+            for key in self._cells.get(cell, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                other, item, _ = self._entries[key]
+                if (other[3] > min_x and other[0] < max_x and other[4] > min_y and other[1] < max_y and
+                        other[5] > min_z and other[2] < max_z):
+                    yield key, other, item
+
+    def ray_cast(self, origin: Tuple[float, float, float], direction: Tuple[float, float, float],
+                 max_t: float = math.inf) -> Optional[Tuple[float, Hashable, Any]]:
+        """Ближайшая AABB на луче origin + t * direction, 0 <= t <= max_t: (t, key, item) или None.
+
+        Ячейки обходятся вдоль проекции луча на XY (DDA) в порядке роста t; обход
+        останавливается, как только найденное пересечение ближе выхода из текущей ячейки.
+        """
+        if not self._cells:
+            return None
+        size = self.cell_size
+        ox, oy, oz = origin
+        dx, dy, dz = direction
+        inv = tuple(1.0 / c if c != 0.0 else math.inf for c in (dx, dy, dz))
+
+        # Clip the ray to the occupied cell rectangle first
+        xs = [cx for cx, _ in self._cells]
+        ys = [cy for _, cy in self._cells]
+        cx0, cx1, cy0, cy1 = min(xs), max(xs), min(ys), max(ys)
+        span = _slab((ox, oy), (dx, dy), inv[:2], (cx0 * size, cy0 * size), ((cx1 + 1) * size, (cy1 + 1) * size))
+        if span is None:
+            return None
+        t, t_end = max(0.0, span[0]), min(max_t, span[1])
+        if t > t_end:
+            return None
+
+        cx = min(cx1, max(cx0, int(math.floor((ox + dx * t) / size))))
+        cy = min(cy1, max(cy0, int(math.floor((oy + dy * t) / size))))
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        next_x = ((cx + (1 if dx > 0 else 0)) * size - ox) * inv[0] if dx != 0.0 else math.inf
+        next_y = ((cy + (1 if dy > 0 else 0)) * size - oy) * inv[1] if dy != 0.0 else math.inf
+        delta_x = size * abs(inv[0])
+        delta_y = size * abs(inv[1])
+
+        best = None
+        seen = set()
+        while True:
+            for key in self._cells.get((cx, cy), ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                aabb, item, _ = self._entries[key]
+                hit = _slab(origin, direction, inv, aabb[:3], aabb[3:])
+                if hit is None or hit[1] < 0.0:
+                    continue
+                hit_t = max(0.0, hit[0])
+                if hit_t <= max_t and (best is None or hit_t < best[0]):
+                    best = (hit_t, key, item)
+            cell_exit = min(next_x, next_y)
+            if (best is not None and best[0] <= cell_exit) or cell_exit > t_end:
+                return best
+            if next_x < next_y:
+                cx += step_x
+                next_x += delta_x
+            else:
+                cy += step_y
+                next_y += delta_y
+            if not (cx0 <= cx <= cx1 and cy0 <= cy <= cy1):
+                return best
+
+
+def _slab(origin, direction, inv, lo, hi) -> Optional[Tuple[float, float]]:
+    # Интервал t, на котором луч внутри параллелепипеда lo..hi (любой размерности)
+    t_min, t_max = -math.inf, math.inf
+    for o, d, i, a, b in zip(origin, direction, inv, lo, hi):
+        if d == 0.0:
+            if o < a or o > b:
+                return None
+            continue
+        t1, t2 = (a - o) * i, (b - o) * i
+        if t1 > t2:
+            t1, t2 = t2, t1
+        t_min, t_max = max(t_min, t1), min(t_max, t2)
+        if t_min > t_max:
+            return None
+    return t_min, t_max
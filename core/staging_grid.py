@@ -0,0 +1,81 @@
+import math
+from typing import Iterable, Optional, Tuple
+
+Rect = Tuple[float, float, float, float]  # min_x, min_y, max_x, max_y
+
+
+class StagingGrid:
+    """Сетка занятости площадки перед грузовиком.
+
+    Препятствия растеризуются разностным массивом, свободные места ищутся по
+    таблице сумм площадей: проверка любого прямоугольника - четыре обращения.
+    """
+
+    def __init__(self, min_x: float, min_y: float, max_x: float, max_y: float, cell: float = 20.0):
+        self.min_x, self.min_y = float(min_x), float(min_y)
+        self.max_x, self.max_y = float(max_x), float(max_y)
+        self.cell = float(cell)
+
+    def find_nearest(self, obstacles: Iterable[Rect], width: float, depth: float,
+                     target_x: float, target_y: float) -> Optional[Tuple[float, float]]:
+        """Ближайший к (target_x, target_y) центр зоны, где прямоугольник width x depth не задевает препятствий."""
+        c = self.cell
+        kw = max(1, int(math.ceil(width / c - 1e-9)))
+        kd = max(1, int(math.ceil(depth / c - 1e-9)))
+        # Footprints may overhang the zone by half a box; only their centres must stay inside it
+        gx0 = self.min_x - kw * c / 2.0
+        gy0 = self.min_y - kd * c / 2.0
+        nx = int(math.ceil((self.max_x - self.min_x) / c)) + kw + 1
+        ny = int(math.ceil((self.max_y - self.min_y) / c)) + kd + 1
+
+        # Difference array: +1/-1 at rectangle corners, prefix sums give per-cell coverage
+        diff = [[0] * (nx + 1) for _ in range(ny + 1)]
+        for x1, y1, x2, y2 in obstacles:
+            i0 = max(0, int(math.floor((x1 - gx0) / c)))
+            j0 = max(0, int(math.floor((y1 - gy0) / c)))
+            i1 = min(nx, int(math.ceil((x2 - gx0) / c)))
+            j1 = min(ny, int(math.ceil((y2 - gy0) / c)))
+            if i0 >= i1 or j0 >= j1:
+                continue
+            diff[j0][i0] += 1
+            diff[j0][i1] -= 1
+            diff[j1][i0] -= 1
+            diff[j1][i1] += 1
+
+        # Summed-area table of occupied cells, one extra leading row/column of zeros
+        sat = [[0] * (nx + 1) for _ in range(ny + 1)]
+        running = [0] * (nx + 1)
+        for j in range(ny):
+            row_cover = 0
+            diff_row = diff[j]
+            sat_prev = sat[j]
+            sat_row = sat[j + 1]
+            row_sum = 0
+            for i in range(nx):
+                running[i] += diff_row[i]
+                row_cover += running[i]
+                row_sum += 1 if row_cover > 0 else 0
+                sat_row[i + 1] = sat_prev[i + 1] + row_sum
+
+        best = None
+        best_dist = None
+        for j in range(0, ny - kd + 1):
+            cy = gy0 + (j + kd / 2.0) * c
+            if cy < self.min_y - 1e-9 or cy > self.max_y + 1e-9:
+                continue
+            dy2 = (cy - target_y) ** 2
+            if best_dist is not None and dy2 >= best_dist:
+                continue
+            top = sat[j]
+            bottom = sat[j + kd]
+            for i in range(0, nx - kw + 1):
+                cx = gx0 + (i + kw / 2.0) * c
+                if cx < self.min_x - 1e-9 or cx > self.max_x + 1e-9:
+                    continue
+                dist = (cx - target_x) ** 2 + dy2
+                if best_dist is not None and dist >= best_dist:
+                    continue
+                if bottom[i + kw] - bottom[i] - top[i + kw] + top[i] == 0:
+                    best = (cx, cy)
+                    best_dist = dist
+        return best
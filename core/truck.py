@@ -1,8 +1,16 @@
+from collections import OrderedDict
+
+import numpy as np
 from panda3d.core import CardMaker, TransparencyAttrib, GeomVertexData, GeomVertexFormat, Geom, GeomVertexWriter, \
-    GeomTriangles, GeomNode
+    GeomTriangles, GeomNode, GeomLines, NodePath
 
 from config.config import BOX_LIFT_HEIGHT, FLOOR_COLOR, TRUCK_CLOSED_COLOR
 
+GRID_EXTENT = 2000
+GRID_Z = 135.0 + 0.05
+# Сколько сеток с разным шагом держать готовыми
+GRID_CACHE_SIZE = 4
+
 
 class TruckScene:
     def __init__(self, app):
@@ -19,6 +27,7 @@ class TruckScene:
         self.ground = None
         self.tent_closed = False
         self.grid_node = None
+        self._grid_cache = OrderedDict()
 
     def build(self):
         self._create_truck_box()
@@ -191,48 +200,78 @@ class TruckScene:
     def _remove_grid(self):
         if self.grid_node:
             try:
-                self.grid_node.removeNode()
+                self.grid_node.detachNode()
             except Exception:
                 pass
             self.grid_node = None
 
+    def _get_grid_node(self, step_x: int, step_y: int):
+        """Геометрия сетки для шага; строится один раз и хранится отсоединённой."""
+        key = (step_x, step_y)
+        node = self._grid_cache.get(key)
+        if node is not None:
+            self._grid_cache.move_to_end(key)
+            return node
+        node = NodePath(self._build_grid_geom(step_x, step_y))
+        node.setTransparency(TransparencyAttrib.MAlpha)
+        node.setLightOff(1)
+        node.setDepthWrite(False)
+        self._grid_cache[key] = node
+        while len(self._grid_cache) > GRID_CACHE_SIZE:
+            _, old = self._grid_cache.popitem(last=False)
+            if old is not self.grid_node:
+                old.removeNode()
+        return node
+
+    @staticmethod
+    def _build_grid_geom(step_x: int, step_y: int) -> GeomNode:
+        x_min, x_max = -GRID_EXTENT, GRID_EXTENT
+        y_min, y_max = -GRID_EXTENT, GRID_EXTENT
+        ys = np.arange(y_min - (y_min % step_y), y_max + 1, step_y, dtype=np.float32)
+        xs = np.arange(x_min - (x_min % step_x), x_max + 1, step_x, dtype=np.float32)
+
+        # Две вершины на линию: сначала линии вдоль X, затем вдоль Y
+        verts = np.empty((len(ys) + len(xs), 2, 3), dtype=np.float32)
+        verts[:, :, 2] = GRID_Z
+        rows = verts[:len(ys)]
+        rows[:, 0, 0] = x_min
+        rows[:, 1, 0] = x_max
+        rows[:, :, 1] = ys[:, None]
+        cols = verts[len(ys):]
+        cols[:, :, 0] = xs[:, None]
+        cols[:, 0, 1] = y_min
+        cols[:, 1, 1] = y_max
+
+        num_rows = verts.shape[0] * 2
+        vdata = GeomVertexData('grid', GeomVertexFormat.get_v3(), Geom.UHStatic)
+        vdata.uncleanSetNumRows(num_rows)
+        memoryview(vdata.modifyArray(0)).cast('B')[:] = verts.tobytes()
+
+        lines = GeomLines(Geom.UHStatic)
+        lines.addConsecutiveVertices(0, num_rows)
+        geom = Geom(vdata)
+        geom.addPrimitive(lines)
+        node = GeomNode('grid')
+        node.addGeom(geom)
+        return node
+
     def update_grid(self, enabled: bool, color, opacity: float, spacing_x_cm: int, spacing_y_cm: int):
         try:
-            self._remove_grid()
             if not enabled:
+                self._remove_grid()
                 return
-            from panda3d.core import LineSegs, TransparencyAttrib
-            segs = LineSegs()
-            segs.setThickness(1.0)
-            r, g, b = color
-            a = max(0.0, min(1.0, float(opacity)))
-            segs.setColor(float(r), float(g), float(b), float(a))
-
-            extent = 2000
-            z = 135.0 + 0.05
             step_x = max(1, int(spacing_x_cm))
             step_y = max(1, int(spacing_y_cm))
+            node = self._get_grid_node(step_x, step_y)
+            if node is not self.grid_node:
+                self._remove_grid()
+                node.reparentTo(self.app.render)
+                self.grid_node = node
 
-            x_min, x_max = -extent, extent
-            y_min, y_max = -extent, extent
-
-            y = y_min - (y_min % step_y)
-            while y <= y_max:
-                segs.moveTo(x_min, y, z)
-                segs.drawTo(x_max, y, z)
-                y += step_y
-
-            x = x_min - (x_min % step_x)
-            while x <= x_max:
-                segs.moveTo(x, y_min, z)
-                segs.drawTo(x, y_max, z)
-                x += step_x
-
-            node = segs.create()
-            self.grid_node = self.app.render.attachNewNode(node)
-            self.grid_node.setTransparency(TransparencyAttrib.MAlpha)
-            self.grid_node.setLightOff(1)
-            self.grid_node.setDepthWrite(False)
+            # Цвет и прозрачность — только атрибуты узла, геометрия не пересобирается
+            r, g, b = color
+            a = max(0.0, min(1.0, float(opacity)))
+            node.setColor(float(r), float(g), float(b), a)
         except Exception:
             self._remove_grid()
 
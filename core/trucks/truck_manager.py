@@ -1,6 +1,9 @@
+import math
 from typing import List, Optional, Tuple
 
 from core.trucks.truck_model import TruckModel
+from packing import BoxItem, Container, PlacedBox
+from packing.core.validator import ValidationReport, validate_layout
 
 
 class TruckManager:
@@ -66,6 +69,9 @@ class TruckManager:
 
     def add_truck(self) -> TruckModel:
         new_id = max([t.id for t in self.trucks] + [0]) + 1
+        # id удалённого грузовика выдаётся заново: его спрятанные коробки новому не принадлежат
+        if self.app3d and hasattr(self.app3d, 'drop_stash'):
+            self.app3d.drop_stash(new_id)
         model = TruckModel(new_id, f'Грузовик {new_id}', 1650, 260, 245)
         
         # Initialize with default load calculation settings
@@ -95,11 +101,12 @@ class TruckManager:
         if index < 0 or index >= len(self.trucks):
             return
         if self.app3d:
+            # Снимок в словари нужен для сохранения и счётчиков, сама сцена прячется целиком
             self._capture_boxes_to_current()
-        old_index = self.current_index
+        previous = self.get_current()
         self.current_index = index
         if self.app3d:
-            self._apply_current_to_scene()
+            self._apply_current_to_scene(previous)
         self._notify()
 
     def select_next(self):
@@ -143,6 +150,9 @@ class TruckManager:
     def _capture_boxes_to_current(self):
         if not self.app3d:
             return
+        if hasattr(self.app3d, 'is_populating') and self.app3d.is_populating():
+            # Сцена ещё достраивается из TruckModel.boxes, они и так актуальны
+            return
         boxes = []
         for node in getattr(self.app3d, 'scene_boxes', []) or []:
             if not node or node.isEmpty():
@@ -160,25 +170,78 @@ class TruckManager:
                 continue
         self.get_current().boxes = boxes
 
-    def _apply_current_to_scene(self):
+    def validate_current(self, min_support_ratio: float = 0.95) -> ValidationReport:
+        """Проверка текущего грузовика: пересечения, выход за кузов, опора и маркировки.
+        Индексы в отчёте соответствуют порядку коробок в TruckModel.boxes."""
+        if self.app3d:
+            self._capture_boxes_to_current()
+        t = self.get_current()
+        floor = float(getattr(self.app3d, 'ground_level', 0.0)) if self.app3d else 0.0
+        container = Container(-t.width / 2.0, -t.depth / 2.0, floor, t.width / 2.0, t.depth / 2.0, floor + t.height)
+        placed = []
+        items = {}
+        for i, b in enumerate(t.boxes or []):
+            data = b.get('box_data', {}) or {}
+            pos = b.get('pos', {})
+            hpr = b.get('hpr', {}) or {}
+            w = float(data.get('width', 100))
+            h = float(data.get('height', 100))
+            d = float(data.get('depth', 100))
+            x, y, z = float(pos.get('x', 0)), float(pos.get('y', 0)), float(pos.get('z', 0))
+            # Габариты по осям кузова с учётом поворота (как _box_aabb в сцене): перевёрнутая коробка
+            # меняет высоту, и проверка this_way_up ловит её по несовпадению с исходной высотой
+            hx, hy, hz = _rotated_half_extents(w, d, h, float(hpr.get('h', 0)), float(hpr.get('p', 0)),
+                                               float(hpr.get('r', 0)))
+            placed.append(PlacedBox(x - hx, y - hy, z - hz, x + hx, y + hy, z + hz, i))
+            items[i] = BoxItem(w, d, h, i, frozenset(data.get('cargo_markings', []) or []),
+                               weight=float(data.get('weight', 0.0) or 0.0))
+        return validate_layout(container, placed, items, min_support_ratio)
+
+    def _apply_current_to_scene(self, previous: Optional[TruckModel] = None):
         t = self.get_current()
         if self.app3d:
             self.app3d.switch_truck(t.width, t.height, t.depth)
             self.app3d.set_tent_alpha(t.tent_alpha)
+            if previous is not None and hasattr(self.app3d, 'stash_boxes'):
+                self.app3d.stash_boxes(previous.id, previous.boxes)
+            else:
+                self._clear_scene_boxes()
+            if not (hasattr(self.app3d, 'unstash_boxes') and self.app3d.unstash_boxes(t.id, t.boxes)):
+                self._clear_scene_boxes()
+                self.app3d.populate_boxes(t.boxes or [])
+
+    def apply_packing_result(self, placed: List[PlacedBox], box_datas: List[dict], per_frame: Optional[int] = None,
+                             on_progress=None, on_done=None, animate: bool = True):
+        """Заменить коробки текущего грузовика результатом Packer.
+
+        Координаты PlacedBox - в системе контейнера из validate_current (совпадает со сценой);
+        box_datas[placed.index] - исходные данные коробки, размеры берутся из ориентации в укладке.
+        С animate коробки появляются в порядке укладки по несколько за кадр (stream_boxes).
+        """
+        records = []
+        for p in placed:
+            data = dict(box_datas[p.index])
+            data['width'] = p.x2 - p.x1
+            data['depth'] = p.y2 - p.y1
+            data['height'] = p.z2 - p.z1
+            records.append({
+                'box_data': data,
+                'pos': {'x': (p.x1 + p.x2) / 2.0, 'y': (p.y1 + p.y2) / 2.0, 'z': (p.z1 + p.z2) / 2.0},
+                'hpr': {'h': 0.0, 'p': 0.0, 'r': 0.0},
+            })
+        self.get_current().boxes = records
+        if self.app3d:
             self._clear_scene_boxes()
-            for b in t.boxes or []:
-                try:
-                    node = self.app3d.create_3d_box_from_data(b.get('box_data', {}), None)
-                    if node:
-                        pos = b.get('pos', {})
-                        hpr = b.get('hpr', {})
-                        node.setPos(self.app3d.render, float(pos.get('x', 0)), float(pos.get('y', 0)), float(pos.get('z', 0)))
-                        node.setHpr(self.app3d.render, float(hpr.get('h', 0)), float(hpr.get('p', 0)), float(hpr.get('r', 0)))
-                except Exception:
-                    continue
+            if animate and hasattr(self.app3d, 'stream_boxes'):
+                self.app3d.stream_boxes(records, per_frame=per_frame or 4, on_progress=on_progress, on_done=on_done)
+            else:
+                self.app3d.populate_boxes(records, per_frame=per_frame, on_progress=on_progress, on_done=on_done)
+        self._notify()
 
     def _clear_scene_boxes(self):
         try:
+            if hasattr(self.app3d, 'cancel_populate'):
+                self.app3d.cancel_populate()
             for node in list(getattr(self.app3d, 'scene_boxes', []) or []):
                 try:
                     node.removeNode()
@@ -186,9 +249,30 @@ class TruckManager:
                     pass
             if hasattr(self.app3d, 'scene_boxes'):
                 self.app3d.scene_boxes = []
+            if hasattr(self.app3d, 'box_index'):
+                self.app3d.box_index.clear()
+            if hasattr(self.app3d, 'side_loads'):
+                self.app3d.side_loads.clear()
         except Exception:
             pass
 
     def get_items(self) -> List[TruckModel]:
         return list(self.trucks)
 
+
+def _rotated_half_extents(w: float, d: float, h: float, heading: float, pitch: float, roll: float) -> Tuple[float, float, float]:
+    """Полуразмеры коробки w x d x h по осям мира после поворота HPR (порядок как в Panda3D: roll, pitch, heading)."""
+    # Углы из сцены (float32) почти кратны 90°: доводим их, иначе ровно стоящая коробка «висит» на 1e-6
+    h_rad, p_rad, r_rad = (math.radians(90.0 * round(a / 90.0)) if abs(a - 90.0 * round(a / 90.0)) < 1e-3
+                           else math.radians(a) for a in (heading, pitch, roll))
+    ch, sh = math.cos(h_rad), math.sin(h_rad)
+    cp, sp = math.cos(p_rad), math.sin(p_rad)
+    cr, sr = math.cos(r_rad), math.sin(r_rad)
+    # Строки матрицы - локальные оси X, Y, Z коробки в координатах мира
+    rows = (
+        (cr * ch - sr * sp * sh, cr * sh + sr * sp * ch, -sr * cp),
+        (-cp * sh, cp * ch, sp),
+        (sr * ch + cr * sp * sh, sr * sh - cr * sp * ch, cr * cp),
+    )
+    halves = (w / 2.0, d / 2.0, h / 2.0)
+    return tuple(sum(abs(row[axis]) * half for row, half in zip(rows, halves)) for axis in range(3))
@@ -0,0 +1,104 @@
+import logging
+
+from panda3d.core import (CollisionBox, Geom, GeomLines, GeomTriangles, GeomVertexData, GeomVertexFormat,
+                          GeomVertexWriter, Material, Point3, Vec4)
+
+logger = logging.getLogger(__name__)
+
+# Unit cube centred on the origin; X is width, Y is depth, Z is height
+_CUBE_VERTICES = [
+    # Front face
+    (-0.5, -0.5, -0.5), (0.5, -0.5, -0.5), (0.5, -0.5, 0.5), (-0.5, -0.5, 0.5),
+    # Back face
+    (0.5, 0.5, -0.5), (-0.5, 0.5, -0.5), (-0.5, 0.5, 0.5), (0.5, 0.5, 0.5),
+    # Left face
+    (-0.5, 0.5, -0.5), (-0.5, -0.5, -0.5), (-0.5, -0.5, 0.5), (-0.5, 0.5, 0.5),
+    # Right face
+    (0.5, -0.5, -0.5), (0.5, 0.5, -0.5), (0.5, 0.5, 0.5), (0.5, -0.5, 0.5),
+    # Top face
+    (-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (0.5, 0.5, 0.5), (-0.5, 0.5, 0.5),
+    # Bottom face
+    (-0.5, 0.5, -0.5), (0.5, 0.5, -0.5), (0.5, -0.5, -0.5), (-0.5, -0.5, -0.5)
+]
+
+_CUBE_NORMALS = [(0, -1, 0), (0, 1, 0), (-1, 0, 0), (1, 0, 0), (0, 0, 1), (0, 0, -1)]
+
+_WIRE_CORNERS = [
+    (-0.5, -0.5, -0.5), (0.5, -0.5, -0.5), (0.5, 0.5, -0.5), (-0.5, 0.5, -0.5),
+    (-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (0.5, 0.5, 0.5), (-0.5, 0.5, 0.5)
+]
+
+_WIRE_EDGES = [
+    (0, 1), (1, 2), (2, 3), (3, 0),
+    (4, 5), (5, 6), (6, 7), (7, 4),
+    (0, 4), (1, 5), (2, 6), (3, 7)
+]
+
+
+class BoxGeometryCache:
+    """Общая геометрия для всех коробок сцены.
+
+    Один единичный куб, один каркас и одно тело коллизии на всё приложение;
+    каждая коробка лишь масштабирует свой узел до (width, depth, height).
+    """
+
+    def __init__(self):
+        self._cube = None
+        self._wireframe = None
+        self._collision_solid = None
+        self._materials = {}
+
+    def cube_geom(self) -> Geom:
+        if self._cube is None:
+            vdata = GeomVertexData('unit_box', GeomVertexFormat.get_v3n3(), Geom.UHStatic)
+            vdata.setNumRows(24)
+            vwriter = GeomVertexWriter(vdata, 'vertex')
+            nwriter = GeomVertexWriter(vdata, 'normal')
+            for i, vertex in enumerate(_CUBE_VERTICES):
+                vwriter.addData3f(*vertex)
+                nwriter.addData3f(*_CUBE_NORMALS[i // 4])
+
+            tri = GeomTriangles(Geom.UHStatic)
+            for i in range(0, 24, 4):
+                tri.addVertices(i, i + 1, i + 2)
+                tri.addVertices(i, i + 2, i + 3)
+
+            self._cube = Geom(vdata)
+            self._cube.addPrimitive(tri)
+            logger.debug("Unit box geometry created")
+        return self._cube
+
+    def wireframe_geom(self) -> Geom:
+        if self._wireframe is None:
+            vdata = GeomVertexData('unit_box_wire', GeomVertexFormat.get_v3(), Geom.UHStatic)
+            vdata.setNumRows(8)
+            vwriter = GeomVertexWriter(vdata, 'vertex')
+            for corner in _WIRE_CORNERS:
+                vwriter.addData3f(*corner)
+
+            lines = GeomLines(Geom.UHStatic)
+            for start_idx, end_idx in _WIRE_EDGES:
+                lines.addVertices(start_idx, end_idx)
+                lines.closePrimitive()
+
+            self._wireframe = Geom(vdata)
+            self._wireframe.addPrimitive(lines)
+        return self._wireframe
+
+    def collision_solid(self) -> CollisionBox:
+        # Collision solids may be shared between CollisionNodes; the node's scale sizes it
+        if self._collision_solid is None:
+            self._collision_solid = CollisionBox(Point3(0, 0, 0), 0.5, 0.5, 0.5)
+        return self._collision_solid
+
+    def material(self, r: float, g: float, b: float) -> Material:
+        key = (r, g, b)
+        material = self._materials.get(key)
+        if material is None:
+            material = Material()
+            material.setDiffuse(Vec4(0, 0, 0, 1.0))
+            material.setSpecular(Vec4(0, 0, 0, 1.0))
+            material.setEmission(Vec4(r, g, b, 1.0))
+            material.setShininess(1.0)
+            self._materials[key] = material
+        return material
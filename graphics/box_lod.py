@@ -0,0 +1,51 @@
+from typing import FrozenSet, Sequence
+
+from panda3d.core import BitMask32, NodePath
+
+# Классы деталей коробки в порядке скрытия при отдалении камеры
+LOD_DIMENSIONS = 0
+LOD_MARKINGS = 1
+LOD_LABELS = 2
+LOD_WIREFRAME = 3
+
+LOD_SETTING_KEYS = ('lod_dimensions_distance', 'lod_markings_distance', 'lod_labels_distance',
+                    'lod_wireframe_distance')
+
+# Camera bits not used anywhere else in the scene
+_FIRST_BIT = 20
+LOD_MASKS = tuple(BitMask32.bit(_FIRST_BIT + i) for i in range(len(LOD_SETTING_KEYS)))
+ALL_LOD_BITS = BitMask32.range(_FIRST_BIT, len(LOD_SETTING_KEYS))
+
+
+def tag_lod(np: NodePath, lod_class: int) -> None:
+    """Отметить узел классом детализации: его видимость задаёт маска камеры."""
+    np.hide(LOD_MASKS[lod_class])
+
+
+class BoxLod:
+    """Детализация коробок по расстоянию ArcCamera.radius.
+
+    Узлы помечаются один раз при создании; переключение уровня меняет только
+    маску камеры, поэтому не трогает ни одного узла сцены.
+    """
+
+    def __init__(self, camera_node):
+        self.camera_node = camera_node
+        self._base_mask = camera_node.getCameraMask() & ~ALL_LOD_BITS
+        self.hidden: FrozenSet[int] = frozenset()
+        self.camera_node.setCameraMask(self.camera_mask())
+
+    def camera_mask(self, hidden: FrozenSet[int] = None) -> BitMask32:
+        mask = BitMask32(self._base_mask)
+        for lod_class in (self.hidden if hidden is None else hidden):
+            mask |= LOD_MASKS[lod_class]
+        return mask
+
+    def update(self, radius: float, distances: Sequence[float], enabled: bool = True) -> bool:
+        """Пересчитать скрытые классы; True, если видимость изменилась."""
+        hidden = frozenset(i for i, distance in enumerate(distances) if enabled and radius > float(distance))
+        if hidden == self.hidden:
+            return False
+        self.hidden = hidden
+        self.camera_node.setCameraMask(self.camera_mask())
+        return True
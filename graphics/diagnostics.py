@@ -0,0 +1,193 @@
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from panda3d.core import ClockObject, NodePath, PStatClient, PStatCollector, TextNode
+
+from core.logging.logger import PerformanceMetrics
+
+# Отдельный канал, чтобы сводки можно было отфильтровать в application.log
+logger = logging.getLogger("TruckLoader.Diagnostics")
+
+# Сколько последних замеров на операцию держать в PerformanceMetrics
+MAX_SAMPLES = 600
+
+
+class SceneDiagnostics:
+    """Диагностика сцены: время кадра и задач, счётчики графа сцены.
+
+    Задачи оборачиваются через timed() один раз при добавлении; пока диагностика
+    выключена, обёртка сводится к проверке флага. Замеры пишутся в PerformanceMetrics
+    и, если включено, в коллекторы PStats.
+    """
+
+    def __init__(self, app, metrics: Optional[PerformanceMetrics] = None,
+                 refresh_interval: float = 1.0, log_interval: float = 10.0):
+        self.app = app
+        self.metrics = metrics if metrics is not None else PerformanceMetrics()
+        self.refresh_interval = refresh_interval
+        self.log_interval = log_interval
+        self.enabled = False
+        self.pstats = False
+        self.overlay = None
+        self.counts: Dict[str, int] = {}
+        self._window: Dict[str, List[float]] = {}
+        self._collectors: Dict[str, PStatCollector] = {}
+        self._frame_start = 0.0
+        self._last_log = 0.0
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        """Обернуть задачу taskMgr замером длительности."""
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return fn(*args, **kwargs)
+            collector = self._collectors.get(name) if self.pstats else None
+            if collector is not None:
+                collector.start()
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(name, time.perf_counter() - start)
+                if collector is not None:
+                    collector.stop()
+        wrapper.__name__ = getattr(fn, '__name__', name)
+        return wrapper
+
+    def set_enabled(self, enabled: bool, pstats: bool = False) -> None:
+        enabled = bool(enabled)
+        self._set_pstats(enabled and pstats)
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        task_mgr = self.app.taskMgr
+        if enabled:
+            self._window.clear()
+            self._last_log = time.perf_counter()
+            task_mgr.add(self._frame_begin_task, 'diagnostics-frame-begin', sort=-1000)
+            task_mgr.add(self._frame_end_task, 'diagnostics-frame-end', sort=1000)
+            task_mgr.doMethodLater(self.refresh_interval, self._refresh_task, 'diagnostics-refresh')
+            self._show_overlay()
+            logger.info("[Diagnostics] Enabled")
+        else:
+            for name in ('diagnostics-frame-begin', 'diagnostics-frame-end', 'diagnostics-refresh'):
+                task_mgr.remove(name)
+            self._hide_overlay()
+            logger.info("[Diagnostics] Disabled")
+        self._request_redraw()
+
+    def toggle(self) -> bool:
+        self.set_enabled(not self.enabled, self.pstats)
+        return self.enabled
+
+    def snapshot(self) -> dict:
+        """Средние и максимумы за текущее окно (мс) плюс счётчики сцены."""
+        timings = {}
+        for name, samples in self._window.items():
+            if samples:
+                timings[name] = {
+                    'avg_ms': sum(samples) / len(samples) * 1000.0,
+                    'max_ms': max(samples) * 1000.0,
+                    'calls': len(samples),
+                }
+        return {'timings': timings, 'counts': dict(self.counts), 'pstats': self.pstats}
+
+    def _record(self, name: str, duration: float) -> None:
+        self._window.setdefault(name, []).append(duration)
+        self.metrics.record(f"Diagnostics.{name}", duration, MAX_SAMPLES)
+
+    def _set_pstats(self, wanted: bool) -> None:
+        if wanted == self.pstats:
+            return
+        if wanted:
+            # Без запущенного pstats-сервера подключение просто не удаётся
+            if not PStatClient.isConnected() and not PStatClient.connect():
+                logger.info("[Diagnostics] PStats server not available, using built-in timings only")
+                return
+            self._collectors = {name: PStatCollector(f"App:{name}")
+                                for name in ('mouse_hover_task', 'camera_update', 'box_drag_task')}
+            self.pstats = True
+        else:
+            self._collectors = {}
+            self.pstats = False
+            if PStatClient.isConnected():
+                PStatClient.disconnect()
+
+    def _frame_begin_task(self, task):
+        self._frame_start = time.perf_counter()
+        return task.cont
+
+    def _frame_end_task(self, task):
+        # Время работы кадра без простоя между кадрами (отрисовка по требованию)
+        if self._frame_start:
+            self._record('frame', time.perf_counter() - self._frame_start)
+        return task.cont
+
+    def _refresh_task(self, task):
+        try:
+            self.counts = count_scene(self.app.render)
+            text = self._format()
+            if self.overlay is not None:
+                self.overlay.node().setText(text)
+                self._request_redraw()
+            now = time.perf_counter()
+            if now - self._last_log >= self.log_interval:
+                self._last_log = now
+                logger.info("[Diagnostics] " + " | ".join(text.splitlines()))
+                self._window.clear()
+        except Exception as e:
+            logger.debug(f"[Diagnostics] Refresh failed: {e}")
+        return task.again
+
+    def _format(self) -> str:
+        snap = self.snapshot()
+        fps = ClockObject.getGlobalClock().getAverageFrameRate()
+        lines = [f"fps {fps:.1f}"]
+        for name, t in sorted(snap['timings'].items()):
+            lines.append(f"{name}: {t['avg_ms']:.2f} / {t['max_ms']:.2f} ms x{t['calls']}")
+        c = snap['counts']
+        lines.append(f"nodes {c.get('nodes', 0)}  geom nodes {c.get('geom_nodes', 0)}  geoms {c.get('geoms', 0)}")
+        lines.append(f"text nodes {c.get('text_nodes', 0)}  textures {c.get('textures', 0)}")
+        if self.pstats:
+            lines.append("pstats: connected")
+        return "\n".join(lines)
+
+    def _show_overlay(self) -> None:
+        if self.overlay is not None:
+            return
+        parent = getattr(self.app, 'a2dTopLeft', None) or getattr(self.app, 'aspect2d', None)
+        if parent is None:
+            return
+        text = TextNode('diagnostics')
+        text.setAlign(TextNode.ALeft)
+        text.setTextColor(1, 1, 1, 1)
+        text.setCardColor(0, 0, 0, 0.55)
+        text.setCardAsMargin(0.3, 0.3, 0.2, 0.2)
+        text.setText("...")
+        self.overlay = NodePath(text)
+        self.overlay.reparentTo(parent)
+        self.overlay.setScale(0.04)
+        self.overlay.setPos(0.04, 0, -0.07)
+        self.overlay.setBin('fixed', 100)
+
+    def _hide_overlay(self) -> None:
+        if self.overlay is not None:
+            self.overlay.removeNode()
+            self.overlay = None
+
+    def _request_redraw(self) -> None:
+        request_redraw = getattr(self.app, 'request_redraw', None)
+        if request_redraw:
+            request_redraw()
+
+
+def count_scene(root: NodePath) -> Dict[str, int]:
+    """Счётчики графа сцены; обходит дерево, поэтому вызывается не чаще refresh_interval."""
+    geom_nodes = root.findAllMatches('**/+GeomNode')
+    return {
+        'nodes': root.countNumDescendants() + 1,
+        'geom_nodes': geom_nodes.getNumPaths(),
+        'geoms': sum(geom_nodes.getPath(i).node().getNumGeoms() for i in range(geom_nodes.getNumPaths())),
+        'text_nodes': root.findAllMatches('**/+TextNode').getNumPaths(),
+        'textures': root.findAllTextures().getNumTextures(),
+    }
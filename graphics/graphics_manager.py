@@ -46,14 +46,21 @@ class GraphicsManager:
                 self._update_truck_model_color(self.app.lorry_model, r, g, b)
 
             self._apply_grid()
+            self._apply_diagnostics()
 
             logger.info("All graphics settings applied successfully")
 
         except Exception as e:
             logger.error(f"Failed to apply all graphics settings: {e}")
 
+    def _request_redraw(self):
+        request_redraw = getattr(self.app, 'request_redraw', None)
+        if request_redraw:
+            request_redraw()
+
     def setup_lighting(self):
         self.app.render.clearLight()
+        self._request_redraw()
 
         if self.settings.lighting_enabled:
             preset = LIGHTING_PRESETS.get(self.settings.lighting_mode, LIGHTING_PRESETS[LightingMode.HEMISPHERIC])
@@ -94,10 +101,12 @@ class GraphicsManager:
         """Установить цвет фона"""
         self.settings.background_color = (r, g, b)
         self.app.setBackgroundColor(r, g, b)
+        self._request_redraw()
 
     def set_specular_enabled(self, enabled):
         """Включить/выключить блики для всех моделей"""
         self.settings.enable_specular = enabled
+        self._request_redraw()
 
         # Обновить блики для колеса
         if hasattr(self.app, 'wheel_model') and self.app.wheel_model:
@@ -110,6 +119,7 @@ class GraphicsManager:
     def set_truck_color(self, r, g, b):
         """Установить цвет тягача (материал M_Body)"""
         self.settings.truck_color = (r, g, b)
+        self._request_redraw()
 
         # Обновить цвет кабины
         if hasattr(self.app, 'lorry_model') and self.app.lorry_model:
@@ -222,6 +232,13 @@ class GraphicsManager:
         if any(key in kwargs for key in ['grid_enabled', 'grid_opacity', 'grid_color', 'grid_spacing_x_cm', 'grid_spacing_y_cm']):
             self._apply_grid()
 
+        if any(key.startswith('lod_') for key in kwargs):
+            # Маску камеры пересчитает задача LOD на ближайшем кадре
+            self._request_redraw()
+
+        if any(key.startswith('diagnostics_') for key in kwargs):
+            self._apply_diagnostics()
+
         self.save_settings()
 
     def reset_graphics_settings(self):
@@ -238,6 +255,7 @@ class GraphicsManager:
         try:
             if not hasattr(self.app, 'scene') or not self.app.scene:
                 return
+            self._request_redraw()
             s = self.settings
             if hasattr(self.app.scene, 'update_grid'):
                 self.app.scene.update_grid(
@@ -250,6 +268,18 @@ class GraphicsManager:
         except Exception as e:
             logger.error(f"Failed to apply grid settings: {e}")
 
+    def _apply_diagnostics(self):
+        diagnostics = getattr(self.app, 'diagnostics', None)
+        if diagnostics is None:
+            return
+        try:
+            diagnostics.set_enabled(bool(self.settings.diagnostics_enabled), bool(self.settings.diagnostics_pstats))
+        except Exception as e:
+            logger.error(f"Failed to apply diagnostics settings: {e}")
+
+    def toggle_diagnostics(self):
+        self.update_graphics_settings(diagnostics_enabled=not self.settings.diagnostics_enabled)
+
     def set_grid_enabled(self, enabled: bool):
         self.settings.grid_enabled = bool(enabled)
         self._apply_grid()
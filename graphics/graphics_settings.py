@@ -88,6 +88,21 @@ class GraphicsSettings:
         self.grid_spacing_x_cm = 10
         self.grid_spacing_y_cm = 10
 
+        # Отрисовка по требованию: без изменений сцены кадры идут с частотой idle_fps
+        self.render_on_demand = True
+        self.idle_fps = 4
+
+        # Детализация коробок: дальше этих радиусов камеры (см) скрываются размеры, маркировки, подписи, каркас
+        self.lod_enabled = True
+        self.lod_dimensions_distance = 2000
+        self.lod_markings_distance = 3000
+        self.lod_labels_distance = 4500
+        self.lod_wireframe_distance = 7000
+
+        # Диагностика: оверлей с временем кадра и задач; pstats — дополнительно слать замеры в PStats
+        self.diagnostics_enabled = False
+        self.diagnostics_pstats = False
+
     def to_dict(self):
         """Сериализация настроек в словарь"""
         return {
@@ -103,7 +118,16 @@ class GraphicsSettings:
             'grid_opacity': self.grid_opacity,
             'grid_color': self.grid_color,
             'grid_spacing_x_cm': self.grid_spacing_x_cm,
-            'grid_spacing_y_cm': self.grid_spacing_y_cm
+            'grid_spacing_y_cm': self.grid_spacing_y_cm,
+            'render_on_demand': self.render_on_demand,
+            'idle_fps': self.idle_fps,
+            'lod_enabled': self.lod_enabled,
+            'lod_dimensions_distance': self.lod_dimensions_distance,
+            'lod_markings_distance': self.lod_markings_distance,
+            'lod_labels_distance': self.lod_labels_distance,
+            'lod_wireframe_distance': self.lod_wireframe_distance,
+            'diagnostics_enabled': self.diagnostics_enabled,
+            'diagnostics_pstats': self.diagnostics_pstats
         }
 
     def from_dict(self, data):
@@ -0,0 +1,170 @@
+import logging
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from panda3d.core import LColor, PNMImage, PNMTextMaker, Texture
+
+logger = logging.getLogger(__name__)
+
+# (page index, u0, v0, u1, v1)
+AtlasSlot = Tuple[int, float, float, float, float]
+
+
+class LabelAtlas:
+    """Атлас запечённых подписей коробок.
+
+    Каждая уникальная подпись растеризуется один раз в слот страницы-текстуры.
+    Слоты переиспользуются по LRU; занятые коробками сцены не вытесняются.
+    Новая страница добавляется, только когда свободных и вытесняемых слотов нет,
+    и не сверх budget_mb видеопамяти (или max_pages); дальше acquire возвращает None.
+    Страница перезагружается в GPU не чаще раза за кадр.
+    """
+
+    def __init__(self, font, task_mgr=None, page_size: int = 1024, slot_size: Tuple[int, int] = (256, 128),
+                 max_pages: Optional[int] = None, budget_mb: float = 128.0,
+                 in_use: Optional[Callable[[], Iterable]] = None):
+        self.page_size = page_size
+        self.slot_w, self.slot_h = slot_size
+        self.cols = page_size // self.slot_w
+        self.rows = page_size // self.slot_h
+        if max_pages is None:
+            # RGBA8 page plus its mipmap chain (~1/3 more)
+            page_bytes = page_size * page_size * 4 * 4 / 3.0
+            max_pages = max(1, int(budget_mb * 1024 * 1024 // page_bytes))
+        self.max_pages = max_pages
+        self.in_use = in_use
+        self.task_mgr = task_mgr
+        self.main_px = int(self.slot_h * 0.375)
+        self.dims_px = int(self.main_px * 0.7)
+
+        self._maker = PNMTextMaker(font)
+        self._maker.setAlign(PNMTextMaker.ACenter)
+        self._maker.setFg(LColor(0, 0, 0, 1))
+        self._images: List[PNMImage] = []
+        self.textures: List[Texture] = []
+        self._free: List[Tuple[int, int]] = []
+        self._slots: "OrderedDict[tuple, Tuple[int, int]]" = OrderedDict()
+        self._dirty = set()
+        self._recent = set()
+        # Живые ключи из in_use(): обход всех коробок делается не чаще раза за кадр (сброс в flush)
+        self._live: Optional[set] = None
+        self._flush_scheduled = False
+        self._full_warned = False
+        self.fallbacks = 0
+
+    @property
+    def valid(self) -> bool:
+        return self._maker.isValid()
+
+    def acquire(self, key: tuple, lines: Tuple[str, ...]) -> Optional[AtlasSlot]:
+        slot = self._slots.get(key)
+        if self.task_mgr is not None:
+            # Keys handed out this frame may belong to a box that is not in the scene yet
+            self._recent.add(key)
+            self._schedule_flush()
+        if slot is not None:
+            self._slots.move_to_end(key)
+        else:
+            slot = self._allocate()
+            if slot is None:
+                return None
+            self._draw(slot, lines)
+            self._slots[key] = slot
+        page, index = slot
+        col, row = index % self.cols, index // self.cols
+        u0 = col * self.slot_w / float(self.page_size)
+        u1 = (col + 1) * self.slot_w / float(self.page_size)
+        # PNMImage rows run top-down, texture V runs bottom-up
+        v1 = 1.0 - row * self.slot_h / float(self.page_size)
+        v0 = 1.0 - (row + 1) * self.slot_h / float(self.page_size)
+        return page, u0, v0, u1, v1
+
+    def release(self, keys: Iterable[tuple]) -> None:
+        """Ключи, выданные коробке, которая в итоге их не использует: вытеснять первыми."""
+        for key in keys:
+            self._recent.discard(key)
+            if key in self._slots:
+                self._slots.move_to_end(key, last=False)
+
+    def _allocate(self) -> Optional[Tuple[int, int]]:
+        if self._free:
+            return self._allocated(self._free.pop())
+        if self._slots:
+            if self._live is None:
+                self._live = set(self.in_use()) if self.in_use else set()
+            for key in self._slots:
+                if key not in self._live and key not in self._recent:
+                    return self._allocated(self._slots.pop(key))
+        if len(self._images) < self.max_pages:
+            self._add_page()
+            return self._allocated(self._free.pop())
+
+        # GPU memory stays bounded: the caller falls back to plain text nodes for this box
+        self.fallbacks += 1
+        if not self._full_warned:
+            self._full_warned = True
+            logger.warning("Label atlas full with %d live labels on %d pages, using text nodes",
+                           len(self._slots), len(self._images))
+        return None
+
+    def _allocated(self, slot: Tuple[int, int]) -> Tuple[int, int]:
+        # Место снова есть: следующее переполнение тоже попадёт в лог
+        self._full_warned = False
+        return slot
+
+    def _add_page(self) -> None:
+        page = len(self._images)
+        image = PNMImage(self.page_size, self.page_size, 4)
+        image.fill(0, 0, 0)
+        image.alphaFill(0)
+        texture = Texture(f'label_atlas_{page}')
+        texture.load(image)
+        texture.setMinfilter(Texture.FTLinearMipmapLinear)
+        texture.setMagfilter(Texture.FTLinear)
+        texture.setWrapU(Texture.WMClamp)
+        texture.setWrapV(Texture.WMClamp)
+        self._images.append(image)
+        self.textures.append(texture)
+        total = self.cols * self.rows
+        # Popped from the end, so slots fill from the top-left
+        self._free.extend((page, i) for i in range(total - 1, -1, -1))
+
+    def _draw(self, slot: Tuple[int, int], lines: Tuple[str, ...]) -> None:
+        page, index = slot
+        tile = PNMImage(self.slot_w, self.slot_h, 4)
+        tile.fill(0, 0, 0)
+        tile.alphaFill(0)
+        baselines = (0.45, 0.85) if len(lines) > 1 else (0.62,)
+        for text, baseline, px in zip(lines, baselines, (self.main_px, self.dims_px)):
+            self._maker.setPixelSize(px)
+            width = self._maker.calcWidth(text)
+            if width > self.slot_w * 0.95:
+                self._maker.setPixelSize(max(8, int(px * self.slot_w * 0.95 / width)))
+            self._maker.generateInto(text, tile, self.slot_w // 2, int(self.slot_h * baseline))
+        col, row = index % self.cols, index // self.cols
+        self._images[page].copySubImage(tile, col * self.slot_w, row * self.slot_h)
+        self._mark_dirty(page)
+
+    def _mark_dirty(self, page: int) -> None:
+        self._dirty.add(page)
+        if self.task_mgr is None:
+            self.flush()
+        else:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.task_mgr.add(self._flush_task, 'label-atlas-flush', sort=49)
+
+    def _flush_task(self, task):
+        self.flush()
+        return task.done
+
+    def flush(self) -> None:
+        for page in self._dirty:
+            self.textures[page].load(self._images[page])
+        self._dirty.clear()
+        self._recent.clear()
+        self._live = None
+        self._flush_scheduled = False
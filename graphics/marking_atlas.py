@@ -0,0 +1,236 @@
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from panda3d.core import Filename, LColorf, PNMImage, SamplerState, StringStream, Texture
+
+logger = logging.getLogger(__name__)
+
+# Цвета запасных значков, если файла маркировки нет или он не читается
+FALLBACK_MARKING_COLORS = {
+    'fragile': (1.0, 0.0, 0.0),
+    'this_way_up': (0.0, 1.0, 0.0),
+    'no_stack': (1.0, 1.0, 0.0),
+    'keep_dry': (0.0, 0.0, 1.0),
+    'center_gravity': (1.0, 0.5, 0.0),
+    'alcohol': (0.5, 0.0, 1.0),
+    'no_hooks': (1.0, 0.0, 1.0),
+    'temperature': (0.0, 1.0, 1.0)
+}
+
+MIN_BUCKET = 32
+MAX_BUCKET = 256
+GRID = 4  # cells per atlas side; markings beyond GRID * GRID get a texture of their own
+# Each cell keeps a border of 1/8 of its size filled with the marking's edge pixels.
+# Mip levels are clamped so that one texel at the coarsest level still fits inside that
+# border, and sampling never reaches a neighbouring marking.
+PAD_FRACTION = 8
+
+# (texture, u0, v0, u1, v1)
+MarkingRegion = Tuple[Texture, float, float, float, float]
+
+
+def resolution_bucket(px: int) -> int:
+    bucket = MIN_BUCKET
+    while bucket < px and bucket < MAX_BUCKET:
+        bucket *= 2
+    return bucket
+
+
+def _rasterize_svg(path: str, px: int) -> Optional[PNMImage]:
+    from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+    from PyQt5.QtGui import QImage, QPainter
+    from PyQt5.QtSvg import QSvgRenderer
+
+    renderer = QSvgRenderer(path)
+    if not renderer.isValid():
+        return None
+    image = QImage(px, px, QImage.Format_ARGB32)
+    image.fill(0)
+    painter = QPainter(image)
+    renderer.render(painter)
+    painter.end()
+
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    pnm = PNMImage()
+    if not pnm.read(StringStream(bytes(data)), "marking.png"):
+        return None
+    return pnm
+
+
+def _fallback_image(name: str, px: int) -> PNMImage:
+    # Цветной круг в чёрной обводке; renderSpot рисует круг целиком в C++, радиусы - в долях половины стороны
+    r, g, b = FALLBACK_MARKING_COLORS.get(name, (0.5, 0.5, 0.5))
+    radius = 0.78
+    border = max(1.0, px / 32.0) / (px / 2.0)
+    image = PNMImage(px, px, 4)
+    image.renderSpot(LColorf(0, 0, 0, 1), LColorf(0, 0, 0, 0), radius + border, radius + border)
+    spot = PNMImage(px, px, 4)
+    spot.renderSpot(LColorf(r, g, b, 1), LColorf(r, g, b, 0), radius, radius)
+    image.blendSubImage(spot, 0, 0)
+    return image
+
+
+def _cell_pad(bucket: int) -> int:
+    return bucket // PAD_FRACTION
+
+
+class MarkingAtlas:
+    """Реестр текстур маркировок.
+
+    Для каждого размерного ряда (32..256 px) все маркировки растеризуются один раз
+    в общую текстуру-атлас; карточки получают только UV-прямоугольник.
+    Растеризация может идти в фоновом потоке, загрузка в GPU - только из главного.
+    """
+
+    def __init__(self, resolve_path: Callable[[str], str], markings: List[str]):
+        self.resolve_path = resolve_path
+        self.markings: List[str] = list(dict.fromkeys(markings))
+        self._images: Dict[int, PNMImage] = {}
+        self._counts: Dict[int, int] = {}
+        self._textures: Dict[int, Texture] = {}
+        self._threads: Dict[int, threading.Thread] = {}
+        self._single: Dict[Tuple[str, int], Texture] = {}
+        self._lock = threading.Lock()
+
+    def warm_async(self, px: int) -> None:
+        bucket = resolution_bucket(px)
+        with self._lock:
+            if bucket in self._images or bucket in self._threads:
+                return
+            thread = threading.Thread(target=self._build, args=(bucket,), name=f"marking-atlas-{bucket}", daemon=True)
+            self._threads[bucket] = thread
+        thread.start()
+
+    def get(self, name: str, px: int) -> Optional[MarkingRegion]:
+        bucket = resolution_bucket(px)
+        texture = self._textures.get(bucket)
+        if texture is None:
+            texture = self._upload(bucket)
+        if name not in self.markings:
+            self._add_marking(name)
+        index = self.markings.index(name)
+        if index >= GRID * GRID:
+            return self._single_texture(name, bucket), 0.0, 0.0, 1.0, 1.0
+        col, row = index % GRID, index // GRID
+        step = 1.0 / GRID
+        inset = _cell_pad(bucket) / float(bucket * GRID)
+        # PNMImage rows run top-down, texture V runs bottom-up
+        return (texture, col * step + inset, 1.0 - (row + 1) * step + inset,
+                (col + 1) * step - inset, 1.0 - row * step - inset)
+
+    def _upload(self, bucket: int) -> Texture:
+        thread = self._threads.get(bucket)
+        if thread is not None:
+            thread.join()
+        if bucket not in self._images:
+            self._build(bucket)
+        atlas = self._images[bucket]
+        # Markings registered while a background build was running
+        for index in range(self._counts[bucket], min(len(self.markings), GRID * GRID)):
+            self._draw_cell(atlas, index, self.markings[index], bucket)
+            self._counts[bucket] = index + 1
+        texture = _make_texture(f'marking_atlas_{bucket}', atlas)
+        sampler = SamplerState(texture.getDefaultSampler())
+        sampler.setMaxLod(max(0, _cell_pad(bucket).bit_length() - 1))
+        texture.setDefaultSampler(sampler)
+        self._textures[bucket] = texture
+        return texture
+
+    def _single_texture(self, name: str, bucket: int) -> Texture:
+        # Маркировка сверх GRID * GRID: своя текстура вместо чужой ячейки атласа
+        key = (name, bucket)
+        texture = self._single.get(key)
+        if texture is None:
+            texture = _make_texture(f'marking_{name}_{bucket}', self._cell_image(name, bucket, bucket))
+            self._single[key] = texture
+        return texture
+
+    def _build(self, bucket: int) -> None:
+        atlas = PNMImage(bucket * GRID, bucket * GRID, 4)
+        atlas.fill(0, 0, 0)
+        atlas.alphaFill(0)
+        markings = self.markings[:GRID * GRID]
+        for index, name in enumerate(markings):
+            self._draw_cell(atlas, index, name, bucket)
+        with self._lock:
+            self._images[bucket] = atlas
+            self._counts[bucket] = len(markings)
+            self._threads.pop(bucket, None)
+        logger.info(f"[Markings] Atlas {bucket}px built with {len(markings)} markings")
+
+    def _draw_cell(self, atlas: PNMImage, index: int, name: str, bucket: int) -> None:
+        pad = _cell_pad(bucket)
+        size = bucket - 2 * pad
+        image = self._cell_image(name, bucket, size)
+        x0, y0 = (index % GRID) * bucket, (index // GRID) * bucket
+        atlas.copySubImage(image, x0 + pad, y0 + pad)
+        # Края маркировки тянутся в рамку ячейки: сначала строки, затем столбцы вместе с углами
+        for i in range(pad):
+            atlas.copySubImage(image, x0 + pad, y0 + i, 0, 0, size, 1)
+            atlas.copySubImage(image, x0 + pad, y0 + pad + size + i, 0, size - 1, size, 1)
+        left = PNMImage(1, bucket, 4)
+        left.copySubImage(atlas, 0, 0, x0 + pad, y0, 1, bucket)
+        right = PNMImage(1, bucket, 4)
+        right.copySubImage(atlas, 0, 0, x0 + pad + size - 1, y0, 1, bucket)
+        for i in range(pad):
+            atlas.copySubImage(left, x0 + i, y0)
+            atlas.copySubImage(right, x0 + pad + size + i, y0)
+
+    def _cell_image(self, name: str, bucket: int, size: int) -> PNMImage:
+        image = self._load_image(name, bucket)
+        if image.getXSize() != size or image.getYSize() != size:
+            scaled = PNMImage(size, size, 4)
+            scaled.quickFilterFrom(image)
+            image = scaled
+        if not image.hasAlpha():
+            image.addAlpha()
+            image.alphaFill(1)
+        return image
+
+    def _load_image(self, name: str, bucket: int) -> PNMImage:
+        for ext in (".png", ".jpg", ".jpeg"):
+            path = self.resolve_path(f"assets/markings/{name}{ext}")
+            if os.path.exists(path):
+                image = PNMImage()
+                if image.read(Filename.fromOsSpecific(path)):
+                    return image
+        path = self.resolve_path(f"assets/markings/{name}.svg")
+        if os.path.exists(path):
+            try:
+                image = _rasterize_svg(path, bucket)
+                if image is not None:
+                    return image
+            except Exception as e:
+                logger.warning(f"[Markings] SVG rasterization failed for '{name}': {e}")
+        return _fallback_image(name, bucket)
+
+    def _add_marking(self, name: str) -> None:
+        # Unknown marking: take the next free cell in every built atlas and re-upload
+        self.markings.append(name)
+        index = len(self.markings) - 1
+        if index >= GRID * GRID:
+            logger.info(f"[Markings] Atlas full, '{name}' gets its own texture")
+            return
+        for built, texture in self._textures.items():
+            atlas = self._images[built]
+            self._draw_cell(atlas, index, name, built)
+            self._counts[built] = index + 1
+            texture.load(atlas)
+
+
+def _make_texture(name: str, image: PNMImage) -> Texture:
+    texture = Texture(name)
+    texture.load(image)
+    texture.setFormat(Texture.FRgba)
+    texture.setMinfilter(Texture.FTLinearMipmapLinear)
+    texture.setMagfilter(Texture.FTLinear)
+    texture.setAnisotropicDegree(2)
+    texture.setWrapU(Texture.WMClamp)
+    texture.setWrapV(Texture.WMClamp)
+    return texture
@@ -0,0 +1,60 @@
+import glob
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Optional
+
+from panda3d.core import Filename, NodePath
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCache:
+    """Кэш моделей в формате BAM.
+
+    Исходник (glb/obj) конвертируется один раз; имя файла кэша включает mtime и
+    размер исходника, поэтому изменённая модель сама собой перечитывается заново.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "truck_models_cache")
+
+    def _prefix(self, source_path: str) -> str:
+        source = os.path.abspath(source_path)
+        digest = hashlib.md5(source.encode("utf-8")).hexdigest()[:12]
+        name = os.path.splitext(os.path.basename(source))[0]
+        return os.path.join(self.cache_dir, f"{name}-{digest}")
+
+    def cache_path(self, source_path: str) -> str:
+        stat = os.stat(source_path)
+        return f"{self._prefix(source_path)}-{stat.st_mtime_ns}-{stat.st_size}.bam"
+
+    def lookup(self, source_path: str) -> Optional[str]:
+        try:
+            path = self.cache_path(source_path)
+        except OSError:
+            return None
+        return path if os.path.exists(path) else None
+
+    def store(self, source_path: str, model: NodePath) -> Optional[str]:
+        """Записать загруженную модель в кэш до любых изменений трансформаций и материалов."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.cache_path(source_path)
+            tmp_path = path + ".tmp"
+            if not model.writeBamFile(Filename.fromOsSpecific(tmp_path)):
+                raise IOError("writeBamFile failed")
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"[ModelCache] Could not cache {source_path}: {e}")
+            return None
+        # Older conversions of the same source are obsolete now
+        for stale in glob.glob(f"{glob.escape(self._prefix(source_path))}-*.bam"):
+            if stale != path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+        logger.info(f"[ModelCache] Cached {os.path.basename(source_path)} -> {path}")
+        return path
@@ -0,0 +1,159 @@
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Sequence
+
+from panda3d.core import (Camera, FrameBufferProperties, Filename, GraphicsPipe, NodePath, PerspectiveLens,
+                          Point3, WindowProperties, loadPrcFileData)
+
+from config.config import BACKGROUND_COLOR
+from core.camera import ArcCamera, VIEW_PRESETS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VIEWS = ('top', 'left', 'right')
+# Без окна у ShowBase нет camLens: ближняя и дальняя плоскости по умолчанию
+DEFAULT_NEAR_FAR = (1.0, 100000.0)
+
+
+class OffscreenRenderer:
+    """Рендер листов погрузки в PNG через внеэкранный GraphicsBuffer.
+
+    Использует уже загруженную сцену: грузовики переключаются через TruckManager.select_index
+    (коробки прячутся/достаются из stash), буфер с отдельной камерой рисует заданные виды.
+    Основное окно на время пакета выключается, так что каждый кадр рисует только буфер.
+    """
+
+    def __init__(self, app, width: int = 1600, height: int = 1000, fov: float = 45.8):
+        self.app = app
+        self.width = int(width)
+        self.height = int(height)
+        self.fov = fov
+        self.buffer = None
+        self.camera: Optional[NodePath] = None
+
+    def render_trucks(self, truck_manager, out_dir: str, views: Sequence[str] = DEFAULT_VIEWS,
+                      on_progress=None) -> List[str]:
+        """Отрисовать все грузовики менеджера из views; возвращает пути сохранённых PNG.
+
+        on_progress(done, total) вызывается после каждого грузовика.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        trucks = truck_manager.get_items()
+        original_index = truck_manager.current_index
+        paths = []
+        started = time.perf_counter()
+
+        try:
+            with self._active():
+                for i, truck in enumerate(trucks):
+                    # Переключение синхронное: коробки достаются из stash или строятся populate_boxes за один вызов
+                    truck_manager.select_index(i)
+                    stem = f"{i + 1:02d}_{_safe_name(truck.name)}"
+                    for view in views:
+                        path = os.path.join(out_dir, f"{stem}_{view}.png")
+                        if self.render_view(view, path):
+                            paths.append(path)
+                    if on_progress:
+                        on_progress(i + 1, len(trucks))
+        finally:
+            if trucks:
+                truck_manager.select_index(original_index)
+            self.app.request_redraw()
+
+        logger.info(f"[Offscreen] Rendered {len(paths)} images for {len(trucks)} trucks "
+                    f"in {time.perf_counter() - started:.2f}s -> {out_dir}")
+        return paths
+
+    def render_view(self, view: str, path: str) -> bool:
+        """Отрисовать текущую сцену из вида view в PNG path."""
+        radius, alpha, beta = VIEW_PRESETS[view]
+        target = Point3(0, 0, 0)
+        with self._active():
+            self.camera.setPos(ArcCamera.orbit_position(target, radius, alpha, beta))
+            self.camera.lookAt(target)
+            self._flush_textures()
+            self.app.graphicsEngine.renderFrame()
+            if not self.buffer.saveScreenshot(Filename.fromOsSpecific(path)):
+                logger.warning(f"[Offscreen] Could not write {path}")
+                return False
+        return True
+
+    def close(self):
+        if self.buffer is not None:
+            self.app.graphicsEngine.removeWindow(self.buffer)
+            self.buffer = None
+        if self.camera is not None:
+            self.camera.removeNode()
+            self.camera = None
+
+    @contextmanager
+    def _active(self):
+        # Рисует только буфер: основное окно выключается, прежние состояния восстанавливаются (вызовы вкладываются)
+        self._ensure_buffer()
+        main_win = getattr(self.app, 'win', None)
+        main_active = main_win.isActive() if main_win is not None else False
+        buffer_active = self.buffer.isActive()
+        self.buffer.setActive(True)
+        if main_win is not None:
+            main_win.setActive(False)
+        try:
+            yield
+        finally:
+            self.buffer.setActive(buffer_active)
+            if main_win is not None:
+                main_win.setActive(main_active)
+
+    def _flush_textures(self):
+        # Подписи новых коробок попадают в GPU задачей taskMgr, а пакет задачи не крутит.
+        # Маркировки MarkingAtlas.get загружает сразу (дожидаясь фоновой растеризации), их ждать не нужно.
+        label_atlas = getattr(self.app, 'label_atlas', None)
+        if label_atlas is not None:
+            label_atlas.flush()
+
+    def _ensure_buffer(self):
+        if self.buffer is not None:
+            return
+        app = self.app
+        if app.pipe is None:
+            # Без окна (window-type none): программный рендер, дисплей и GPU не нужны
+            loadPrcFileData('offscreen-renderer', 'load-display p3tinydisplay')
+            app.makeDefaultPipe()
+        if app.pipe is None:
+            raise RuntimeError("No graphics pipe available for offscreen rendering")
+
+        fb_props = FrameBufferProperties()
+        fb_props.setRgbColor(True)
+        fb_props.setColorBits(24)
+        fb_props.setDepthBits(24)
+        win = getattr(app, 'win', None)
+        self.buffer = app.graphicsEngine.makeOutput(
+            app.pipe, 'load_sheet_buffer', -10, fb_props, WindowProperties.size(self.width, self.height),
+            GraphicsPipe.BFRefuseWindow, win.getGsg() if win is not None else None, win)
+        if self.buffer is None:
+            raise RuntimeError("Could not create offscreen buffer")
+        # getBackgroundColor и camLens требуют основного окна
+        self.buffer.setClearColor(app.getBackgroundColor() if win is not None else (*BACKGROUND_COLOR, 1))
+        self.buffer.setClearColorActive(True)
+
+        lens = PerspectiveLens()
+        lens.setFov(self.fov)
+        lens.setAspectRatio(self.width / float(self.height))
+        cam_lens = getattr(app, 'camLens', None)
+        lens.setNearFar(*((cam_lens.getNear(), cam_lens.getFar()) if cam_lens is not None else DEFAULT_NEAR_FAR))
+        cam_node = Camera('load_sheet_camera', lens)
+        # Листы печатаются с полной детализацией, независимо от текущего LOD экрана
+        box_lod = getattr(app, 'box_lod', None)
+        if box_lod is not None:
+            cam_node.setCameraMask(box_lod.camera_mask(frozenset()))
+        self.camera = app.render.attachNewNode(cam_node)
+        region = self.buffer.makeDisplayRegion()
+        region.setCamera(self.camera)
+        self.buffer.setActive(False)
+        logger.info(f"[Offscreen] Buffer {self.width}x{self.height} on {app.pipe.getInterfaceName()}")
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^\w\-]+', '_', str(name or 'truck')).strip('_') or 'truck'
@@ -0,0 +1,121 @@
+import logging
+import math
+from typing import Dict, Hashable, Set, Tuple
+
+from panda3d.core import NodePath
+
+logger = logging.getLogger(__name__)
+
+
+class SettledLayer:
+    """Слой «осевших» коробок.
+
+    Неподвижные коробки копируются в чанки по ячейкам XY и сливаются flattenStrong
+    в несколько Geom на чанк; оригиналы скрываются, но остаются в сцене для пикинга.
+    Отпущенная коробка снова показывается вместе с остальными коробками её чанка,
+    а сам чанк скрывается до следующего flush: пересборка не блокирует клик.
+    """
+
+    def __init__(self, parent: NodePath, cell_size: float = 300.0):
+        self.root = parent.attachNewNode('settled_boxes')
+        self.cell_size = float(cell_size)
+        self._members: Dict[Hashable, Tuple[Tuple[int, int], NodePath]] = {}
+        self._chunks: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._chunk_nodes: Dict[Tuple[int, int], NodePath] = {}
+        self._dirty: Set[Tuple[int, int]] = set()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._members
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self._chunk_nodes)
+
+    def settle(self, key: Hashable, node: NodePath, x: float, y: float) -> None:
+        if key in self._members:
+            return
+        cell = (int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size)))
+        self._members[key] = (cell, node)
+        self._chunks.setdefault(cell, set()).add(key)
+        self._dirty.add(cell)
+
+    def release(self, key: Hashable) -> bool:
+        """Вернуть коробку в обычную отрисовку; чанк без неё пересоберёт следующий flush."""
+        entry = self._members.pop(key, None)
+        if entry is None:
+            return False
+        cell, node = entry
+        keys = self._chunks.get(cell)
+        if keys is not None:
+            keys.discard(key)
+        if not node.isEmpty():
+            node.show()
+        chunk = self._chunk_nodes.get(cell)
+        if chunk is not None and not chunk.isHidden():
+            # Слитая копия ещё содержит коробку: до пересборки рисуем оригиналы всего чанка
+            chunk.hide()
+            for other in keys or ():
+                other_node = self._members[other][1]
+                if not other_node.isEmpty():
+                    other_node.show()
+        self._dirty.add(cell)
+        return True
+
+    def clear(self) -> None:
+        for _, node in self._members.values():
+            if not node.isEmpty():
+                node.show()
+        for chunk in self._chunk_nodes.values():
+            chunk.removeNode()
+        self._members.clear()
+        self._chunks.clear()
+        self._chunk_nodes.clear()
+        self._dirty.clear()
+
+    def flush(self) -> int:
+        """Пересобрать изменённые чанки; возвращает их число."""
+        cells = list(self._dirty)
+        for cell in cells:
+            self._rebuild(cell)
+        return len(cells)
+
+    def _rebuild(self, cell: Tuple[int, int]) -> None:
+        self._dirty.discard(cell)
+        old = self._chunk_nodes.pop(cell, None)
+        if old is not None:
+            old.removeNode()
+        keys = self._chunks.get(cell)
+        if not keys:
+            self._chunks.pop(cell, None)
+            return
+
+        chunk = self.root.attachNewNode(f'settled_{cell[0]}_{cell[1]}')
+        for key in list(keys):
+            node = self._members[key][1]
+            if node.isEmpty():
+                keys.discard(key)
+                self._members.pop(key, None)
+                continue
+            copy = node.copyTo(chunk)
+            copy.show()
+            # Коллизии остаются только у оригиналов
+            for collision in copy.findAllMatches('**/+CollisionNode'):
+                collision.removeNode()
+            _strip_tags(copy)
+            node.hide()
+        chunk.flattenStrong()
+        self._chunk_nodes[cell] = chunk
+        logger.debug(f"[Settled] Chunk {cell}: {len(keys)} boxes -> {chunk.findAllMatches('**/+GeomNode').getNumPaths()} geom nodes")
+
+
+def _strip_tags(root: NodePath) -> None:
+    # flattenStrong keeps nodes that carry tags; the visual copies need none of them
+    for np in [root] + list(root.findAllMatches('**')):
+        node = np.node()
+        for key in list(node.getPythonTagKeys()):
+            node.clearPythonTag(key)
+        for key in list(node.getTagKeys()):
+            node.clearTag(key)
@@ -1,12 +1,20 @@
 from .packer import Packer, PackingConfig
+from .beam_controller import AdaptiveBeamController
 from .free_space import FreeSpaceManager
 from .scorers import score_position
+from .support import SupportGraph
+from .validator import ValidationReport, Violation, validate_layout
 
 __all__ = [
     "Packer",
     "PackingConfig",
+    "AdaptiveBeamController",
     "FreeSpaceManager",
     "score_position",
+    "SupportGraph",
+    "ValidationReport",
+    "Violation",
+    "validate_layout",
 ]
 
 
@@ -0,0 +1,65 @@
+import time
+from typing import Optional
+
+
+# Resizes the beam after every depth so the remaining items fit the time budget.
+# Expansion cost is measured online as seconds per work unit: a depth of width W
+# costs roughly W state expansions plus W * min(W, candidates) children.
+class AdaptiveBeamController:
+    def __init__(self, budget_sec: float, initial_width: int, min_width: int = 1, max_width: int = 64,
+                 smoothing: float = 0.3, safety: float = 0.8):
+        self.min_width = max(1, int(min_width))
+        self.max_width = max(self.min_width, int(max_width))
+        self.smoothing = smoothing
+        self.safety = safety
+        self.width = self._clamp(initial_width)
+        self.deadline = time.perf_counter() + max(0.0, budget_sec)
+        self.unit_cost: Optional[float] = None
+        self.avg_candidates: float = float(self.width)
+        # Set once even the narrowest beam cannot finish the remaining items in time
+        self.starved = False
+        self._depth_start = 0.0
+
+    def _clamp(self, width: int) -> int:
+        return max(self.min_width, min(self.max_width, int(width)))
+
+    def remaining(self) -> float:
+        return self.deadline - time.perf_counter()
+
+    def begin_depth(self) -> None:
+        self._depth_start = time.perf_counter()
+
+    def end_depth(self, states_expanded: int, children_created: int, candidates_seen: int, items_left: int) -> int:
+        elapsed = time.perf_counter() - self._depth_start
+        units = states_expanded + children_created
+        if units > 0:
+            sample = elapsed / units
+            if self.unit_cost is None:
+                self.unit_cost = sample
+            else:
+                self.unit_cost += self.smoothing * (sample - self.unit_cost)
+        if states_expanded > 0:
+            self.avg_candidates += self.smoothing * (candidates_seen / states_expanded - self.avg_candidates)
+
+        if items_left <= 0 or self.unit_cost is None:
+            return self.width
+
+        remaining = self.remaining()
+        if remaining <= 0.0:
+            self.width = self.min_width
+            self.starved = True
+            return self.width
+
+        per_depth_budget = self.safety * remaining / items_left
+        # Grow at most twice per depth: a single cheap sample should not blow up the next depth
+        width = min(self.max_width, self.width * 2)
+        while width > self.min_width and self._depth_cost(width) > per_depth_budget:
+            width -= 1
+        if self._depth_cost(width) > per_depth_budget:
+            self.starved = True
+        self.width = self._clamp(width)
+        return self.width
+
+    def _depth_cost(self, width: int) -> float:
+        children = width * min(float(width), max(1.0, self.avg_candidates))
+        return (width + children) * self.unit_cost
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Iterable, List, Optional, Tuple
+from typing import Iterable, List, Tuple
 
 
 def boxes_overlap(a: Tuple[float, float, float, float, float, float], b: Tuple[float, float, float, float, float, float]) -> bool:
@@ -57,14 +57,28 @@ class FreeSpaceManager:
                 yield fb.x1, fb.y1, fb.z1, fb.x1 + l, fb.y1 + w, fb.z1 + h
 
     def place(self, placed: Tuple[float, float, float, float, float, float]) -> None:
-        new_free: List[FreeBox] = []
+        # Same result as merging every split piece against all kept boxes, but free_boxes is already
+        # merged: a box the placement does not touch cannot sit inside an earlier untouched box, so
+        # it is only checked against the new pieces. Those are few, which makes place() linear in practice.
+        merged: List[FreeBox] = []
+        pieces: List[FreeBox] = []
+        contained = self._contained
         for fb in self.free_boxes:
-            new_free.extend(fb.split(placed))
-        self.free_boxes = self._merge(new_free)
+            parts = fb.split(placed)
+            if len(parts) == 1 and parts[0] is fb:
+                if not any(contained(fb, m) for m in pieces):
+                    merged.append(fb)
+                continue
+            for b in parts:
+                if not any(contained(b, m) for m in merged):
+                    merged.append(b)
+                    pieces.append(b)
+        self.free_boxes = merged
 
     def clone(self) -> "FreeSpaceManager":
-        clone_mgr = FreeSpaceManager((0.0, 0.0, 0.0, 0.0, 0.0, 0.0))
-        clone_mgr.free_boxes = [FreeBox(fb.x1, fb.y1, fb.z1, fb.x2, fb.y2, fb.z2) for fb in self.free_boxes]
+        # FreeBox objects are never modified in place (split and place build new ones), so clones share them
+        clone_mgr = FreeSpaceManager.__new__(FreeSpaceManager)
+        clone_mgr.free_boxes = list(self.free_boxes)
         return clone_mgr
 
     def total_free_volume(self) -> float:
@@ -85,5 +99,3 @@ class FreeSpaceManager:
     @staticmethod
     def _contained(a: FreeBox, b: FreeBox) -> bool:
         return a.x1 >= b.x1 and a.y1 >= b.y1 and a.z1 >= b.z1 and a.x2 <= b.x2 and a.y2 <= b.y2 and a.z2 <= b.z2
-
-
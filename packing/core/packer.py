@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass, field
-from typing import Callable, List, Sequence, Tuple
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Callable, List, Optional, Sequence, Tuple
 import time
 import random
 
-from .free_space import FreeSpaceManager
+from .beam_controller import AdaptiveBeamController
+from .free_space import FreeBox, FreeSpaceManager
 from .scorers import score_position
+from .sequence import StopIndex
+from .support import SupportGraph
+from .validator import NO_STACK_FLAGS
 from ..models.container import Container
 from ..models.item import BoxItem
 from ..models.placement import PlacedBox
@@ -15,6 +21,10 @@ from ..models.placement import PlacedBox
 
 logger = logging.getLogger(__name__)
 
+# Compact, picklable form of a beam state:
+# (placed bounds + index, free boxes, placed volume, fit potential, support graph, stop index)
+StateSnapshot = Tuple[Tuple[Tuple[float, ...], ...], Tuple[Tuple[float, ...], ...], float, float, SupportGraph, Optional[StopIndex]]
+
 
 @dataclass
 class PackingConfig:
@@ -38,6 +48,14 @@ class PackingConfig:
     allow_stacking: bool = True
     stack_same_face_only: bool = False
     size_tol: float = 1e-6
+    adaptive_beam: bool = False
+    beam_width_min: int = 1
+    beam_width_max: int = 64
+    parallel_workers: int = 0  # >1 expands beam states across a process pool
+    parallel_min_states: int = 4
+    max_load_ratio: Optional[float] = None  # weight a box may carry above it, as a multiple of its own weight
+    door_side: str = "max_x"  # "min_x" | "max_x" | "min_y" | "max_y", used when items carry stops
+    stop_depth_bias: float = 1e9  # with stops, fill from the far wall towards the door before anything else
 
 
 class Packer:
@@ -46,6 +64,10 @@ class Packer:
         self.config = config or PackingConfig()
         self.free = FreeSpaceManager((container.min_x, container.min_y, container.min_z, container.max_x, container.max_y, container.max_z))
         self.placed: List[PlacedBox] = []
+        self.support_graph: Optional[SupportGraph] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._worker_config: Optional[PackingConfig] = None
+        self._parallel_disabled = False
 
     def _xy_overlap_area(self, a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> float:
         ax1, ay1, ax2, ay2 = a
@@ -126,6 +148,13 @@ class Packer:
         return self.config.contact_weight_wall * wall_contact + self.config.contact_weight_box * box_contact
 
     def pack(self, items: Sequence[BoxItem]) -> List[PlacedBox]:
+        try:
+            return self._pack(items)
+        finally:
+            # Worker processes live only for one pack() call
+            self.close()
+
+    def _pack(self, items: Sequence[BoxItem]) -> List[PlacedBox]:
         start = time.time()
         strategies: List[Tuple[Callable[[BoxItem], float], bool]]
         if self.config.prefer_small_boxes:
@@ -142,9 +171,11 @@ class Packer:
             ]
 
         best_result: List[PlacedBox] = []
+        best_graph: Optional[SupportGraph] = None
         best_score: Tuple[int, float] | None = None
 
         run_index = 0
+        total_runs = len(strategies) * max(1, self.config.alternate_starts)
         for strat, reverse in strategies:
             for attempt in range(max(1, self.config.alternate_starts)):
                 if time.time() - start > self.config.time_limit_sec:
@@ -152,8 +183,17 @@ class Packer:
                 self.free = FreeSpaceManager((self.container.min_x, self.container.min_y, self.container.min_z, self.container.max_x, self.container.max_y, self.container.max_z))
                 self.placed = []
                 ordered = sorted(items, key=strat, reverse=reverse)
+                # Multi-drop: last stop goes in first so it ends up deepest; stable sort keeps the strategy within a stop
+                ordered.sort(key=lambda it: -it.stop)
                 rng = random.Random(1337 + run_index)
-                result = self._beam_pack(ordered, start, rng)
+                controller = None
+                if self.config.adaptive_beam:
+                    # Each remaining run gets an equal share of what is left of the time limit
+                    run_budget = (self.config.time_limit_sec - (time.time() - start)) / (total_runs - run_index)
+                    controller = AdaptiveBeamController(run_budget, self.config.beam_width,
+                                                        self.config.beam_width_min, self.config.beam_width_max)
+                best_state = self._beam_pack(ordered, start, rng, controller)
+                result = best_state.placed
                 run_index += 1
                 filled_volume = sum((p.x2 - p.x1) * (p.y2 - p.y1) * (p.z2 - p.z1) for p in result)
                 if self.config.objective == "volume":
@@ -163,145 +203,273 @@ class Packer:
                 if best_score is None or score < best_score:
                     best_score = score
                     best_result = result
+                    best_graph = best_state.support
+                if controller and controller.starved:
+                    # Even the narrowest beam could not keep to this run's share; later runs would not finish either
+                    break
+            else:
+                continue
+            break
 
         self.placed = best_result
+        self.support_graph = best_graph
         return self.placed
 
-    def _beam_pack(self, items: Sequence[BoxItem], start_time: float, rng: random.Random) -> List[PlacedBox]:
-        @dataclass(order=True)
-        class State:
-            sort_key: Tuple[int, float, float, int] = field(init=False, compare=True)
-            placed: List[PlacedBox] = field(default_factory=list, compare=False)
-            free: FreeSpaceManager = field(default=None, compare=False)
-            placed_volume: float = 0.0
-            potential_fit: float = 0.0
-
-            def compute_key(self) -> None:
-                fragmentation = len(self.free.free_boxes) if self.free is not None else 0
-                self.sort_key = (-len(self.placed), -self.placed_volume, -self.potential_fit, fragmentation)
-
-        def fit_potential(free: FreeSpaceManager, upcoming: Sequence[BoxItem], items_limit: int = 6, boxes_limit: int = 16) -> float:
-            if not upcoming or not free or not free.free_boxes:
-                return 0.0
-            score = 0
-            considered_boxes = free.free_boxes[: boxes_limit]
-            considered_items = list(upcoming[: items_limit])
-            for fb in considered_boxes:
-                bx = fb.x2 - fb.x1
-                by = fb.y2 - fb.y1
-                bz = fb.z2 - fb.z1
-                for it in considered_items:
-                    can_fit = False
-                    for l, w, h in it.orientations():
-                        if l <= bx + 1e-6 and w <= by + 1e-6 and h <= bz + 1e-6:
-                            can_fit = True
-                            break
-                    if can_fit:
-                        score += 1
-            return float(score)
-
-        init = State(placed=[], free=self.free.clone(), placed_volume=0.0)
+    def _beam_pack(self, items: Sequence[BoxItem], start_time: float, rng: random.Random,
+                   controller: AdaptiveBeamController | None = None) -> BeamState:
+        stops = StopIndex(self.container, self.config.door_side) if any(it.stop > 0 for it in items) else None
+        init = BeamState(placed=[], free=self.free.clone(), placed_volume=0.0,
+                         support=SupportGraph(self.container.min_z), stops=stops)
         init.compute_key()
-        beam: List[State] = [init]
+        beam: List[BeamState] = [init]
+        beam_width = controller.width if controller else self.config.beam_width
+        deadline = start_time + self.config.time_limit_sec
 
         for idx, item in enumerate(items):
-            next_beam: List[State] = []
-            for state in beam:
-                if time.time() - start_time > self.config.time_limit_sec:
-                    break
-                candidates: List[Tuple[float, Tuple[float, float, float, float, float, float]]] = []
-                count = 0
-                for l, w, h in item.orientations():
-                    for cand in state.free.find_positions(l, w, h):
-                        if not self.config.allow_stacking and cand[2] > self.container.min_z + 1e-9:
-                            continue
-                        # Enforce no_stack/fragile/alcohol constraints for underlying boxes at this Z
-                        if cand[2] > self.container.min_z + 1e-9:
-                            base_z = cand[2]
-                            bx1, by1, bx2, by2 = cand[0], cand[1], cand[3], cand[4]
-                            violates = False
-                            for p in state.placed:
-                                if abs(p.z2 - base_z) < 1e-6:
-                                    overlap_x = max(0.0, min(bx2, p.x2) - max(bx1, p.x1))
-                                    overlap_y = max(0.0, min(by2, p.y2) - max(by1, p.y1))
-                                    if overlap_x > 1e-9 and overlap_y > 1e-9:
-                                        # For now, interpret flags via item index mapping if available
-                                        # Since we don't carry flags in PlacedBox, allow stacking generally
-                                        pass
-                            if violates:
-                                continue
-                        # Enforce stacking only on same face dimensions if enabled
-                        if self.config.stack_same_face_only and cand[2] > self.container.min_z + 1e-9:
-                            face_x = cand[3] - cand[0]
-                            face_y = cand[4] - cand[1]
-                            fx1, fy1 = sorted((face_x, face_y))
-                            ok_face = False
-                            bx1, by1, bx2, by2 = cand[0], cand[1], cand[3], cand[4]
-                            for p in state.placed:
-                                if abs(p.z2 - cand[2]) < 1e-6:
-                                    overlap_x = max(0.0, min(bx2, p.x2) - max(bx1, p.x1))
-                                    overlap_y = max(0.0, min(by2, p.y2) - max(by1, p.y1))
-                                    if overlap_x > self.config.size_tol and overlap_y > self.config.size_tol:
-                                        pf_x = p.x2 - p.x1
-                                        pf_y = p.y2 - p.y1
-                                        px1, py1 = sorted((pf_x, pf_y))
-                                        if abs(px1 - fx1) <= self.config.size_tol and abs(py1 - fy1) <= self.config.size_tol:
-                                            ok_face = True
-                                            break
-                            if not ok_face:
-                                continue
-                        support = self._support_ratio_local(cand, state.placed if state.placed else [])
-                        if support + 1e-9 < self.config.min_support_ratio:
-                            continue
-                        base = self.config.position_scorer(cand)
-                        contact = self._contact_score_local(cand, state.placed if state.placed else [])
-                        # Prefer lower Z for stability and layer fill
-                        z1 = cand[2]
-                        s = base - contact + self.config.z_bias * z1
-                        if self.config.diversify and self.config.jitter > 0.0:
-                            s += rng.uniform(-self.config.jitter, self.config.jitter)
-                        candidates.append((s, cand))
-                        count += 1
-                        if count >= self.config.max_positions_per_item:
-                            break
-                    if count >= self.config.max_positions_per_item:
+            if controller:
+                controller.begin_depth()
+            upcoming = items[idx + 1 : idx + 1 + 6]
+            if self._use_parallel(len(beam)):
+                next_beam, expanded, candidates_seen = self._expand_parallel(beam, item, upcoming, beam_width, rng, deadline)
+            else:
+                next_beam = []
+                expanded = 0
+                candidates_seen = 0
+                for state in beam:
+                    if time.time() > deadline:
                         break
-                candidates.sort(key=lambda x: x[0])
-                depth = len(state.placed)
-                local_width = self.config.beam_width
-                if depth < self.config.beam_widen_until:
-                    local_width = min(self.config.beam_width * self.config.beam_widen_factor, max(1, len(candidates)))
-                top = [c for _, c in candidates[: local_width]]
-                if self.config.diversify and len(candidates) > self.config.beam_width:
-                    pool = candidates[self.config.beam_width:]
-                    extra = min(self.config.exploratory_pick, len(pool))
-                    if extra > 0:
-                        extra_choices = rng.sample(pool, extra)
-                        top.extend([c for _, c in extra_choices])
-
-                for cand in top:
-                    new_state = State(placed=list(state.placed), free=state.free.clone(), placed_volume=state.placed_volume)
-                    new_state.free.place(cand)
-                    new_state.placed.append(PlacedBox(*cand, item.index))
-                    new_state.placed_volume += (cand[3] - cand[0]) * (cand[4] - cand[1]) * (cand[5] - cand[2])
-                    # Estimate fit potential for upcoming items
-                    upcoming = items[idx + 1 : idx + 1 + 6]
-                    new_state.potential_fit = fit_potential(new_state.free, upcoming)
-                    new_state.compute_key()
-                    next_beam.append(new_state)
-
-                if not top:
-                    # skip placing this item in this branch
-                    new_state = State(placed=list(state.placed), free=state.free.clone(), placed_volume=state.placed_volume)
-                    new_state.compute_key()
-                    next_beam.append(new_state)
+                    expanded += 1
+                    children, seen = self._expand_state(state, item, upcoming, beam_width, rng)
+                    next_beam.extend(children)
+                    candidates_seen += seen
 
+            if not next_beam:
+                logger.warning("Packing time limit reached after %d of %d items", idx, len(items))
+                break
             next_beam.sort(key=lambda s: s.sort_key)
-            beam = next_beam[: self.config.beam_width]
-            if time.time() - start_time > self.config.time_limit_sec:
+            if controller:
+                beam_width = controller.end_depth(expanded, len(next_beam), candidates_seen, len(items) - idx - 1)
+            beam = next_beam[: beam_width]
+            if time.time() > deadline:
+                if idx + 1 < len(items):
+                    logger.warning("Packing time limit reached after %d of %d items", idx + 1, len(items))
+                break
+
+        return min(beam, key=lambda s: s.sort_key)
+
+    def _expand_state(self, state: BeamState, item: BoxItem, upcoming: Sequence[BoxItem], beam_width: int,
+                      rng: random.Random) -> Tuple[List[BeamState], int]:
+        candidates: List[Tuple[float, Tuple[float, float, float, float, float, float], List[Tuple[int, float]]]] = []
+        count = 0
+        graph = state.support
+        container = self.container
+        for l, w, h, _ in item.orientations_in(container.size_x, container.size_y, container.size_z):
+            for cand in state.free.find_positions(l, w, h):
+                if not self.config.allow_stacking and cand[2] > self.container.min_z + 1e-9:
+                    continue
+                if state.stops is not None and not state.stops.allows(item.stop, cand):
+                    continue
+                # Enforce stacking only on same face dimensions if enabled
+                if self.config.stack_same_face_only and cand[2] > self.container.min_z + 1e-9:
+                    face_x = cand[3] - cand[0]
+                    face_y = cand[4] - cand[1]
+                    fx1, fy1 = sorted((face_x, face_y))
+                    ok_face = False
+                    bx1, by1, bx2, by2 = cand[0], cand[1], cand[3], cand[4]
+                    for _, (px1, py1, _, px2, py2, _) in graph.boxes_at_level(cand[2]):
+                        overlap_x = max(0.0, min(bx2, px2) - max(bx1, px1))
+                        overlap_y = max(0.0, min(by2, py2) - max(by1, py1))
+                        if overlap_x > self.config.size_tol and overlap_y > self.config.size_tol:
+                            pf_x = px2 - px1
+                            pf_y = py2 - py1
+                            px1, py1 = sorted((pf_x, pf_y))
+                            if abs(px1 - fx1) <= self.config.size_tol and abs(py1 - fy1) <= self.config.size_tol:
+                                ok_face = True
+                                break
+                    if not ok_face:
+                        continue
+                supports = graph.supporting(cand)
+                # Nothing may rest on no_stack / fragile / alcohol boxes (same rule as validate_layout)
+                if supports and graph.blocks_stacking(supports):
+                    continue
+                support = graph.support_ratio(cand, supports)
+                if support + 1e-9 < self.config.min_support_ratio:
+                    continue
+                if self.config.max_load_ratio is not None and supports and \
+                        not graph.can_carry(supports, item.weight, self.config.max_load_ratio):
+                    continue
+                base = self.config.position_scorer(cand)
+                contact = self._contact_score_local(cand, state.placed if state.placed else [])
+                # Prefer lower Z for stability and layer fill
+                z1 = cand[2]
+                s = base - contact + self.config.z_bias * z1
+                if state.stops is not None:
+                    s -= self.config.stop_depth_bias * state.stops.depth(cand)[0]
+                if self.config.diversify and self.config.jitter > 0.0:
+                    s += rng.uniform(-self.config.jitter, self.config.jitter)
+                candidates.append((s, cand, supports))
+                count += 1
+                if count >= self.config.max_positions_per_item:
+                    break
+            if count >= self.config.max_positions_per_item:
                 break
+        candidates.sort(key=lambda x: x[0])
+        depth = len(state.placed)
+        local_width = beam_width
+        if depth < self.config.beam_widen_until:
+            local_width = min(beam_width * self.config.beam_widen_factor, max(1, len(candidates)))
+        top = [(c, sup) for _, c, sup in candidates[: local_width]]
+        if self.config.diversify and len(candidates) > beam_width:
+            pool = candidates[beam_width:]
+            extra = min(self.config.exploratory_pick, len(pool))
+            if extra > 0:
+                extra_choices = rng.sample(pool, extra)
+                top.extend([(c, sup) for _, c, sup in extra_choices])
+
+        children: List[BeamState] = []
+        for cand, supports in top:
+            new_state = BeamState(placed=list(state.placed), free=state.free.clone(), placed_volume=state.placed_volume,
+                                  support=graph.clone(), stops=state.stops.clone() if state.stops is not None else None)
+            new_state.free.place(cand)
+            new_state.placed.append(PlacedBox(*cand, item.index))
+            new_state.support.add(item.index, cand, item.weight, supports, bool(item.flags & NO_STACK_FLAGS))
+            if new_state.stops is not None:
+                new_state.stops.add(item.stop, cand)
+            new_state.placed_volume += (cand[3] - cand[0]) * (cand[4] - cand[1]) * (cand[5] - cand[2])
+            # Estimate fit potential for upcoming items
+            new_state.potential_fit = fit_potential(new_state.free, upcoming)
+            new_state.compute_key()
+            children.append(new_state)
+
+        if not top:
+            # skip placing this item in this branch
+            new_state = BeamState(placed=list(state.placed), free=state.free.clone(), placed_volume=state.placed_volume,
+                                  support=graph, stops=state.stops)
+            new_state.compute_key()
+            children.append(new_state)
+        return children, len(candidates)
+
+    def _use_parallel(self, beam_size: int) -> bool:
+        if self._parallel_disabled or self.config.parallel_workers <= 1 or beam_size < self.config.parallel_min_states:
+            return False
+        if self._worker_config is None:
+            # Only the fields used by _expand_state travel to the workers; sort_key is usually a lambda
+            worker_config = replace(self.config, sort_key=None, parallel_workers=0)
+            try:
+                pickle.dumps((self.container, worker_config))
+            except Exception as e:
+                logger.warning("Parallel beam expansion disabled, config is not picklable: %s", e)
+                self._parallel_disabled = True
+                return False
+            self._worker_config = worker_config
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.config.parallel_workers)
+        return True
 
-        best_state = min(beam, key=lambda s: s.sort_key)
-        return best_state.placed
+    def _expand_parallel(self, beam: List[BeamState], item: BoxItem, upcoming: Sequence[BoxItem], beam_width: int,
+                         rng: random.Random, deadline: float) -> Tuple[List[BeamState], int, int]:
+        # Seeds are drawn up front so the result does not depend on how states are partitioned
+        seeds = [rng.getrandbits(32) for _ in beam]
+        workers = min(self.config.parallel_workers, len(beam))
+        chunk = (len(beam) + workers - 1) // workers
+        futures = []
+        for i in range(0, len(beam), chunk):
+            snapshots = [state.snapshot() for state in beam[i:i + chunk]]
+            futures.append(self._pool.submit(
+                _expand_states_worker, self.container, self._worker_config, snapshots,
+                item, tuple(upcoming), beam_width, seeds[i:i + chunk], deadline))
+        next_beam: List[BeamState] = []
+        expanded = 0
+        candidates_seen = 0
+        for future in futures:
+            children, chunk_expanded, chunk_seen = future.result()
+            next_beam.extend(BeamState.from_snapshot(child) for child in children)
+            expanded += chunk_expanded
+            candidates_seen += chunk_seen
+        return next_beam, expanded, candidates_seen
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self) -> "Packer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+@dataclass(order=True)
+class BeamState:
+    sort_key: Tuple[int, float, float, float, int] = field(init=False, compare=True)
+    placed: List[PlacedBox] = field(default_factory=list, compare=False)
+    free: FreeSpaceManager = field(default=None, compare=False)
+    placed_volume: float = 0.0
+    potential_fit: float = 0.0
+    support: SupportGraph = field(default=None, compare=False)
+    stops: Optional[StopIndex] = field(default=None, compare=False)
+
+    def compute_key(self) -> None:
+        fragmentation = len(self.free.free_boxes) if self.free is not None else 0
+        clearance = self.stops.clearance() if self.stops is not None and self.stops.regions else 0.0
+        self.sort_key = (-len(self.placed), -self.placed_volume, -clearance, -self.potential_fit, fragmentation)
+
+    def snapshot(self) -> StateSnapshot:
+        return (
+            tuple(p.bounds + (p.index,) for p in self.placed),
+            tuple((fb.x1, fb.y1, fb.z1, fb.x2, fb.y2, fb.z2) for fb in self.free.free_boxes),
+            self.placed_volume,
+            self.potential_fit,
+            self.support,
+            self.stops,
+        )
+
+    @staticmethod
+    def from_snapshot(snapshot: StateSnapshot) -> "BeamState":
+        placed, free_boxes, placed_volume, potential_fit, support, stops = snapshot
+        free = FreeSpaceManager((0.0, 0.0, 0.0, 0.0, 0.0, 0.0))
+        free.free_boxes = [FreeBox(*fb) for fb in free_boxes]
+        state = BeamState(placed=[PlacedBox(*p) for p in placed], free=free,
+                          placed_volume=placed_volume, potential_fit=potential_fit,
+                          support=support, stops=stops)
+        state.compute_key()
+        return state
+
+
+def fit_potential(free: FreeSpaceManager, upcoming: Sequence[BoxItem], items_limit: int = 6, boxes_limit: int = 16) -> float:
+    if not upcoming or not free or not free.free_boxes:
+        return 0.0
+    score = 0
+    considered_boxes = free.free_boxes[: boxes_limit]
+    considered_items = list(upcoming[: items_limit])
+    for fb in considered_boxes:
+        bx = fb.x2 - fb.x1
+        by = fb.y2 - fb.y1
+        bz = fb.z2 - fb.z1
+        for it in considered_items:
+            can_fit = False
+            for l, w, h in it.orientations():
+                if l <= bx + 1e-6 and w <= by + 1e-6 and h <= bz + 1e-6:
+                    can_fit = True
+                    break
+            if can_fit:
+                score += 1
+    return float(score)
 
 
+def _expand_states_worker(container: Container, config: PackingConfig, snapshots: Sequence[StateSnapshot],
+                          item: BoxItem, upcoming: Sequence[BoxItem], beam_width: int, seeds: Sequence[int],
+                          deadline: float) -> Tuple[List[StateSnapshot], int, int]:
+    packer = Packer(container, config)
+    children: List[StateSnapshot] = []
+    expanded = 0
+    candidates_seen = 0
+    for snapshot, seed in zip(snapshots, seeds):
+        if time.time() > deadline:
+            break
+        expanded += 1
+        state_children, seen = packer._expand_state(BeamState.from_snapshot(snapshot), item, upcoming, beam_width, random.Random(seed))
+        children.extend(child.snapshot() for child in state_children)
+        candidates_seen += seen
+    return children, expanded, candidates_seen
@@ -0,0 +1,61 @@
+from typing import Dict, Tuple
+
+from ..models.container import Container
+
+DOOR_SIDES = ("min_x", "max_x", "min_y", "max_y")
+
+
+# Placed boxes projected onto the door axis, one (near, far) interval per stop.
+# Distances are measured from the door, so stop 1 (unloaded first) sits nearest to it.
+# A box is allowed when its stop's region stays behind every earlier stop and in front of
+# every later one, which keeps each stop contiguous and its access unblocked.
+class StopIndex:
+    def __init__(self, container: Container, door_side: str = "max_x", tol: float = 1e-6):
+        if door_side not in DOOR_SIDES:
+            raise ValueError(f"door_side must be one of {DOOR_SIDES}, got {door_side!r}")
+        self.door_side = door_side
+        self.door = getattr(container, door_side)
+        self.axis = 0 if door_side.endswith("x") else 1
+        self.tol = tol
+        self.regions: Dict[int, Tuple[float, float]] = {}
+
+    def clone(self) -> "StopIndex":
+        index = StopIndex.__new__(StopIndex)
+        index.door_side = self.door_side
+        index.door = self.door
+        index.axis = self.axis
+        index.tol = self.tol
+        index.regions = dict(self.regions)
+        return index
+
+    def depth(self, bounds: Tuple[float, float, float, float, float, float]) -> Tuple[float, float]:
+        a1, a2 = bounds[self.axis], bounds[self.axis + 3]
+        if self.door_side.startswith("max"):
+            return self.door - a2, self.door - a1
+        return a1 - self.door, a2 - self.door
+
+    def clearance(self) -> float:
+        # Distance from the door to the nearest placed box, i.e. room left for earlier stops
+        if not self.regions:
+            return float("inf")
+        return min(near for near, _ in self.regions.values())
+
+    def allows(self, stop: int, bounds: Tuple[float, float, float, float, float, float]) -> bool:
+        if stop <= 0:
+            return True
+        near, far = self.depth(bounds)
+        for other, (other_near, other_far) in self.regions.items():
+            if other > stop and far > other_near + self.tol:
+                return False
+            if other < stop and near < other_far - self.tol:
+                return False
+        return True
+
+    def add(self, stop: int, bounds: Tuple[float, float, float, float, float, float]) -> None:
+        if stop <= 0:
+            return
+        near, far = self.depth(bounds)
+        region = self.regions.get(stop)
+        if region is not None:
+            near, far = min(near, region[0]), max(far, region[1])
+        self.regions[stop] = (near, far)
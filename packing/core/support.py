@@ -0,0 +1,141 @@
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+Bounds = Tuple[float, float, float, float, float, float]
+
+# Top faces are bucketed by height; neighbouring buckets are probed so values
+# within the 1e-6 contact tolerance never fall between two keys.
+LEVEL_QUANTUM = 1e-4
+
+
+def _level_key(z: float) -> int:
+    return int(round(z / LEVEL_QUANTUM))
+
+
+def _xy_overlap(a: Bounds, b: Bounds) -> float:
+    ox = min(a[3], b[3]) - max(a[0], b[0])
+    oy = min(a[4], b[4]) - max(a[1], b[1])
+    if ox <= 0.0 or oy <= 0.0:
+        return 0.0
+    return ox * oy
+
+
+# Which placed boxes rest on which (with contact areas), kept up to date as boxes
+# are added. Nodes are item indices. Dicts are copied shallowly on clone and their
+# values replaced rather than mutated on add, so beam children share unchanged parts.
+class SupportGraph:
+    def __init__(self, floor_z: float):
+        self.floor_z = floor_z
+        self.bounds: Dict[int, Bounds] = {}
+        self.weights: Dict[int, float] = {}
+        self.supports: Dict[int, Tuple[Tuple[int, float], ...]] = {}
+        self.supported: Dict[int, Tuple[int, ...]] = {}
+        self.load_above: Dict[int, float] = {}
+        self.total_mass = 0.0
+        self._moment = (0.0, 0.0, 0.0)
+        self._tops: Dict[int, Tuple[int, ...]] = {}
+        # Boxes nothing may rest on (no_stack / fragile / alcohol)
+        self.no_stack: FrozenSet[int] = frozenset()
+
+    def clone(self) -> "SupportGraph":
+        graph = SupportGraph.__new__(SupportGraph)
+        graph.floor_z = self.floor_z
+        graph.bounds = dict(self.bounds)
+        graph.weights = dict(self.weights)
+        graph.supports = dict(self.supports)
+        graph.supported = dict(self.supported)
+        graph.load_above = dict(self.load_above)
+        graph.total_mass = self.total_mass
+        graph._moment = self._moment
+        graph._tops = dict(self._tops)
+        graph.no_stack = self.no_stack
+        return graph
+
+    def boxes_at_level(self, z: float) -> Iterator[Tuple[int, Bounds]]:
+        key = _level_key(z)
+        for k in (key - 1, key, key + 1):
+            for index in self._tops.get(k, ()):
+                b = self.bounds[index]
+                if abs(b[5] - z) < 1e-6:
+                    yield index, b
+
+    def supporting(self, candidate: Bounds) -> List[Tuple[int, float]]:
+        if abs(candidate[2] - self.floor_z) < 1e-9:
+            return []
+        result: List[Tuple[int, float]] = []
+        for index, b in self.boxes_at_level(candidate[2]):
+            area = _xy_overlap(candidate, b)
+            if area > 0.0:
+                result.append((index, area))
+        return result
+
+    def support_ratio(self, candidate: Bounds, supports: Optional[List[Tuple[int, float]]] = None) -> float:
+        if abs(candidate[2] - self.floor_z) < 1e-9:
+            return 1.0
+        if supports is None:
+            supports = self.supporting(candidate)
+        area = max(1e-9, (candidate[3] - candidate[0]) * (candidate[4] - candidate[1]))
+        return min(1.0, sum(a for _, a in supports) / area)
+
+    def column_loads(self, supports: List[Tuple[int, float]], weight: float) -> Dict[int, float]:
+        # Weight is split between supports by contact area and passed down the same way
+        added: Dict[int, float] = {}
+        total = sum(a for _, a in supports)
+        if weight <= 0.0 or total <= 0.0:
+            return added
+        frontier = {index: weight * area / total for index, area in supports}
+        while frontier:
+            below: Dict[int, float] = {}
+            for index, load in frontier.items():
+                added[index] = added.get(index, 0.0) + load
+                parents = self.supports.get(index, ())
+                parents_area = sum(a for _, a in parents)
+                for parent, area in parents:
+                    below[parent] = below.get(parent, 0.0) + load * area / parents_area
+            frontier = below
+        return added
+
+    def can_carry(self, supports: List[Tuple[int, float]], weight: float, max_load_ratio: float) -> bool:
+        # Boxes without a known weight (<= 0) are not load-rated
+        for index, load in self.column_loads(supports, weight).items():
+            own = self.weights.get(index, 0.0)
+            if own > 0.0 and self.load_above.get(index, 0.0) + load > own * max_load_ratio + 1e-9:
+                return False
+        return True
+
+    def blocks_stacking(self, supports: List[Tuple[int, float]]) -> bool:
+        return any(index in self.no_stack for index, _ in supports)
+
+    def add(self, index: int, bounds: Bounds, weight: float = 0.0,
+            supports: Optional[List[Tuple[int, float]]] = None, no_stack: bool = False) -> None:
+        if supports is None:
+            supports = self.supporting(bounds)
+        if no_stack:
+            self.no_stack = self.no_stack | {index}
+        self.bounds[index] = bounds
+        self.weights[index] = weight
+        self.supports[index] = tuple(supports)
+        for parent, _ in supports:
+            self.supported[parent] = self.supported.get(parent, ()) + (index,)
+        for parent, load in self.column_loads(supports, weight).items():
+            self.load_above[parent] = self.load_above.get(parent, 0.0) + load
+        key = _level_key(bounds[5])
+        self._tops[key] = self._tops.get(key, ()) + (index,)
+        if weight > 0.0:
+            cx = (bounds[0] + bounds[3]) / 2.0
+            cy = (bounds[1] + bounds[4]) / 2.0
+            cz = (bounds[2] + bounds[5]) / 2.0
+            mx, my, mz = self._moment
+            self._moment = (mx + weight * cx, my + weight * cy, mz + weight * cz)
+            self.total_mass += weight
+
+    def supports_of(self, index: int) -> Tuple[Tuple[int, float], ...]:
+        return self.supports.get(index, ())
+
+    def supported_by(self, index: int) -> Tuple[int, ...]:
+        return self.supported.get(index, ())
+
+    def center_of_gravity(self) -> Optional[Tuple[float, float, float]]:
+        if self.total_mass <= 0.0:
+            return None
+        mx, my, mz = self._moment
+        return mx / self.total_mass, my / self.total_mass, mz / self.total_mass
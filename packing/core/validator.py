@@ -0,0 +1,90 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from ..models.container import Container
+from ..models.item import BoxItem
+from ..models.placement import PlacedBox
+
+# Boxes carrying any of these flags must not have anything resting on them
+NO_STACK_FLAGS = frozenset(("no_stack", "fragile", "alcohol"))
+
+
+@dataclass(frozen=True)
+class Violation:
+    kind: str  # "overlap" | "out_of_bounds" | "unsupported" | "stacked_on_restricted" | "orientation"
+    index: int
+    other: Optional[int] = None
+    amount: float = 0.0  # overlap volume, protrusion, or support ratio depending on kind
+    detail: str = ""
+
+
+@dataclass
+class ValidationReport:
+    checked: int = 0
+    violations: List[Violation] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    def by_kind(self) -> Dict[str, List[Violation]]:
+        grouped: Dict[str, List[Violation]] = {}
+        for v in self.violations:
+            grouped.setdefault(v.kind, []).append(v)
+        return grouped
+
+
+def validate_layout(container: Container, boxes: Sequence[PlacedBox], items: Optional[Mapping[int, BoxItem]] = None,
+                    min_support_ratio: float = 0.95, tol: float = 1e-6) -> ValidationReport:
+    # One sort-and-sweep along X: the active list only holds boxes whose X span covers the current
+    # position, i.e. a single cross-section of the load. Overlaps and support contacts both come out
+    # of the same pair test, so the whole check stays close to O(n log n) for truck-shaped layouts.
+    report = ValidationReport(checked=len(boxes))
+    violations = report.violations
+    order = sorted(range(len(boxes)), key=lambda i: boxes[i].x1)
+    supported_area = [0.0] * len(boxes)
+    supporters: List[List[int]] = [[] for _ in boxes]
+    active: List[int] = []
+
+    for i in order:
+        b = boxes[i]
+        bx1, by1, bz1, bx2, by2, bz2 = b.bounds
+        active = [j for j in active if boxes[j].x2 > bx1 + tol]
+        for j in active:
+            a = boxes[j]
+            oy = min(a.y2, by2) - max(a.y1, by1)
+            if oy <= tol:
+                continue
+            ox = min(a.x2, bx2) - bx1
+            oz = min(a.z2, bz2) - max(a.z1, bz1)
+            if oz > tol:
+                violations.append(Violation("overlap", b.index, a.index, ox * oy * oz))
+            elif abs(a.z2 - bz1) <= tol:
+                supported_area[i] += ox * oy
+                supporters[i].append(j)
+            elif abs(bz2 - a.z1) <= tol:
+                supported_area[j] += ox * oy
+                supporters[j].append(i)
+        active.append(i)
+
+    for i, b in enumerate(boxes):
+        protrusion = max(container.min_x - b.x1, container.min_y - b.y1, container.min_z - b.z1,
+                         b.x2 - container.max_x, b.y2 - container.max_y, b.z2 - container.max_z)
+        if protrusion > tol:
+            violations.append(Violation("out_of_bounds", b.index, amount=protrusion))
+        if b.z1 > container.min_z + tol:
+            area = max(1e-9, (b.x2 - b.x1) * (b.y2 - b.y1))
+            ratio = min(1.0, supported_area[i] / area)
+            if ratio + 1e-9 < min_support_ratio:
+                violations.append(Violation("unsupported", b.index, amount=ratio))
+        if items is None:
+            continue
+        item = items.get(b.index)
+        if item is not None and "this_way_up" in item.flags and abs((b.z2 - b.z1) - item.height) > tol:
+            violations.append(Violation("orientation", b.index, detail="this_way_up"))
+        for j in supporters[i]:
+            below = items.get(boxes[j].index)
+            if below is not None and below.flags & NO_STACK_FLAGS:
+                violations.append(Violation("stacked_on_restricted", b.index, boxes[j].index,
+                                            detail=",".join(sorted(below.flags & NO_STACK_FLAGS))))
+    return report
@@ -1,6 +1,10 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Iterable, List, Tuple, Optional, FrozenSet
 
+# (length, width, height, footprint area) for one orientation
+Orientation = Tuple[float, float, float, float]
+
 
 def unique_orientations(l: float, w: float, h: float) -> List[Tuple[float, float, float]]:
     dims = [l, w, h]
@@ -15,6 +19,22 @@ def unique_orientations(l: float, w: float, h: float) -> List[Tuple[float, float
     return sorted(perms)
 
 
+@lru_cache(maxsize=4096)
+def orientation_table(l: float, w: float, h: float, upright: bool = False,
+                      front_axis: Optional[str] = None) -> Tuple[Orientation, ...]:
+    # Shared by every item with the same dimensions; the set already collapses cube / square-face duplicates
+    if upright:
+        if front_axis == 'x':
+            dims = [(l, w, h)]
+        elif front_axis == 'y':
+            dims = [(w, l, h)]
+        else:
+            dims = [(l, w, h), (w, l, h)]
+    else:
+        dims = unique_orientations(l, w, h)
+    return tuple((a, b, c, a * b) for a, b, c in dims)
+
+
 @dataclass(frozen=True)
 class BoxItem:
     length: float
@@ -23,15 +43,26 @@ class BoxItem:
     index: int
     flags: FrozenSet[str] = frozenset()
     front_axis: Optional[str] = None  # 'x'|'y' when 'this_way_up' is present
+    weight: float = 0.0  # kg, 0 when unknown
+    stop: int = 0  # delivery stop, 1 is unloaded first; 0 when the item has no stop
+
+    def __post_init__(self):
+        table = orientation_table(self.length, self.width, self.height, 'this_way_up' in self.flags, self.front_axis)
+        object.__setattr__(self, '_table', table)
+        object.__setattr__(self, '_dims', tuple((l, w, h) for l, w, h, _ in table))
+        object.__setattr__(self, '_fitting', {})
 
     def orientations(self) -> Iterable[Tuple[float, float, float]]:
-        if 'this_way_up' in self.flags:
-            base_orients: List[Tuple[float, float, float]] = [(self.length, self.width, self.height), (self.width, self.length, self.height)]
-            if self.front_axis == 'x':
-                return [(self.length, self.width, self.height)]
-            if self.front_axis == 'y':
-                return [(self.width, self.length, self.height)]
-            return base_orients
-        return unique_orientations(self.length, self.width, self.height)
+        return self._dims
+
+    def orientations_in(self, size_x: float, size_y: float, size_z: float, tol: float = 1e-6) -> Tuple[Orientation, ...]:
+        # Orientations that fit the container at all, in table order: the order decides which
+        # candidates survive the max_positions_per_item cap, so it must match orientations()
+        key = (size_x, size_y, size_z)
+        cached = self._fitting.get(key)
+        if cached is None:
+            cached = tuple(o for o in self._table if o[0] <= size_x + tol and o[1] <= size_y + tol and o[2] <= size_z + tol)
+            self._fitting[key] = cached
+        return cached
 
 
@@ -0,0 +1,54 @@
+import pytest
+
+from packing.core import beam_controller
+from packing.core.beam_controller import AdaptiveBeamController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(beam_controller.time, 'perf_counter', fake)
+    return fake
+
+
+def _depth(controller, clock, seconds, width, items_left, candidates=None):
+    controller.begin_depth()
+    clock.now += seconds
+    return controller.end_depth(width, width * width, (candidates or width) * width, items_left)
+
+
+def test_width_is_clamped_to_limits(clock):
+    assert AdaptiveBeamController(10.0, 200, 1, 16).width == 16
+    assert AdaptiveBeamController(10.0, 0, 2, 16).width == 2
+
+
+def test_cheap_depths_grow_the_beam_at_most_twice(clock):
+    controller = AdaptiveBeamController(100.0, 4, 1, 64)
+    assert _depth(controller, clock, 0.001, 4, items_left=10) == 8
+    assert _depth(controller, clock, 0.001, 8, items_left=9) == 16
+
+
+def test_expensive_depths_shrink_the_beam(clock):
+    controller = AdaptiveBeamController(1.0, 16, 1, 64)
+    width = _depth(controller, clock, 0.5, 16, items_left=10)
+    assert width < 16
+    assert not controller.starved
+
+
+def test_starved_when_the_budget_is_gone(clock):
+    controller = AdaptiveBeamController(1.0, 8, 1, 64)
+    assert _depth(controller, clock, 2.0, 8, items_left=5) == 1
+    assert controller.starved
+
+
+def test_last_depth_keeps_width(clock):
+    controller = AdaptiveBeamController(1.0, 8, 1, 64)
+    assert _depth(controller, clock, 0.9, 8, items_left=0) == 8
@@ -0,0 +1,50 @@
+import random
+
+from packing.core.free_space import FreeBox, FreeSpaceManager, boxes_overlap
+
+
+def _reference_place(free_boxes, placed):
+    # Split every space and merge all pieces from scratch
+    pieces = [part for fb in free_boxes for part in fb.split(placed)]
+    return FreeSpaceManager((0, 0, 0, 0, 0, 0))._merge(pieces)
+
+
+def test_split_leaves_no_space_inside_the_placed_box():
+    placed = (2, 2, 0, 5, 6, 4)
+    for part in FreeBox(0, 0, 0, 10, 10, 10).split(placed):
+        assert not boxes_overlap((part.x1, part.y1, part.z1, part.x2, part.y2, part.z2), placed)
+
+
+def test_place_matches_a_full_merge():
+    rng = random.Random(3)
+    manager = FreeSpaceManager((0, 0, 0, 100, 80, 60))
+    expected = list(manager.free_boxes)
+    for _ in range(30):
+        l, w, h = rng.randint(5, 30), rng.randint(5, 30), rng.randint(5, 30)
+        positions = list(manager.find_positions(l, w, h))
+        if not positions:
+            continue
+        placed = rng.choice(positions)
+        expected = _reference_place(expected, placed)
+        manager.place(placed)
+        # Same spaces in the same order: the order decides which positions survive the per-item cap
+        assert manager.free_boxes == expected
+        for fb in manager.free_boxes:
+            assert not boxes_overlap((fb.x1, fb.y1, fb.z1, fb.x2, fb.y2, fb.z2), placed)
+
+
+def test_find_positions_anchors_at_free_space_corners():
+    manager = FreeSpaceManager((0, 0, 0, 100, 100, 100))
+    manager.place((0, 0, 0, 100, 100, 95))
+    assert list(manager.find_positions(10, 10, 10)) == []
+    assert list(manager.find_positions(50, 50, 5)) == [(0, 0, 95, 50, 50, 100)]
+
+
+def test_clone_is_independent():
+    manager = FreeSpaceManager((0, 0, 0, 10, 10, 10))
+    clone = manager.clone()
+    clone.place((0, 0, 0, 5, 5, 5))
+    assert manager.free_boxes == [FreeBox(0, 0, 0, 10, 10, 10)]
+    assert list(manager.find_positions(10, 10, 10)) == [(0, 0, 0, 10, 10, 10)]
+    assert manager.total_free_volume() == 1000
+    assert clone.total_free_volume() < 1000
@@ -0,0 +1,36 @@
+from packing.models.item import BoxItem, unique_orientations
+
+
+def test_orientations_match_unique_permutations():
+    item = BoxItem(30, 20, 10, 0)
+    assert list(item.orientations()) == unique_orientations(30, 20, 10)
+
+
+def test_cube_has_single_orientation():
+    assert list(BoxItem(10, 10, 10, 0).orientations()) == [(10, 10, 10)]
+
+
+def test_this_way_up_keeps_height():
+    item = BoxItem(30, 20, 10, 0, frozenset({'this_way_up'}))
+    assert list(item.orientations()) == [(30, 20, 10), (20, 30, 10)]
+    fixed = BoxItem(30, 20, 10, 0, frozenset({'this_way_up'}), front_axis='y')
+    assert list(fixed.orientations()) == [(20, 30, 10)]
+
+
+def test_orientations_in_keeps_table_order():
+    # The packer caps candidates per item, so pruning must not reorder what is left
+    item = BoxItem(30, 20, 10, 0)
+    fitting = [o[:3] for o in item.orientations_in(100, 100, 100)]
+    assert fitting == list(item.orientations())
+
+
+def test_orientations_in_drops_what_does_not_fit():
+    item = BoxItem(30, 20, 10, 0)
+    fitting = [o[:3] for o in item.orientations_in(100, 100, 15)]
+    assert fitting == [o for o in item.orientations() if o[2] <= 15]
+    assert all(o[3] == o[0] * o[1] for o in item.orientations_in(100, 100, 15))
+
+
+def test_orientations_in_is_cached_per_container():
+    item = BoxItem(30, 20, 10, 0)
+    assert item.orientations_in(100, 100, 100) is item.orientations_in(100, 100, 100)
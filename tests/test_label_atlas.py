@@ -0,0 +1,118 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from panda3d.core import DynamicTextFont, Filename
+
+from graphics.label_atlas import LabelAtlas
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'assets', 'fonts', 'NotoSans-Bold.ttf')
+
+
+@pytest.fixture
+def live():
+    return set()
+
+
+def _font():
+    return DynamicTextFont(Filename.fromOsSpecific(FONT_PATH))
+
+
+@pytest.fixture
+def atlas(live):
+    # One 256x256 page of 2x4 slots
+    return LabelAtlas(_font(), page_size=256, slot_size=(128, 64), max_pages=1, in_use=lambda: live)
+
+
+class FrameTasks:
+    """taskMgr stand-in: the flush task only runs when the test ends the frame."""
+
+    def __init__(self):
+        self.tasks = []
+
+    def add(self, fn, name, sort=0):
+        self.tasks.append(fn)
+
+    def end_frame(self):
+        tasks, self.tasks = self.tasks, []
+        for fn in tasks:
+            fn(SimpleNamespace(done=0))
+
+
+def _key(i):
+    return (f"box {i}",)
+
+
+def test_same_key_reuses_its_slot(atlas):
+    first = atlas.acquire(_key(0), _key(0))
+    assert atlas.acquire(_key(0), _key(0)) == first
+    assert len(atlas.textures) == 1
+
+
+def test_unused_slots_are_evicted_oldest_first(atlas, live):
+    slots = [atlas.acquire(_key(i), _key(i)) for i in range(8)]
+    live.update(_key(i) for i in range(1, 8))
+    assert atlas.acquire(_key(8), _key(8)) == slots[0]
+    assert _key(0) not in atlas._slots
+
+
+def test_full_atlas_does_not_grow(atlas, live):
+    for i in range(8):
+        atlas.acquire(_key(i), _key(i))
+        live.add(_key(i))
+    assert atlas.acquire(_key(8), _key(8)) is None
+    assert len(atlas.textures) == 1
+    # Live labels keep their slots
+    assert atlas.acquire(_key(3), _key(3)) is not None
+
+
+def test_page_count_follows_the_memory_budget():
+    # 1024px RGBA page with mipmaps is ~5.3 MB
+    assert LabelAtlas(_font(), budget_mb=12).max_pages == 2
+    assert LabelAtlas(_font(), budget_mb=1).max_pages == 1
+    assert LabelAtlas(_font(), max_pages=7).max_pages == 7
+
+
+def test_pages_grow_only_when_every_slot_is_live(live):
+    atlas = LabelAtlas(_font(), page_size=256, slot_size=(128, 64), max_pages=3, in_use=lambda: live)
+    for i in range(8):
+        atlas.acquire(_key(i), _key(i))
+    # A free-able slot is reused before another page is allocated
+    live.update(_key(i) for i in range(1, 8))
+    atlas.acquire(_key(8), _key(8))
+    assert len(atlas.textures) == 1
+    live.add(_key(8))
+    atlas.acquire(_key(9), _key(9))
+    assert len(atlas.textures) == 2
+
+
+def test_live_keys_are_collected_once_per_frame():
+    calls = []
+    tasks = FrameTasks()
+
+    def in_use():
+        calls.append(1)
+        return [_key(i) for i in range(100)]
+
+    atlas = LabelAtlas(_font(), tasks, page_size=256, slot_size=(128, 64), max_pages=1, in_use=in_use)
+    for i in range(8):
+        atlas.acquire(_key(i), _key(i))
+    tasks.end_frame()
+    assert all(atlas.acquire(_key(i), _key(i)) is None for i in range(8, 40))
+    assert len(calls) == 1
+    assert atlas.fallbacks == 32
+    tasks.end_frame()
+    atlas.acquire(_key(40), _key(40))
+    assert len(calls) == 2
+
+
+def test_released_keys_are_evicted_first(atlas, live):
+    for i in range(8):
+        atlas.acquire(_key(i), _key(i))
+    live.update(_key(i) for i in range(8))
+    atlas.release([_key(5)])
+    live.discard(_key(5))
+    before = atlas._slots[_key(5)]
+    assert atlas.acquire(_key(8), _key(8))
+    assert atlas._slots[_key(8)] == before
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from graphics.marking_atlas import GRID, MarkingAtlas, _cell_pad, _fallback_image
+
+
+@pytest.fixture
+def atlas(tmp_path):
+    # No marking files: every marking uses the drawn fallback icon
+    return MarkingAtlas(lambda path: os.path.join(str(tmp_path), path), ['fragile', 'this_way_up'])
+
+
+def test_fallback_icon_is_a_ringed_disc():
+    image = _fallback_image('fragile', 64)
+    assert tuple(image.getXelA(32, 32)) == (1, 0, 0, 1)
+    assert tuple(image.getXelA(32, 6)) == (0, 0, 0, 1)
+    assert image.getAlpha(0, 0) == 0
+
+
+def test_cells_are_padded_with_their_own_edge(atlas):
+    texture, u0, v0, u1, v1 = atlas.get('fragile', 64)
+    bucket = 64
+    pad = _cell_pad(bucket)
+    image = atlas._images[bucket]
+    assert (u0, u1) == (pad / (bucket * GRID), (bucket - pad) / (bucket * GRID))
+    assert v1 - v0 == u1 - u0
+    # The border repeats the nearest edge pixel of the marking, corners included
+    for x, y, ex, ey in [(0, 30, pad, 30), (bucket - 1, 30, bucket - pad - 1, 30),
+                         (30, 0, 30, pad), (0, 0, pad, pad), (bucket - 1, bucket - 1, bucket - pad - 1, bucket - pad - 1)]:
+        assert image.getXelA(x, y) == image.getXelA(ex, ey)
+    # One texel of the coarsest allowed mip level is no wider than the border
+    assert 2 ** texture.getDefaultSampler().getMaxLod() == pad
+
+
+def test_markings_beyond_the_grid_get_their_own_texture(atlas):
+    regions = [atlas.get(f'extra_{i}', 64) for i in range(GRID * GRID)]
+    in_atlas = [r for r in regions if r[0] is regions[0][0]]
+    assert len(in_atlas) == GRID * GRID - 2
+    assert len({r[1:] for r in in_atlas}) == len(in_atlas)
+    overflow = [r for r in regions if r[0] is not regions[0][0]]
+    assert len(overflow) == 2
+    assert overflow[0][0] is not overflow[1][0]
+    assert all(r[1:] == (0.0, 0.0, 1.0, 1.0) for r in overflow)
+    assert atlas.get('extra_15', 64)[0] is overflow[1][0]
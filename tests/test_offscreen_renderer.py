@@ -0,0 +1,62 @@
+import pytest
+from panda3d.core import CardMaker, Filename, PNMImage, loadPrcFileData
+
+from graphics.offscreen_renderer import OffscreenRenderer
+
+
+class FlushCounter:
+    def __init__(self):
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+
+
+class OneTruck:
+    def __init__(self):
+        self.current_index = 0
+        self.selected = []
+
+    def get_items(self):
+        return [type('Truck', (), {'name': 'Грузовик 1'})()]
+
+    def select_index(self, index):
+        self.selected.append(index)
+
+
+@pytest.fixture
+def headless_app():
+    from direct.showbase.ShowBase import ShowBase
+    loadPrcFileData('offscreen-test', 'window-type none\naudio-library-name null')
+    app = ShowBase()
+    app.request_redraw = lambda: None
+    yield app
+    app.destroy()
+
+
+def test_renders_png_without_a_window(headless_app, tmp_path):
+    card = CardMaker('box')
+    card.setFrame(-200, 200, -200, 200)
+    headless_app.render.attachNewNode(card.generate()).setP(-90)
+    headless_app.label_atlas = FlushCounter()
+    renderer = OffscreenRenderer(headless_app, width=64, height=48)
+    manager = OneTruck()
+    try:
+        paths = renderer.render_trucks(manager, str(tmp_path), views=('top',))
+        # A standalone call must activate the buffer by itself
+        single = tmp_path / 'single.png'
+        assert renderer.render_view('top', str(single))
+    finally:
+        renderer.close()
+
+    assert [p.rsplit('/', 1)[-1] for p in paths] == ['01_Грузовик_1_top.png']
+    assert manager.selected == [0, 0]
+    # Labels drawn by select_index reach the GPU before every frame, without stepping taskMgr
+    assert headless_app.label_atlas.flushes == 2
+    for path in paths + [str(single)]:
+        image = PNMImage()
+        assert image.read(Filename.fromOsSpecific(path))
+        assert (image.getXSize(), image.getYSize()) == (64, 48)
+        # Not an all-black frame: the background clear colour and the card are drawn
+        assert image.getXel(0, 0) != (0, 0, 0)
+        assert image.getXel(32, 24) != image.getXel(0, 0)
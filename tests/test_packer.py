@@ -0,0 +1,25 @@
+import random
+
+from packing import BoxItem, Container, Packer, PackingConfig
+
+
+def _items(seed, count=8):
+    rng = random.Random(seed)
+    return [BoxItem(rng.randint(20, 60), rng.randint(20, 60), rng.randint(20, 60), i) for i in range(count)]
+
+
+def _bounds(placed):
+    return [(p.bounds, p.index) for p in placed]
+
+
+def test_parallel_expansion_matches_serial_and_releases_workers():
+    container = Container(0, 0, 0, 120, 100, 100)
+    # Without diversify no random draws are made, so the serial and the pooled expansion must agree
+    config = dict(time_limit_sec=120, beam_width=4, alternate_starts=1, parallel_min_states=2, diversify=False)
+    serial = Packer(container, PackingConfig(**config)).pack(_items(1))
+
+    packer = Packer(container, PackingConfig(parallel_workers=2, **config))
+    parallel = packer.pack(_items(1))
+
+    assert _bounds(parallel) == _bounds(serial)
+    assert packer._pool is None
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from core.load_calculation.quarter_loads import QuarterLoads
+
+
+@pytest.mark.parametrize("y, quarter", [(-500, 0), (-201, 0), (-200, 1), (-100, 1), (0, 2), (150, 2),
+                                        (200, 3), (399, 3), (800, 3)])
+def test_quarter_of_clamps_to_the_body(y, quarter):
+    assert QuarterLoads(800).quarter_of(y) == quarter
+
+
+def test_moving_a_box_shifts_its_mass():
+    loads = QuarterLoads(800)
+    assert loads.set("a", -300, 500)
+    assert loads.masses == [0.5, 0.0, 0.0, 0.0]
+    assert not loads.set("a", -250, 500)
+    assert loads.set("a", 300, 500)
+    assert loads.masses == [0.0, 0.0, 0.0, 0.5]
+    assert loads.remove("a")
+    assert not loads.remove("a")
+    assert len(loads) == 0
+
+
+def test_incremental_masses_match_a_full_recount():
+    rng = random.Random(11)
+    loads = QuarterLoads(1650)
+    boxes = {}
+    for _ in range(2000):
+        key = rng.randrange(40)
+        if rng.random() < 0.2:
+            loads.remove(key)
+            boxes.pop(key, None)
+        else:
+            boxes[key] = (rng.uniform(-900, 900), rng.uniform(1, 1500))
+            loads.set(key, *boxes[key])
+    expected = [0.0] * 4
+    for y, weight in boxes.values():
+        expected[loads.quarter_of(y)] += weight / 1000.0
+    assert loads.masses == pytest.approx(expected)
+    for key in list(boxes):
+        loads.remove(key)
+    # Emptied quarters are reset exactly, with no float residue
+    assert loads.masses == [0.0, 0.0, 0.0, 0.0]
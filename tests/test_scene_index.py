@@ -0,0 +1,100 @@
+import random
+
+from core.scene_index import BoxSpatialHash
+
+
+def _random_boxes(rng, count):
+    boxes = {}
+    for key in range(count):
+        x, y, z = rng.uniform(-500, 500), rng.uniform(-500, 500), rng.uniform(0, 200)
+        w, d, h = rng.uniform(5, 150), rng.uniform(5, 150), rng.uniform(5, 80)
+        boxes[key] = (x, y, z, x + w, y + d, z + h)
+    return boxes
+
+
+def _intersects(a, b):
+    return all(a[i + 3] > b[i] and a[i] < b[i + 3] for i in range(3))
+
+
+def test_query_matches_brute_force():
+    rng = random.Random(7)
+    boxes = _random_boxes(rng, 200)
+    index = BoxSpatialHash(cell_size=64)
+    for key, aabb in boxes.items():
+        index.insert(key, aabb, f"node {key}")
+    for probe in _random_boxes(rng, 50).values():
+        found = {key: item for key, _, item in index.query(probe)}
+        expected = {key for key, aabb in boxes.items() if _intersects(aabb, probe)}
+        assert set(found) == expected
+        assert all(item == f"node {key}" for key, item in found.items())
+
+
+def test_margin_widens_the_query():
+    index = BoxSpatialHash()
+    index.insert("a", (0, 0, 0, 10, 10, 10))
+    probe = (12, 0, 0, 20, 10, 10)
+    assert list(index.query(probe)) == []
+    assert [key for key, _, _ in index.query(probe, margin=3)] == ["a"]
+
+
+def test_reinsert_moves_the_box_and_remove_forgets_it():
+    index = BoxSpatialHash(cell_size=50)
+    index.insert("a", (0, 0, 0, 10, 10, 10))
+    index.insert("a", (300, 300, 0, 310, 310, 10))
+    assert len(index) == 1
+    assert list(index.query((0, 0, 0, 10, 10, 10))) == []
+    assert index.get("a") == (300, 300, 0, 310, 310, 10)
+    index.remove("a")
+    index.remove("a")
+    assert "a" not in index
+    assert index._cells == {}
+
+
+def _brute_ray(boxes, origin, direction, max_t):
+    from core.scene_index import _slab
+    inv = tuple(1.0 / c if c != 0.0 else float('inf') for c in direction)
+    best = None
+    for key, aabb in boxes.items():
+        hit = _slab(origin, direction, inv, aabb[:3], aabb[3:])
+        if hit is None or hit[1] < 0.0:
+            continue
+        t = max(0.0, hit[0])
+        if t <= max_t and (best is None or t < best[0]):
+            best = (t, key)
+    return best
+
+
+def test_ray_cast_matches_brute_force():
+    rng = random.Random(13)
+    boxes = _random_boxes(rng, 150)
+    index = BoxSpatialHash(cell_size=80)
+    for key, aabb in boxes.items():
+        index.insert(key, aabb, key)
+    for _ in range(400):
+        origin = (rng.uniform(-800, 800), rng.uniform(-800, 800), rng.uniform(-50, 600))
+        if rng.random() < 0.5:
+            # Aim at a box centre so that most of these rays hit something
+            aabb = boxes[rng.randrange(len(boxes))]
+            direction = tuple((aabb[i] + aabb[i + 3]) / 2.0 - origin[i] for i in range(3))
+        else:
+            direction = tuple(rng.choice((0.0, rng.uniform(-1, 1))) for _ in range(3))
+        if not any(direction):
+            continue
+        max_t = rng.choice((float('inf'), rng.uniform(100, 2000)))
+        expected = _brute_ray(boxes, origin, direction, max_t)
+        hit = index.ray_cast(origin, direction, max_t)
+        if expected is None:
+            assert hit is None
+        else:
+            assert hit is not None and abs(hit[0] - expected[0]) < 1e-6
+            # Ties between touching boxes may resolve to either key
+            assert abs(_brute_ray({hit[1]: boxes[hit[1]]}, origin, direction, max_t)[0] - expected[0]) < 1e-6
+            assert hit[2] == hit[1]
+
+
+def test_ray_cast_from_inside_a_box_hits_at_zero():
+    index = BoxSpatialHash()
+    index.insert("a", (0, 0, 0, 10, 10, 10))
+    assert index.ray_cast((5, 5, 5), (1, 0, 0)) == (0.0, "a", None)
+    assert index.ray_cast((20, 5, 5), (1, 0, 0)) is None
+    assert BoxSpatialHash().ray_cast((0, 0, 0), (1, 0, 0)) is None
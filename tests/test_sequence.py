@@ -0,0 +1,64 @@
+import pytest
+
+from packing import BoxItem, Container, Packer, PackingConfig
+from packing.core.sequence import StopIndex
+
+CONTAINER = Container(0, 0, 0, 100, 50, 50)
+
+
+def _slab(x1, x2):
+    return (x1, 0, 0, x2, 50, 50)
+
+
+def test_unknown_door_side_is_rejected():
+    with pytest.raises(ValueError):
+        StopIndex(CONTAINER, "top")
+
+
+@pytest.mark.parametrize("door_side, bounds, expected", [
+    ("max_x", _slab(70, 90), (10, 30)),
+    ("min_x", _slab(70, 90), (70, 90)),
+    ("min_y", (0, 5, 0, 10, 20, 10), (5, 20)),
+])
+def test_depth_is_measured_from_the_door(door_side, bounds, expected):
+    assert StopIndex(CONTAINER, door_side).depth(bounds) == expected
+
+
+def test_later_stops_stay_behind_earlier_ones():
+    index = StopIndex(CONTAINER, "max_x")
+    index.add(2, _slab(0, 40))
+    # Stop 1 is unloaded first, so it must sit between stop 2 and the door
+    assert index.allows(1, _slab(40, 70))
+    assert not index.allows(1, _slab(30, 60))
+    # Stop 3 may not end up in front of stop 2
+    assert not index.allows(3, _slab(40, 60))
+    assert index.allows(2, _slab(40, 60))
+    assert index.allows(0, _slab(40, 60))
+
+
+def test_regions_grow_and_clearance_tracks_the_nearest_box():
+    index = StopIndex(CONTAINER, "max_x")
+    assert index.clearance() == float("inf")
+    index.add(2, _slab(0, 20))
+    index.add(2, _slab(20, 50))
+    index.add(0, _slab(90, 100))
+    assert index.regions == {2: (50, 100)}
+    assert index.clearance() == 50
+
+
+def test_clone_is_independent():
+    index = StopIndex(CONTAINER, "max_x")
+    index.add(1, _slab(80, 100))
+    clone = index.clone()
+    clone.add(2, _slab(0, 20))
+    assert 2 not in index.regions
+
+
+def test_packer_keeps_stops_in_unloading_order():
+    items = [BoxItem(20, 50, 50, i, stop=1 + i % 3) for i in range(5)]
+    placed = Packer(CONTAINER, PackingConfig(time_limit_sec=60, door_side="max_x")).pack(items)
+    stop_of = {it.index: it.stop for it in items}
+    assert len(placed) == len(items)
+    # Nearest to the door (largest x) first: stop numbers must not decrease going into the truck
+    stops = [stop_of[p.index] for p in sorted(placed, key=lambda p: -p.bounds[3])]
+    assert stops == sorted(stops)
@@ -0,0 +1,53 @@
+from panda3d.core import CardMaker, NodePath
+
+from graphics.settled_layer import SettledLayer
+
+
+def _box(parent, name, x):
+    node = parent.attachNewNode(name)
+    node.setPythonTag('box_data', {'label': name})
+    node.attachNewNode(CardMaker(name).generate())
+    node.setX(x)
+    return node
+
+
+def _settled(count=3):
+    render = NodePath('render')
+    layer = SettledLayer(render, cell_size=300)
+    boxes = [_box(render, f'box{i}', i * 10) for i in range(count)]
+    for node in boxes:
+        layer.settle(node.getKey(), node, node.getX(), 0)
+    assert layer.flush() == 1
+    return layer, boxes
+
+
+def test_flush_merges_and_hides_originals():
+    layer, boxes = _settled()
+    assert layer.chunk_count == 1
+    assert all(node.isHidden() for node in boxes)
+    chunk = layer.root.getChild(0)
+    # The visual copy carries no tags, so picking only ever sees the originals
+    assert not any(np.hasPythonTag('box_data') for np in [chunk] + list(chunk.findAllMatches('**')))
+
+
+def test_release_defers_the_rebuild():
+    layer, boxes = _settled()
+    chunk = layer.root.getChild(0)
+    assert layer.release(boxes[0].getKey())
+    assert not layer.release(boxes[0].getKey())
+    # Same chunk, only hidden; the other boxes are drawn from their originals meanwhile
+    assert layer.root.getChild(0) == chunk and chunk.isHidden()
+    assert not any(node.isHidden() for node in boxes)
+    assert layer.flush() == 1
+    assert layer.root.getNumChildren() == 1 and not layer.root.getChild(0).isHidden()
+    assert not boxes[0].isHidden()
+    assert boxes[1].isHidden() and boxes[2].isHidden()
+    assert len(layer) == 2
+
+
+def test_releasing_the_last_box_drops_the_chunk():
+    layer, boxes = _settled(1)
+    layer.release(boxes[0].getKey())
+    layer.flush()
+    assert layer.chunk_count == 0
+    assert layer.root.getNumChildren() == 0
@@ -0,0 +1,47 @@
+import random
+
+from core.staging_grid import StagingGrid
+
+
+def _overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _footprint(centre, width, depth):
+    return (centre[0] - width / 2.0, centre[1] - depth / 2.0, centre[0] + width / 2.0, centre[1] + depth / 2.0)
+
+
+def test_empty_zone_returns_the_target_cell():
+    grid = StagingGrid(0, 0, 400, 400, cell=20)
+    assert grid.find_nearest([], 40, 40, 200, 200) == (200, 200)
+
+
+def test_centre_stays_inside_the_zone():
+    grid = StagingGrid(0, 0, 400, 400, cell=20)
+    x, y = grid.find_nearest([], 60, 60, -500, 900)
+    assert 0 <= x <= 400 and 0 <= y <= 400
+
+
+def test_placed_box_clears_obstacles_and_stays_close():
+    rng = random.Random(5)
+    grid = StagingGrid(0, 0, 600, 400, cell=20)
+    obstacles = []
+    for _ in range(25):
+        x, y = rng.uniform(0, 560), rng.uniform(0, 360)
+        obstacles.append((x, y, x + rng.uniform(10, 80), y + rng.uniform(10, 80)))
+    target = (300, 200)
+    centre = grid.find_nearest(obstacles, 50, 30, *target)
+    assert centre is not None
+    assert not any(_overlaps(_footprint(centre, 50, 30), o) for o in obstacles)
+    # Candidates sit on the 20-unit cell grid with the footprint rounded up to 60 x 40;
+    # every closer candidate must be blocked
+    dist = (centre[0] - target[0]) ** 2 + (centre[1] - target[1]) ** 2
+    for cx in range(0, 601, 20):
+        for cy in range(0, 401, 20):
+            if (cx - target[0]) ** 2 + (cy - target[1]) ** 2 < dist - 1e-9:
+                assert any(_overlaps(_footprint((cx, cy), 60, 40), o) for o in obstacles)
+
+
+def test_fully_blocked_zone_returns_none():
+    grid = StagingGrid(0, 0, 200, 200, cell=20)
+    assert grid.find_nearest([(-100, -100, 300, 300)], 20, 20, 100, 100) is None
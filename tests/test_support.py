@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from packing import BoxItem, Container, Packer, PackingConfig
+from packing.core.support import SupportGraph
+from packing.core.validator import validate_layout
+
+
+def test_supporting_finds_boxes_under_the_base():
+    graph = SupportGraph(0.0)
+    graph.add(0, (0, 0, 0, 10, 10, 10))
+    graph.add(1, (10, 0, 0, 20, 10, 5))
+    assert graph.supporting((5, 0, 10, 15, 10, 20)) == [(0, 50.0)]
+    assert graph.supporting((0, 0, 0, 5, 5, 5)) == []
+    assert graph.support_ratio((5, 0, 10, 15, 10, 20)) == pytest.approx(0.5)
+    assert graph.support_ratio((0, 0, 0, 5, 5, 5)) == 1.0
+
+
+def test_add_links_both_directions():
+    graph = SupportGraph(0.0)
+    graph.add(0, (0, 0, 0, 10, 10, 10))
+    graph.add(1, (0, 0, 10, 10, 10, 20))
+    assert graph.supports_of(1) == ((0, 100.0),)
+    assert graph.supported_by(0) == (1,)
+
+
+def test_load_is_split_by_contact_area_and_passed_down():
+    graph = SupportGraph(0.0)
+    graph.add(0, (0, 0, 0, 10, 10, 10), weight=10)
+    graph.add(1, (10, 0, 0, 20, 10, 10), weight=10)
+    # Rests half on each box
+    graph.add(2, (5, 0, 10, 15, 10, 20), weight=8)
+    assert graph.load_above[0] == pytest.approx(4.0)
+    assert graph.load_above[1] == pytest.approx(4.0)
+    graph.add(3, (0, 0, 10, 5, 10, 20), weight=2)
+    assert graph.load_above[0] == pytest.approx(6.0)
+
+
+def test_can_carry_respects_max_load_ratio():
+    graph = SupportGraph(0.0)
+    graph.add(0, (0, 0, 0, 10, 10, 10), weight=10)
+    supports = graph.supporting((0, 0, 10, 10, 10, 20))
+    assert graph.can_carry(supports, 20, 2.0)
+    assert not graph.can_carry(supports, 21, 2.0)
+    unrated = SupportGraph(0.0)
+    unrated.add(0, (0, 0, 0, 10, 10, 10))
+    assert unrated.can_carry(unrated.supporting((0, 0, 10, 10, 10, 20)), 1000, 1.0)
+
+
+def test_center_of_gravity():
+    graph = SupportGraph(0.0)
+    assert graph.center_of_gravity() is None
+    graph.add(0, (0, 0, 0, 10, 10, 10), weight=1)
+    graph.add(1, (10, 0, 0, 20, 10, 10), weight=3)
+    assert graph.center_of_gravity() == pytest.approx((12.5, 5.0, 5.0))
+
+
+def test_clone_does_not_leak_into_parent():
+    graph = SupportGraph(0.0)
+    graph.add(0, (0, 0, 0, 10, 10, 10), weight=5)
+    child = graph.clone()
+    child.add(1, (0, 0, 10, 10, 10, 20), weight=5, no_stack=True)
+    assert 1 not in graph.bounds
+    assert graph.supported_by(0) == ()
+    assert graph.load_above.get(0, 0.0) == 0.0
+    assert list(graph.boxes_at_level(20)) == []
+    assert graph.no_stack == frozenset()
+
+
+def test_blocks_stacking_on_restricted_boxes():
+    graph = SupportGraph(0.0)
+    graph.add(0, (0, 0, 0, 10, 10, 10), no_stack=True)
+    graph.add(1, (10, 0, 0, 20, 10, 10))
+    assert graph.blocks_stacking(graph.supporting((5, 0, 10, 15, 10, 20)))
+    assert not graph.blocks_stacking(graph.supporting((10, 0, 10, 20, 10, 20)))
+
+
+@pytest.mark.parametrize("flag", ["no_stack", "fragile", "alcohol"])
+def test_packer_never_stacks_on_restricted_boxes(flag):
+    rng = random.Random(7)
+    items = [BoxItem(rng.randint(20, 40), rng.randint(20, 40), rng.randint(10, 30), i,
+                     frozenset({flag}) if i % 3 == 0 else frozenset()) for i in range(12)]
+    container = Container(0, 0, 0, 80, 60, 100)
+    placed = Packer(container, PackingConfig(time_limit_sec=60, alternate_starts=1)).pack(items)
+    report = validate_layout(container, placed, {it.index: it for it in items})
+    assert "stacked_on_restricted" not in report.by_kind()
@@ -0,0 +1,24 @@
+from core.trucks.truck_manager import TruckManager
+
+
+class StashRecorder:
+    def __init__(self):
+        self.dropped = []
+
+    def drop_stash(self, key=None):
+        self.dropped.append(key)
+
+
+def test_reissued_truck_id_drops_the_old_stash():
+    manager = TruckManager()
+    app = StashRecorder()
+    manager.app3d = app
+    second = manager.add_truck()
+    assert app.dropped == [second.id]
+    # Removing the live truck has no stash to drop
+    manager.remove_current_truck()
+    assert app.dropped == [second.id]
+    third = manager.add_truck()
+    # The removed truck's id comes back, so its stashed boxes must not be shown for the new truck
+    assert third.id == second.id
+    assert app.dropped == [second.id, second.id]
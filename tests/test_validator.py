@@ -0,0 +1,89 @@
+import pytest
+
+from packing import BoxItem, Container, PlacedBox
+from packing.core.validator import validate_layout
+
+from core.trucks.truck_manager import TruckManager, _rotated_half_extents
+
+CONTAINER = Container(0, 0, 0, 100, 100, 100)
+
+
+def _kinds(report):
+    return sorted(report.by_kind())
+
+
+def test_clean_stack_passes():
+    boxes = [PlacedBox(0, 0, 0, 50, 50, 50, 0), PlacedBox(0, 0, 50, 50, 50, 100, 1)]
+    report = validate_layout(CONTAINER, boxes)
+    assert report.ok
+    assert report.checked == 2
+
+
+def test_overlap_reports_volume():
+    boxes = [PlacedBox(0, 0, 0, 50, 50, 50, 0), PlacedBox(40, 40, 0, 90, 90, 50, 1)]
+    (v,) = validate_layout(CONTAINER, boxes).violations
+    assert (v.kind, {v.index, v.other}) == ("overlap", {0, 1})
+    assert v.amount == 10 * 10 * 50
+
+
+def test_touching_faces_are_not_an_overlap():
+    boxes = [PlacedBox(0, 0, 0, 50, 50, 50, 0), PlacedBox(50, 0, 0, 100, 50, 50, 1)]
+    assert validate_layout(CONTAINER, boxes).ok
+
+
+def test_out_of_bounds_reports_protrusion():
+    (v,) = validate_layout(CONTAINER, [PlacedBox(80, 0, 0, 130, 50, 50, 3)]).violations
+    assert (v.kind, v.index, v.amount) == ("out_of_bounds", 3, 30)
+
+
+def test_unsupported_box_reports_ratio():
+    boxes = [PlacedBox(0, 0, 0, 50, 50, 50, 0), PlacedBox(25, 0, 50, 75, 50, 100, 1)]
+    report = validate_layout(CONTAINER, boxes)
+    (v,) = report.violations
+    assert (v.kind, v.index, v.amount) == ("unsupported", 1, 0.5)
+    assert validate_layout(CONTAINER, boxes, min_support_ratio=0.5).ok
+
+
+def test_floating_box_is_unsupported():
+    (v,) = validate_layout(CONTAINER, [PlacedBox(0, 0, 10, 50, 50, 60, 0)]).violations
+    assert (v.kind, v.amount) == ("unsupported", 0.0)
+
+
+def test_stacked_on_restricted_names_the_flags():
+    boxes = [PlacedBox(0, 0, 0, 50, 50, 50, 0), PlacedBox(0, 0, 50, 50, 50, 100, 1)]
+    items = {0: BoxItem(50, 50, 50, 0, frozenset({"fragile", "alcohol"})), 1: BoxItem(50, 50, 50, 1)}
+    (v,) = validate_layout(CONTAINER, boxes, items).violations
+    assert (v.kind, v.index, v.other, v.detail) == ("stacked_on_restricted", 1, 0, "alcohol,fragile")
+
+
+def test_this_way_up_checks_placed_height():
+    items = {0: BoxItem(60, 40, 20, 0, frozenset({"this_way_up"}))}
+    upright = [PlacedBox(0, 0, 0, 40, 60, 20, 0)]
+    tipped = [PlacedBox(0, 0, 0, 60, 20, 40, 0)]
+    assert validate_layout(CONTAINER, upright, items).ok
+    assert _kinds(validate_layout(CONTAINER, tipped, items)) == ["orientation"]
+
+
+def _manager_with(box_data, hpr):
+    manager = TruckManager()
+    truck = manager.get_current()
+    truck.boxes = [{'box_data': box_data, 'pos': {'x': 0, 'y': 0, 'z': box_data['height'] / 2.0},
+                    'hpr': hpr}]
+    return manager
+
+
+def test_validate_current_uses_recorded_rotation():
+    data = {'width': 100, 'height': 40, 'depth': 200, 'cargo_markings': ['this_way_up']}
+    # Turned about the vertical axis: still upright and inside the body
+    assert _manager_with(data, {'h': 90, 'p': 0, 'r': 0}).validate_current().ok
+    # Laid on its side: the vertical extent no longer matches the original height
+    report = _manager_with(data, {'h': 0, 'p': 0, 'r': 90}).validate_current()
+    assert "orientation" in report.by_kind()
+
+
+def test_rotated_extents_snap_float_noise():
+    assert _rotated_half_extents(100, 200, 40, 0, 0, 0) == (50, 100, 20)
+    # Angles read back from the scene are float32: 90.0000025 must still give exact extents
+    assert _rotated_half_extents(100, 200, 40, 90.0000025, 0, 0) == pytest.approx((100, 50, 20), abs=1e-12)
+    assert _rotated_half_extents(100, 200, 40, 0, -90, 0) == pytest.approx((50, 20, 100), abs=1e-12)
+    assert _rotated_half_extents(100, 200, 40, 0, 0, 90) == pytest.approx((20, 100, 50), abs=1e-12)